@@ -1,7 +1,19 @@
+import sys
+from pathlib import Path
 from neo4j import Driver
 
+# The query cache lives with the other shared tools in misc/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "misc"))
+
+from query_cache import get_cache, is_read_query  # noqa: E402
+
 
 def execute_query(driver: Driver, query: str, parameters: dict = None):
-    with driver.session() as session:
-        result = session.run(query, parameters)
-        return result
+    """Run a query; writes evict what they may have changed from the shared query cache."""
+    try:
+        with driver.session() as session:
+            result = session.run(query, parameters)
+            return result
+    finally:
+        if not is_read_query(query):
+            get_cache().invalidate_query(query)
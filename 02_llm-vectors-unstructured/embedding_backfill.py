@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Embedding Backfill Worker
+
+Adds embeddings to the nodes of a label that do not have one yet, e.g. the
+Movie plots embedded one at a time in 01_semantic_search.ipynb:
+
+    1. stream the nodes WHERE n.<embedding> IS NULL with one read query,
+       pulled from the server a page at a time
+    2. embed the texts of a page in batches through the shared LLM gateway,
+       several batches at once within its concurrency and token budget
+    3. write the vectors back with UNWIND batches while the next page is
+       being embedded
+
+The label is scanned once per run instead of once per page. Nodes that
+already have a vector never match the query, so a restarted run continues
+where the previous one stopped without embedding anything twice. Nodes whose
+batch failed are left without a vector and picked up by the next run.
+
+Usage:
+    python embedding_backfill.py
+    python embedding_backfill.py --label Chunk --text-property text --embedding-property embedding
+
+Requirements:
+    - Neo4j database running and accessible
+    - .env file with database credentials and OPENAI_API_KEY (or
+      EMBEDDING_BASE_URL/EMBEDDING_API_KEY, see misc/llm_gateway.py for the
+      rate settings)
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# The gateway lives with the other shared tools in misc/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "misc"))
+
+from llm_gateway import LLMGateway  # noqa: E402
+
+PAGE_SIZE = 1000
+EMBEDDING_BATCH_SIZE = 100
+# Longer texts are cut to stay below the embedding model's input limit
+MAX_TEXT_CHARS = 24000
+
+
+def quote(name: str) -> str:
+    """Backtick-quote a label or property name."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+class EmbeddingBackfill:
+    """Embed the text property of nodes that are missing a vector."""
+
+    def __init__(
+        self,
+        driver,
+        gateway: LLMGateway,
+        label: str = "Movie",
+        text_property: str = "plot",
+        embedding_property: str = "plotEmbedding",
+        database: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            driver: Neo4j driver
+            gateway: LLM gateway used for the embeddings
+            label: Label of the nodes to embed
+            text_property: Property holding the text
+            embedding_property: Property receiving the vector
+            database: Neo4j database name
+            page_size: Nodes read and written per page
+            batch_size: Texts per embedding request
+        """
+        self.logger = logging.getLogger(__name__)
+        self.driver = driver
+        self.gateway = gateway
+        self.label = label
+        self.text_property = text_property
+        self.embedding_property = embedding_property
+        self.database = database
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.stats = {"embedded": 0, "failed": 0, "pages": 0}
+        self.missing = f"""
+            n.{quote(embedding_property)} IS NULL
+            AND n.{quote(text_property)} IS NOT NULL AND n.{quote(text_property)} <> ''
+        """
+
+    def count_missing(self) -> int:
+        with self.driver.session(database=self.database) as session:
+            return session.run(
+                f"MATCH (n:{quote(self.label)}) WHERE {self.missing} RETURN count(n) AS missing"
+            ).single()["missing"]
+
+    def iter_pages(self) -> Iterator[List[Tuple[str, str]]]:
+        """Stream (element id, text) of the nodes missing a vector, one page at a time."""
+        with self.driver.session(database=self.database, fetch_size=self.page_size) as session:
+            result = session.run(
+                f"""
+                MATCH (n:{quote(self.label)})
+                WHERE {self.missing}
+                RETURN elementId(n) AS id, n.{quote(self.text_property)} AS text
+                """
+            )
+            page = []
+            for record in result:
+                page.append((record["id"], record["text"]))
+                if len(page) == self.page_size:
+                    yield page
+                    page = []
+            if page:
+                yield page
+
+    def write(self, rows: List[Dict]):
+        """Store one page of vectors."""
+        if not rows:
+            return
+
+        def work(tx):
+            tx.run(
+                """
+                UNWIND $rows AS row
+                MATCH (n) WHERE elementId(n) = row.id
+                CALL db.create.setNodeVectorProperty(n, $property, row.embedding)
+                """,
+                rows=rows, property=self.embedding_property,
+            ).consume()
+
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(work)
+
+    async def embed_page(self, page: List[Tuple[str, str]]) -> List[Dict]:
+        """Embed a page in concurrent batches; nodes of failed batches are skipped."""
+        batches = [page[i:i + self.batch_size] for i in range(0, len(page), self.batch_size)]
+        results = await asyncio.gather(
+            *(self.gateway.embed([str(text)[:MAX_TEXT_CHARS] for _, text in batch]) for batch in batches),
+            return_exceptions=True,
+        )
+        rows = []
+        for batch, vectors in zip(batches, results):
+            if isinstance(vectors, BaseException):
+                self.logger.warning(f"Embedding batch of {len(batch)} nodes failed: {vectors}")
+                self.stats["failed"] += len(batch)
+                continue
+            rows.extend({"id": node_id, "embedding": vector} for (node_id, _), vector in zip(batch, vectors))
+        return rows
+
+    async def run(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Backfill the nodes that are missing a vector.
+
+        Args:
+            limit: Stop after about this many nodes
+        """
+        start = time.time()
+        total = await asyncio.to_thread(self.count_missing)
+        self.logger.info(f"{total:,} {self.label} nodes without {self.embedding_property}")
+
+        pages = self.iter_pages()
+        pending = None
+        processed = 0
+        try:
+            while limit is None or processed < limit:
+                # The cursor is only ever advanced by one thread at a time
+                page = await asyncio.to_thread(next, pages, None)
+                if page is None:
+                    break
+                rows = await self.embed_page(page)
+                if pending:
+                    await pending
+                # Write this page while the next one is read and embedded
+                pending = asyncio.ensure_future(asyncio.to_thread(self.write, rows))
+
+                processed += len(page)
+                self.stats["pages"] += 1
+                self.stats["embedded"] += len(rows)
+                elapsed = max(time.time() - start, 1e-9)
+                rate = processed / elapsed
+                remaining = max(total - processed, 0)
+                self.logger.info(
+                    f"{processed:,}/{total:,} nodes, {rate:.1f} nodes/s, "
+                    f"{self.gateway.metrics.report()['tokensPerSecond']:.0f} tokens/s, "
+                    f"ETA {remaining / rate if rate else 0:.0f}s"
+                )
+            if pending:
+                await pending
+        finally:
+            await asyncio.to_thread(pages.close)
+
+        self.logger.info(
+            f"Embedded {self.stats['embedded']:,} nodes ({self.stats['failed']:,} failed) "
+            f"in {time.time() - start:.1f}s"
+        )
+        return self.stats
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Embed nodes that have no vector yet")
+    parser.add_argument("--label", default="Movie")
+    parser.add_argument("--text-property", default="plot")
+    parser.add_argument("--embedding-property", default="plotEmbedding")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Nodes per page")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE, help="Texts per embedding request")
+    parser.add_argument("--limit", type=int, help="Stop after about this many nodes")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+    )
+
+    async def run():
+        async with LLMGateway.from_env("embeddings") as gateway:
+            backfill = EmbeddingBackfill(
+                driver, gateway, args.label, args.text_property, args.embedding_property,
+                os.getenv("NEO4J_DATABASE", "neo4j"), args.page_size, args.batch_size,
+            )
+            return await backfill.run(limit=args.limit)
+
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        logging.error(f"Embedding backfill failed: {e}")
+        return 1
+    finally:
+        driver.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Parallel Topic Extraction
+
+Extracts noun phrases with TextBlob from the text of every `Chunk` and
+`Answer` node and links them as `(:Chunk)-[:HAS_TOPIC]->(:Topic)`.
+Processed nodes are stamped with `topicsExtractedAt`, so nodes whose text
+yields no topics are not read again on the next run.
+Text is streamed from the graph in pages, noun-phrase extraction is fanned out
+over a process pool and results are cached by text hash, so repeated text is
+only processed once. Topics are written back in batched UNWIND statements.
+
+Usage:
+    python extract_topics.py [--workers N] [--page-size N]
+
+Requirements:
+    - Neo4j database running and accessible
+    - .env file with database credentials
+    - TextBlob corpora (python -m textblob.download_corpora)
+"""
+
+import os
+import json
+import hashlib
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase, Driver
+
+PAGE_SIZE = 500
+WRITE_BATCH_SIZE = 1000
+TEXT_LABELS = ["Chunk", "Answer"]
+
+
+def text_hash(text: str) -> str:
+    """Return the cache key for a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def extract_topics(texts: List[str]) -> List[List[str]]:
+    """Extract the distinct noun phrases of each text (runs in a worker process)."""
+    from textblob import TextBlob
+
+    return [sorted(set(TextBlob(text).noun_phrases)) for text in texts]
+
+
+class TopicExtractor:
+    """Stream text from the graph, extract topics in parallel and write them back."""
+
+    def __init__(
+        self,
+        driver: Driver,
+        database: str = "neo4j",
+        workers: Optional[int] = None,
+        page_size: int = PAGE_SIZE,
+        cache_file: Optional[str] = None,
+    ):
+        self.driver = driver
+        self.database = database
+        self.workers = workers or os.cpu_count() or 1
+        self.page_size = page_size
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.cache: Dict[str, List[str]] = {}
+        self.logger = logging.getLogger(__name__)
+        self.stats = {"nodes": 0, "extracted": 0, "cached": 0, "topics": 0}
+
+    def load_cache(self):
+        """Load previously extracted topics keyed by text hash."""
+        if self.cache_file and self.cache_file.exists():
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+            self.logger.info(f"Loaded {len(self.cache)} cached texts from {self.cache_file}")
+
+    def save_cache(self):
+        """Persist the topic cache."""
+        if self.cache_file:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f)
+
+    def create_constraints(self):
+        """Make sure Topic nodes can be merged by name through an index."""
+        with self.driver.session(database=self.database) as session:
+            session.run(
+                "CREATE CONSTRAINT Topic_name IF NOT EXISTS "
+                "FOR (t:Topic) REQUIRE t.name IS UNIQUE"
+            ).consume()
+
+    def iter_pages(self) -> Iterator[List[Dict]]:
+        """Stream unprocessed nodes from the graph in pages, one label scan per label."""
+        with self.driver.session(database=self.database, fetch_size=self.page_size) as session:
+            page = []
+            for label in TEXT_LABELS:
+                query = f"""
+                    MATCH (n:{label})
+                    WHERE n.text IS NOT NULL AND n.topicsExtractedAt IS NULL
+                    RETURN elementId(n) AS id, n.text AS text
+                """
+                for record in session.run(query):
+                    page.append({"id": record["id"], "text": record["text"]})
+                    if len(page) == self.page_size:
+                        yield page
+                        page = []
+            if page:
+                yield page
+
+    def write_topics(self, rows: List[Dict]):
+        """Write HAS_TOPIC relationships in batches and mark every node as processed."""
+        query = """
+            UNWIND $rows AS row
+            MATCH (n) WHERE elementId(n) = row.id
+            SET n.topicsExtractedAt = datetime()
+            WITH n, row
+            UNWIND row.topics AS name
+            MERGE (t:Topic {name: name})
+            MERGE (n)-[:HAS_TOPIC]->(t)
+        """
+        with self.driver.session(database=self.database) as session:
+            for i in range(0, len(rows), WRITE_BATCH_SIZE):
+                batch = rows[i:i + WRITE_BATCH_SIZE]
+                session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+                self.stats["topics"] += sum(len(row["topics"]) for row in batch)
+
+    def resolve(self, page: List[Dict], results: Dict[str, List[str]]) -> List[Dict]:
+        """Attach topics to the nodes of a page using the cache."""
+        self.cache.update(results)
+        return [
+            {"id": node["id"], "topics": self.cache[node["hash"]]}
+            for node in page
+        ]
+
+    def run(self):
+        """Extract and write topics for every node that has not been processed yet."""
+        self.load_cache()
+        self.create_constraints()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            inflight = set()
+            for page in self.iter_pages():
+                uncached = {}
+                for node in page:
+                    node["hash"] = text_hash(node["text"])
+                    if node["hash"] in self.cache or node["hash"] in inflight:
+                        self.stats["cached"] += 1
+                    else:
+                        uncached.setdefault(node["hash"], node["text"])
+                self.stats["nodes"] += len(page)
+                self.stats["extracted"] += len(uncached)
+
+                hashes = list(uncached)
+                inflight.update(hashes)
+                future = pool.submit(extract_topics, [uncached[h] for h in hashes])
+                pending.append((future, page, hashes))
+
+                # Keep the pool busy while bounding the pages held in memory
+                while len(pending) >= self.workers * 2:
+                    self.drain(pending.popleft(), inflight)
+
+            while pending:
+                self.drain(pending.popleft(), inflight)
+
+        self.save_cache()
+        self.logger.info(
+            f"Processed {self.stats['nodes']} nodes: {self.stats['extracted']} extracted, "
+            f"{self.stats['cached']} from cache, {self.stats['topics']} topic links written"
+        )
+        return self.stats
+
+    def drain(self, item, inflight: set):
+        """Write the results of the oldest page once its extraction finished.
+
+        Pages are drained in submission order, so text first seen on an
+        earlier page is always cached by the time a later page needs it.
+        """
+        future, page, hashes = item
+        results = dict(zip(hashes, future.result()))
+        inflight.difference_update(hashes)
+        self.write_topics(self.resolve(page, results))
+        self.logger.info(f"Processed {self.stats['nodes']} nodes...")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Extract topics from Chunk and Answer text")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Nodes per page")
+    parser.add_argument("--cache-file", default="topics_cache.json", help="Topic cache file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+    )
+    try:
+        TopicExtractor(
+            driver,
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
+            workers=args.workers,
+            page_size=args.page_size,
+            cache_file=args.cache_file,
+        ).run()
+    except Exception as e:
+        logging.error(f"Topic extraction failed: {e}")
+        return 1
+    finally:
+        driver.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
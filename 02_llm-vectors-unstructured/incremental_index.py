@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Incremental Chunk Indexer
+
+Keeps the `chunkVector` store in sync with the asciidoc lesson corpus without
+rebuilding it. Lessons are streamed one file at a time, split with the same
+CharacterTextSplitter settings as 03_unstructured_data.ipynb and every chunk is
+identified by a content hash. Only chunks that are not in the graph yet are
+embedded and written; chunks of edited or removed lessons are deleted.
+
+Usage:
+    python incremental_index.py
+
+Requirements:
+    - Neo4j database running and accessible
+    - .env file with database credentials and OPENAI_API_KEY
+"""
+
+import os
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Set, Tuple
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase, Driver
+
+COURSES_PATH = "llm-vectors-unstructured/data/asciidoc"
+INDEX_NAME = "chunkVector"
+EMBEDDING_BATCH_SIZE = 100
+WRITE_BATCH_SIZE = 500
+
+
+def content_hash(text: str) -> str:
+    """Return a stable hex digest for a piece of text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Identify a chunk by the lesson it belongs to and its content."""
+    return content_hash(f"{source}\n{text}")
+
+
+def iter_lessons(root: str, pattern: str = "**/lesson.adoc") -> Iterator[Tuple[str, str]]:
+    """Yield (source, text) for every lesson file, reading one file at a time."""
+    for path in sorted(Path(root).glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            yield str(path), f.read()
+
+
+def plan_source(
+    existing_ids: Set[str], chunk_ids: List[str]
+) -> Tuple[List[int], Set[str]]:
+    """
+    Compare the chunks stored for a lesson with the chunks it splits into now.
+
+    Returns:
+        Positions in chunk_ids that need embedding and the stored ids to delete
+    """
+    current = set(chunk_ids)
+    seen: Set[str] = set()
+    to_embed = []
+    for position, cid in enumerate(chunk_ids):
+        if cid in existing_ids or cid in seen:
+            continue
+        seen.add(cid)
+        to_embed.append(position)
+    return to_embed, existing_ids - current
+
+
+class IncrementalChunkIndexer:
+    """Embed and write only the lesson chunks that changed since the last run."""
+
+    def __init__(self, driver: Driver, embeddings, database: str = "neo4j"):
+        from langchain.text_splitter import CharacterTextSplitter
+
+        self.driver = driver
+        self.embeddings = embeddings
+        self.database = database
+        self.logger = logging.getLogger(__name__)
+        self.text_splitter = CharacterTextSplitter(
+            separator="\n\n",
+            chunk_size=1500,
+            chunk_overlap=200,
+        )
+        self.stats = {"files": 0, "skipped": 0, "embedded": 0, "deleted": 0}
+
+    def run_query(self, query: str, parameters: Dict = None) -> List[Dict]:
+        """Execute a Cypher query and return its records as dictionaries."""
+        with self.driver.session(database=self.database) as session:
+            return session.run(query, parameters or {}).data()
+
+    def create_schema(self, dimensions: int):
+        """Create the chunk id constraint and the vector index if missing."""
+        self.run_query(
+            "CREATE CONSTRAINT Chunk_id IF NOT EXISTS "
+            "FOR (c:Chunk) REQUIRE c.id IS UNIQUE"
+        )
+        self.run_query(
+            f"""
+            CREATE VECTOR INDEX {INDEX_NAME} IF NOT EXISTS
+            FOR (c:Chunk)
+            ON c.embedding
+            OPTIONS {{indexConfig: {{
+             `vector.dimensions`: {dimensions},
+             `vector.similarity_function`: 'cosine'
+            }}}}
+            """
+        )
+
+    def load_state(self) -> Dict[str, Tuple[str, Set[str]]]:
+        """Return {source: (file hash, chunk ids)} for everything indexed so far."""
+        records = self.run_query(
+            """
+            MATCH (c:Chunk)
+            WHERE c.source IS NOT NULL
+            WITH c.source AS source, collect(c.id) AS ids,
+                 collect(DISTINCT c.fileHash) AS hashes, count(c.fileHash) = count(c) AS complete
+            RETURN source,
+                   CASE WHEN complete AND size(hashes) = 1 THEN hashes[0] END AS fileHash,
+                   ids
+            """
+        )
+        return {r["source"]: (r["fileHash"], set(r["ids"])) for r in records}
+
+    def delete_chunks(self, ids: Set[str]):
+        """Delete chunks by id in batches."""
+        ids = list(ids)
+        for i in range(0, len(ids), WRITE_BATCH_SIZE):
+            self.run_query(
+                """
+                UNWIND $ids AS id
+                MATCH (c:Chunk {id: id})
+                DETACH DELETE c
+                """,
+                {"ids": ids[i:i + WRITE_BATCH_SIZE]},
+            )
+        self.stats["deleted"] += len(ids)
+
+    def delete_sources(self, sources: List[str]):
+        """Delete every chunk of lessons that no longer exist on disk."""
+        for source in sources:
+            self.run_query(
+                """
+                MATCH (c:Chunk {source: $source})
+                DETACH DELETE c
+                """,
+                {"source": source},
+            )
+            self.logger.info(f"Removed chunks of deleted lesson {source}")
+
+    def write_chunks(self, records: List[Dict]):
+        """Create chunk nodes with their embeddings in batches."""
+        for i in range(0, len(records), WRITE_BATCH_SIZE):
+            self.run_query(
+                """
+                UNWIND $records AS record
+                MERGE (c:Chunk {id: record.id})
+                SET c.text = record.text,
+                    c.source = record.source
+                WITH c, record
+                CALL db.create.setNodeVectorProperty(c, 'embedding', record.embedding)
+                """,
+                {"records": records[i:i + WRITE_BATCH_SIZE]},
+            )
+
+    def mark_source(self, source: str, file_hash: str):
+        """Record the file hash on all chunks of a lesson once it is fully indexed."""
+        self.run_query(
+            """
+            MATCH (c:Chunk {source: $source})
+            SET c.fileHash = $fileHash
+            """,
+            {"source": source, "fileHash": file_hash},
+        )
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches."""
+        vectors = []
+        for i in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            vectors.extend(self.embeddings.embed_documents(texts[i:i + EMBEDDING_BATCH_SIZE]))
+        return vectors
+
+    def index_source(self, source: str, text: str, existing_ids: Set[str]):
+        """Bring the chunks of a single lesson up to date."""
+        file_hash = content_hash(text)
+        chunks = self.text_splitter.split_text(text)
+        ids = [chunk_id(source, chunk) for chunk in chunks]
+
+        to_embed, stale = plan_source(existing_ids, ids)
+        if to_embed:
+            texts = [chunks[p] for p in to_embed]
+            vectors = self.embed(texts)
+            if not self.stats["embedded"]:
+                self.create_schema(len(vectors[0]))
+            self.write_chunks([
+                {
+                    "id": ids[p],
+                    "text": chunks[p],
+                    "source": source,
+                    "embedding": vector,
+                }
+                for p, vector in zip(to_embed, vectors)
+            ])
+            self.stats["embedded"] += len(to_embed)
+        if stale:
+            self.delete_chunks(stale)
+        self.mark_source(source, file_hash)
+
+        self.logger.info(
+            f"{source}: {len(chunks)} chunks, {len(to_embed)} embedded, {len(stale)} deleted"
+        )
+
+    def run(self, root: str = COURSES_PATH):
+        """Index the lesson corpus under root incrementally."""
+        state = self.load_state()
+        self.logger.info(f"Found {len(state)} indexed lessons")
+
+        seen = set()
+        for source, text in iter_lessons(root):
+            seen.add(source)
+            self.stats["files"] += 1
+            stored_hash, existing_ids = state.get(source, (None, set()))
+            if stored_hash == content_hash(text):
+                self.stats["skipped"] += 1
+                continue
+            self.index_source(source, text, existing_ids)
+
+        removed = [source for source in state if source not in seen]
+        if removed:
+            self.delete_sources(removed)
+
+        self.logger.info(
+            f"Indexed {self.stats['files']} lessons: {self.stats['skipped']} unchanged, "
+            f"{self.stats['embedded']} chunks embedded, {self.stats['deleted']} chunks deleted, "
+            f"{len(removed)} lessons removed"
+        )
+        return self.stats
+
+
+def main():
+    """Main entry point."""
+    from langchain_openai import OpenAIEmbeddings
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+    )
+    try:
+        indexer = IncrementalChunkIndexer(
+            driver,
+            OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY")),
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
+        )
+        indexer.run()
+    except Exception as e:
+        logging.error(f"Incremental indexing failed: {e}")
+        return 1
+    finally:
+        driver.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,12 +1,23 @@
 import os
+import sys
+from pathlib import Path
 from neo4j import Driver
 import openai
 
+# The query cache lives with the other shared tools in misc/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "misc"))
+
+from query_cache import get_cache  # noqa: E402
+
 
 def execute_query(driver: Driver, query: str, parameters: dict = None):
-    with driver.session() as session:
-        result = session.run(query, parameters)
-        return result.data()
+    """Rows of a query as dictionaries; reads go through the shared query cache when it is enabled."""
+    def fetch():
+        with driver.session() as session:
+            result = session.run(query, parameters)
+            return result.data()
+
+    return get_cache().run(driver, query, parameters, fetch)
 
 
 def create_embedding(text: str):
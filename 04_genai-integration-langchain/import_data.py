@@ -15,6 +15,11 @@ neo4j_db = os.getenv("NEO4J_DATABASE")
 
 neo4j_driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_pass))
 
+# The graph is wiped first, but LOAD CSV rows are streamed: deduplicating them
+# in the query would need an aggregation over the whole file, held in heap
+# before anything is written. The CSV loads therefore MERGE on the keys backed
+# by the uniqueness constraints (last row wins through SET), and CREATE is only
+# used for the genres, which are derived from the loaded movies.
 cypher = textwrap.dedent("""
     MATCH (p:Person) DETACH DELETE p;
     MATCH (m:Movie) DETACH DELETE m;
@@ -44,7 +49,9 @@ cypher = textwrap.dedent("""
 
     LOAD CSV WITH HEADERS
     FROM 'https://data.neo4j.com/importing-cypher/persons.csv' AS row
-    MERGE (p:Person {tmdbId: toInteger(row.person_tmdbId)})
+    WITH row, toInteger(row.person_tmdbId) AS tmdbId
+    WHERE tmdbId IS NOT NULL
+    MERGE (p:Person {tmdbId: tmdbId})
     SET
     p.imdbId = toInteger(row.person_imdbId),
     p.bornIn = row.bornIn,
@@ -57,7 +64,9 @@ cypher = textwrap.dedent("""
 
     LOAD CSV WITH HEADERS
     FROM 'https://data.neo4j.com/importing-cypher/movies.csv' AS row
-    MERGE (m:Movie {movieId: toInteger(row.movieId)})
+    WITH row, toInteger(row.movieId) AS movieId
+    WHERE movieId IS NOT NULL
+    MERGE (m:Movie {movieId: movieId})
     SET
     m.tmdbId = toInteger(row.movie_tmdbId),
     m.imdbId = toInteger(row.movie_imdbId),
@@ -95,14 +104,13 @@ cypher = textwrap.dedent("""
     MATCH (p:Person)-[:DIRECTED]->()
     WITH DISTINCT p SET p:Director;
 
-    CALL () {
     LOAD CSV WITH HEADERS
     FROM 'https://data.neo4j.com/importing-cypher/ratings.csv' AS row
     WITH row
     WHERE row.movieId IS NOT NULL AND row.userId IS NOT NULL
+    CALL (row) {
     MERGE (u:User {userId: toInteger(row.userId)})
-        ON CREATE SET u.name = row.name
-        ON MATCH  SET u.name = coalesce(row.name, u.name)
+    SET u.name = coalesce(row.name, u.name)
     WITH u, row
     MATCH (m:Movie {movieId: toInteger(row.movieId)})
     MERGE (u)-[r:RATED]->(m)
@@ -113,10 +121,17 @@ cypher = textwrap.dedent("""
 
     MATCH (m:Movie)
     UNWIND m.genres AS genreName
-    WITH m, trim(genreName) AS genreName
+    WITH trim(genreName) AS genreName
     WHERE genreName <> ''
-    MERGE (g:Genre {name: genreName})
-    MERGE (m)-[:IN_GENRE]->(g);
+    WITH DISTINCT genreName
+    CREATE (:Genre {name: genreName});
+
+    MATCH (m:Movie)
+    UNWIND m.genres AS genreName
+    WITH DISTINCT m, trim(genreName) AS genreName
+    WHERE genreName <> ''
+    MATCH (g:Genre {name: genreName})
+    CREATE (m)-[:IN_GENRE]->(g);
     """)
 
 # Split the Cypher script into individual statements
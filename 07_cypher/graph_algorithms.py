@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+In-Process Graph Algorithms
+
+Runs PageRank, weakly connected components and label propagation on the
+movie graph without the Graph Data Science plugin (the Makefile only installs
+APOC):
+
+    1. project a label/relationship subgraph into CSR arrays: node ids are
+       renumbered to int32 and edges stored as indptr (int64) + indices
+       (int32), about 4 bytes per edge plus 8 bytes per node. Nodes and
+       relationships are streamed from Neo4j in pages of --fetch-size records
+       into typed arrays, never into Python dicts.
+    2. run the vectorized algorithm in memory
+    3. write the scores back to the nodes in batches
+
+Nodes are matched by their internal id both when projecting and when writing
+back, which keeps the projection to integers and the write-back to an id seek.
+
+Algorithms:
+    pagerank     - PageRank over the projected relationships (writes pagerank)
+    wcc          - weakly connected components (writes componentId)
+    communities  - label propagation over the co-occurrence graph of the
+                   projection, e.g. co-actors sharing a movie (writes communityId)
+
+Usage:
+    python graph_algorithms.py pagerank
+    python graph_algorithms.py wcc --labels Person,Movie --relationships ACTED_IN,DIRECTED
+    python graph_algorithms.py communities --relationships ACTED_IN --dry-run
+
+Requirements:
+    - numpy, scipy
+    - .env file with NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DATABASE
+"""
+
+import os
+import time
+import logging
+import argparse
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Weight of a node's own label in label propagation, so ties keep the current label
+SELF_WEIGHT = 1e-6
+
+
+class CSRGraph:
+    """Directed graph in compressed sparse row form with int32 node ids."""
+
+    def __init__(self, node_ids: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 weights: Optional[np.ndarray] = None):
+        """
+        Args:
+            node_ids: Neo4j id of every projected node, position = int32 id
+            indptr: Offsets into indices, one per node plus one
+            indices: Target int32 id of every edge, grouped by source
+            weights: Optional float32 weight of every edge
+        """
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+                   weights: Optional[np.ndarray] = None) -> "CSRGraph":
+        """Build a CSR graph from edges given as positions into node_ids."""
+        n = len(node_ids)
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        return cls(
+            node_ids,
+            indptr,
+            targets[order].astype(np.int32),
+            None if weights is None else weights[order].astype(np.float32),
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def matrix(self) -> sparse.csr_matrix:
+        """Adjacency matrix sharing the CSR arrays."""
+        data = self.weights if self.weights is not None else np.ones(self.edge_count, dtype=np.float32)
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=(self.node_count, self.node_count))
+
+    def co_occurrence(self) -> "CSRGraph":
+        """Graph linking sources that share a target, weighted by shared targets.
+
+        For Person-[:ACTED_IN]->Movie this is the co-actor graph.
+        """
+        adjacency = self.matrix()
+        adjacency.data[:] = 1
+        shared = (adjacency @ adjacency.T).tocsr()
+        shared.setdiag(0)
+        shared.eliminate_zeros()
+        return CSRGraph(self.node_ids, shared.indptr.astype(np.int64), shared.indices.astype(np.int32),
+                        shared.data.astype(np.float32))
+
+
+def quote(name: str) -> str:
+    """Backtick-quote a label or relationship type."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def project(driver, labels: List[str], relationship_types: List[str], database: Optional[str] = None,
+            fetch_size: int = 100000) -> CSRGraph:
+    """Stream a label/relationship subgraph from Neo4j into a CSR graph.
+
+    Nodes are read with one label scan per label and relationships with one
+    type scan per type; relationships whose ends are not projected nodes are
+    dropped client-side.
+
+    Args:
+        driver: Neo4j driver
+        labels: Labels of the projected nodes
+        relationship_types: Types of the projected relationships
+        database: Neo4j database name
+        fetch_size: Records pulled from the server per page
+    """
+    start = time.time()
+    node_ids = array("q")
+    sources, targets = array("q"), array("q")
+    with driver.session(database=database, fetch_size=fetch_size) as session:
+        for label in labels:
+            for record in session.run(f"MATCH (n:{quote(label)}) RETURN id(n) AS id"):
+                node_ids.append(record["id"])
+        for relationship_type in relationship_types:
+            for record in session.run(
+                f"MATCH (a)-[:{quote(relationship_type)}]->(b) RETURN id(a) AS source, id(b) AS target"
+            ):
+                sources.append(record["source"])
+                targets.append(record["target"])
+
+    # Nodes with several projected labels were read once per label
+    ids = np.unique(np.frombuffer(node_ids, dtype=np.int64))
+    source_ids = np.frombuffer(sources, dtype=np.int64)
+    target_ids = np.frombuffer(targets, dtype=np.int64)
+    source_positions = np.minimum(np.searchsorted(ids, source_ids), max(len(ids) - 1, 0))
+    target_positions = np.minimum(np.searchsorted(ids, target_ids), max(len(ids) - 1, 0))
+    projected = ((ids[source_positions] == source_ids) & (ids[target_positions] == target_ids)
+                 if len(ids) else np.zeros(len(source_ids), dtype=bool))
+    graph = CSRGraph.from_edges(
+        ids,
+        source_positions[projected].astype(np.int32),
+        target_positions[projected].astype(np.int32),
+    )
+    logger.info(f"Projected {graph.node_count:,} nodes and {graph.edge_count:,} relationships "
+                f"in {time.time() - start:.1f}s")
+    return graph
+
+
+def pagerank(graph: CSRGraph, damping: float = 0.85, max_iterations: int = 50,
+             tolerance: float = 1e-7) -> np.ndarray:
+    """PageRank scores summing to 1; rank of dangling nodes is spread evenly."""
+    n = graph.node_count
+    if n == 0:
+        return np.zeros(0)
+    out_degree = graph.out_degree().astype(np.float64)
+    dangling = out_degree == 0
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=~dangling)
+    incoming = graph.matrix().T.tocsr()
+
+    ranks = np.full(n, 1.0 / n)
+    for iteration in range(max_iterations):
+        spread = damping * ranks[dangling].sum() / n
+        updated = damping * (incoming @ (ranks * inverse_degree)) + (1 - damping) / n + spread
+        delta = np.abs(updated - ranks).sum()
+        ranks = updated
+        if delta < tolerance:
+            break
+    return ranks
+
+
+def weakly_connected_components(graph: CSRGraph) -> np.ndarray:
+    """Component number of every node, ignoring edge direction."""
+    _, components = csgraph.connected_components(graph.matrix(), directed=True, connection="weak")
+    return components.astype(np.int32)
+
+
+def label_propagation(graph: CSRGraph, max_iterations: int = 20) -> np.ndarray:
+    """Community of every node by synchronous weighted label propagation.
+
+    Every node takes the label with the largest total edge weight among its
+    neighbours; ties keep the current label, then prefer the smallest label.
+    """
+    n = graph.node_count
+    labels = np.arange(n, dtype=np.int32)
+    nodes = np.arange(n, dtype=np.int32)
+    sources = np.concatenate([np.repeat(nodes, graph.out_degree()), nodes])
+    weights = np.concatenate([
+        graph.weights if graph.weights is not None else np.ones(graph.edge_count, dtype=np.float32),
+        np.full(n, SELF_WEIGHT, dtype=np.float32),
+    ])
+
+    for iteration in range(max_iterations):
+        candidates = np.concatenate([labels[graph.indices], labels])
+        order = np.lexsort((candidates, sources))
+        node, label, weight = sources[order], candidates[order], weights[order]
+
+        # Total weight of every (node, label) pair
+        starts = np.flatnonzero(np.r_[True, (node[1:] != node[:-1]) | (label[1:] != label[:-1])])
+        node, label, weight = node[starts], label[starts], np.add.reduceat(weight, starts)
+
+        # Heaviest label of every node
+        order = np.lexsort((label, -weight, node))
+        node, label = node[order], label[order]
+        first = np.r_[True, node[1:] != node[:-1]]
+        updated = labels.copy()
+        updated[node[first]] = label[first]
+
+        changed = int((updated != labels).sum())
+        labels = updated
+        if changed == 0:
+            break
+    return labels
+
+
+def write_back(driver, graph: CSRGraph, property_name: str, values: np.ndarray,
+               mask: Optional[np.ndarray] = None, database: Optional[str] = None, batch_size: int = 10000) -> int:
+    """Set a property on the projected nodes in batches.
+
+    Returns:
+        Number of nodes written
+    """
+    positions = np.flatnonzero(mask) if mask is not None else np.arange(graph.node_count)
+
+    def work(tx, rows):
+        tx.run("""
+            UNWIND $rows AS row
+            MATCH (n) WHERE id(n) = row.id
+            SET n += row.properties
+        """, rows=rows).consume()
+
+    with driver.session(database=database) as session:
+        for offset in range(0, len(positions), batch_size):
+            # Only the current batch is converted to Python objects
+            batch = positions[offset:offset + batch_size]
+            rows = [
+                {"id": node_id, "properties": {property_name: value}}
+                for node_id, value in zip(graph.node_ids[batch].tolist(), values[batch].tolist())
+            ]
+            session.execute_write(work, rows)
+    return len(positions)
+
+
+def summarize(values: np.ndarray, mask: np.ndarray) -> Dict[str, float]:
+    """Size figures of a community or component assignment."""
+    sizes = np.bincount(values[mask])
+    sizes = sizes[sizes > 0]
+    return {"groups": len(sizes), "largest": int(sizes.max()) if len(sizes) else 0}
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Run graph algorithms on a projection of the movie graph")
+    parser.add_argument("algorithm", choices=["pagerank", "wcc", "communities"])
+    parser.add_argument("--labels", default="Person,Movie", help="Comma-separated node labels")
+    parser.add_argument("--relationships", default="ACTED_IN,DIRECTED", help="Comma-separated relationship types")
+    parser.add_argument("--property", help="Property to write, defaults to pagerank/componentId/communityId")
+    parser.add_argument("--fetch-size", type=int, default=100000, help="Records per streamed page")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Nodes per write transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Compute without writing back")
+    args = parser.parse_args()
+
+    load_dotenv()
+    from neo4j import GraphDatabase
+
+    database = os.getenv("NEO4J_DATABASE")
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    )
+    try:
+        graph = project(driver, args.labels.split(","), args.relationships.split(","), database, args.fetch_size)
+        start = time.time()
+        mask = None
+        if args.algorithm == "pagerank":
+            property_name, values = "pagerank", pagerank(graph)
+            top = np.argsort(-values)[:5]
+            logger.info("Top nodes: " + ", ".join(f"{graph.node_ids[i]}={values[i]:.5f}" for i in top))
+        elif args.algorithm == "wcc":
+            property_name, values = "componentId", weakly_connected_components(graph)
+            logger.info(f"Components: {summarize(values, np.ones(graph.node_count, dtype=bool))}")
+        else:
+            # Only nodes with outgoing relationships (e.g. actors) belong to the co-occurrence graph
+            mask = graph.out_degree() > 0
+            property_name, values = "communityId", label_propagation(graph.co_occurrence())
+            logger.info(f"Communities: {summarize(values, mask)}")
+        logger.info(f"Computed {args.algorithm} in {time.time() - start:.1f}s")
+
+        if not args.dry_run:
+            written = write_back(driver, graph, args.property or property_name, values, mask,
+                                 database, args.batch_size)
+            logger.info(f"Wrote {args.property or property_name} on {written:,} nodes")
+    except Exception as e:
+        logger.error(f"Graph algorithm failed: {e}")
+        return 1
+    finally:
+        driver.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Item-Item Similarity Job
+
+Precomputes "users who liked X also liked" neighbours so recommendation
+queries become one-hop lookups instead of traversing every co-rater:
+
+    1. stream (userId, movieId, rating) from the RATED relationships, or read
+       them from ratings.csv
+    2. build a sparse user x movie matrix (SciPy CSR)
+    3. compute top-k cosine or adjusted-cosine (ratings centred on each
+       user's mean) movie-movie similarities in blocks of movies, each block
+       one sparse matrix product
+    4. write the new (:Movie)-[:SIMILAR {score, runId}]->(:Movie) relationships
+       in bulk, then delete those of earlier runs
+
+A run that fails part-way removes what it wrote and leaves the previous
+similarities in place.
+
+Usage:
+    python item_similarity.py                          # from Neo4j, write back
+    python item_similarity.py --metric cosine --top-k 20 --min-overlap 3
+    python item_similarity.py --csv ../01_import-data/data/ratings.csv --dry-run
+
+Requirements:
+    - numpy, scipy
+    - .env file with NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DATABASE
+"""
+
+import os
+import csv
+import time
+import uuid
+import logging
+import argparse
+from array import array
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of users who rated both movies of a pair
+MIN_OVERLAP = 2
+
+RATINGS_QUERY = """
+    MATCH (u:User)-[r:RATED]->(m:Movie)
+    RETURN u.userId AS userId, m.movieId AS movieId, r.rating AS rating
+"""
+
+# One-hop lookups served by the precomputed relationships
+SIMILAR_MOVIES_QUERY = """
+    MATCH (:Movie {title: $title})-[s:SIMILAR]->(m:Movie)
+    RETURN m.title AS title, s.score AS score
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+RECOMMEND_FOR_USER_QUERY = """
+    MATCH (u:User {userId: $userId})-[r:RATED]->(:Movie)-[s:SIMILAR]->(m:Movie)
+    WHERE r.rating >= $minRating AND NOT (u)-[:RATED]->(m)
+    RETURN m.title AS title, sum(s.score * r.rating) AS score
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+
+def load_ratings_csv(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Read userId, movieId and rating columns from a ratings CSV file."""
+    users, movies, ratings = array("q"), array("q"), array("f")
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            if row.get("userId") and row.get("movieId") and row.get("rating"):
+                users.append(int(row["userId"]))
+                movies.append(int(row["movieId"]))
+                ratings.append(float(row["rating"]))
+    return np.frombuffer(users, dtype=np.int64), np.frombuffer(movies, dtype=np.int64), \
+        np.frombuffer(ratings, dtype=np.float32)
+
+
+def fetch_ratings(driver, database: Optional[str] = None,
+                  fetch_size: int = 10000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stream ratings from Neo4j into compact typed arrays."""
+    users, movies, ratings = array("q"), array("q"), array("f")
+    with driver.session(database=database, fetch_size=fetch_size) as session:
+        for record in session.run(RATINGS_QUERY):
+            if record["rating"] is None:
+                continue
+            users.append(record["userId"])
+            movies.append(record["movieId"])
+            ratings.append(record["rating"])
+    return np.frombuffer(users, dtype=np.int64), np.frombuffer(movies, dtype=np.int64), \
+        np.frombuffer(ratings, dtype=np.float32)
+
+
+def build_matrix(users: np.ndarray, movies: np.ndarray,
+                 ratings: np.ndarray) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Build the user x movie rating matrix.
+
+    Returns:
+        CSR matrix with one row per user and one column per movie, and the
+        movieId of every column
+    """
+    user_ids, user_index = np.unique(users, return_inverse=True)
+    movie_ids, movie_index = np.unique(movies, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (ratings.astype(np.float32), (user_index, movie_index)),
+        shape=(len(user_ids), len(movie_ids)),
+    )
+    # Duplicate ratings of the same movie by the same user are summed by
+    # the constructor; keep the mean instead
+    counts = sparse.csr_matrix(
+        (np.ones(len(ratings), dtype=np.float32), (user_index, movie_index)),
+        shape=matrix.shape,
+    )
+    matrix.data /= counts.data
+    return matrix, movie_ids
+
+
+def center_by_user(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Subtract each user's mean rating from their ratings (adjusted cosine)."""
+    centered = matrix.copy()
+    per_user = np.diff(centered.indptr)
+    means = np.asarray(centered.sum(axis=1)).ravel() / np.maximum(per_user, 1)
+    centered.data -= np.repeat(means, per_user).astype(centered.dtype)
+    return centered
+
+
+def normalize_columns(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Scale every movie column to unit L2 norm."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return (matrix @ sparse.diags(scale.astype(matrix.dtype))).tocsr()
+
+
+def top_k_similar(
+    matrix: sparse.csr_matrix,
+    k: int = 10,
+    metric: str = "adjusted_cosine",
+    min_overlap: int = MIN_OVERLAP,
+    block_size: int = 1024,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Yield top-k neighbours of every movie, one block of movies at a time.
+
+    Args:
+        matrix: User x movie rating matrix
+        k: Neighbours kept per movie
+        metric: "cosine" or "adjusted_cosine"
+        min_overlap: Minimum number of users who rated both movies
+        block_size: Movies whose similarity rows are materialised at once
+
+    Yields:
+        (source columns, target columns, scores) for the movies of a block,
+        ordered by source and descending score; only positive scores
+    """
+    weighted = center_by_user(matrix) if metric == "adjusted_cosine" else matrix
+    normalized = normalize_columns(weighted)
+    by_movie = normalized.T.tocsr()
+    rated = matrix.copy()
+    rated.data[:] = 1
+    rated_by_movie = rated.T.tocsr()
+    n_movies = matrix.shape[1]
+    k = min(k, n_movies - 1)
+    if k < 1:
+        return
+
+    for start in range(0, n_movies, block_size):
+        end = min(start + block_size, n_movies)
+        rows = np.arange(end - start)
+        scores = (by_movie[start:end] @ normalized).toarray()
+        scores[rows, rows + start] = -np.inf
+        if min_overlap > 1:
+            overlap = (rated_by_movie[start:end] @ rated).toarray()
+            scores[overlap < min_overlap] = -np.inf
+
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        targets = np.take_along_axis(candidates, order, axis=1)
+        values = np.take_along_axis(candidate_scores, order, axis=1)
+
+        keep = values > 0
+        sources = np.broadcast_to((rows + start)[:, None], targets.shape)
+        yield sources[keep], targets[keep], values[keep].astype(np.float32)
+
+
+class ItemSimilarityJob:
+    """Compute movie-movie similarities and store them as SIMILAR relationships."""
+
+    def __init__(self, driver=None, database: Optional[str] = None, batch_size: int = 10000):
+        """
+        Initialize the job.
+
+        Args:
+            driver: Neo4j driver, only needed to read ratings from or write to Neo4j
+            database: Neo4j database name
+            batch_size: Relationships written per transaction
+        """
+        self.logger = logging.getLogger(__name__)
+        self.driver = driver
+        self.database = database
+        self.batch_size = batch_size
+
+    def delete_runs(self, run_id: str, keep: bool):
+        """Delete SIMILAR relationships in batches.
+
+        Args:
+            run_id: Run the deletion is relative to
+            keep: Delete every other run (True) or only this run (False)
+        """
+        condition = "s.runId IS NULL OR s.runId <> $runId" if keep else "s.runId = $runId"
+        with self.driver.session(database=self.database) as session:
+            session.run(
+                f"MATCH (:Movie)-[s:SIMILAR]->(:Movie) WHERE {condition} "
+                f"CALL (s) {{ DELETE s }} IN TRANSACTIONS OF {self.batch_size} ROWS",
+                runId=run_id,
+            ).consume()
+
+    def write_batch(self, pairs, run_id: str):
+        """Create one batch of SIMILAR relationships tagged with the run id."""
+        def work(tx):
+            tx.run("""
+                UNWIND $pairs AS pair
+                MATCH (a:Movie {movieId: pair.source})
+                MATCH (b:Movie {movieId: pair.target})
+                CREATE (a)-[:SIMILAR {score: pair.score, runId: $runId}]->(b)
+            """, pairs=pairs, runId=run_id).consume()
+
+        with self.driver.session(database=self.database) as session:
+            session.execute_write(work)
+
+    def run(self, matrix: sparse.csr_matrix, movie_ids: np.ndarray, k: int = 10,
+            metric: str = "adjusted_cosine", min_overlap: int = MIN_OVERLAP, block_size: int = 1024,
+            dry_run: bool = False) -> int:
+        """Compute the similarities and replace the stored relationships.
+
+        The new relationships are written next to the old ones and the old
+        ones are only deleted once every batch is written.
+
+        Returns:
+            Number of SIMILAR relationships computed
+        """
+        start = time.time()
+        run_id = uuid.uuid4().hex
+
+        written = 0
+        pending = []
+        try:
+            for sources, targets, scores in top_k_similar(matrix, k, metric, min_overlap, block_size):
+                written += len(scores)
+                if dry_run:
+                    continue
+                pending.extend(
+                    {"source": int(source), "target": int(target), "score": float(score)}
+                    for source, target, score in zip(movie_ids[sources], movie_ids[targets], scores)
+                )
+                while len(pending) >= self.batch_size:
+                    self.write_batch(pending[:self.batch_size], run_id)
+                    del pending[:self.batch_size]
+            if pending:
+                self.write_batch(pending, run_id)
+        except Exception:
+            if not dry_run:
+                self.logger.warning(f"Removing the partial run {run_id}, previous similarities are kept")
+                self.delete_runs(run_id, keep=False)
+            raise
+        if not dry_run:
+            self.delete_runs(run_id, keep=True)
+
+        action = "Computed" if dry_run else "Wrote"
+        self.logger.info(
+            f"{action} {written:,} SIMILAR relationships for {len(movie_ids):,} movies "
+            f"in {time.time() - start:.1f}s"
+        )
+        return written
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Precompute movie-movie similarities from ratings")
+    parser.add_argument("--metric", choices=["adjusted_cosine", "cosine"], default="adjusted_cosine")
+    parser.add_argument("--top-k", type=int, default=10, help="Neighbours kept per movie")
+    parser.add_argument("--min-overlap", type=int, default=MIN_OVERLAP, help="Minimum users who rated both movies")
+    parser.add_argument("--block-size", type=int, default=1024, help="Movies per similarity block")
+    parser.add_argument("--csv", help="Read ratings from this CSV file instead of Neo4j")
+    parser.add_argument("--dry-run", action="store_true", help="Compute without writing to Neo4j")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database = os.getenv("NEO4J_DATABASE")
+    driver = None
+    if not (args.csv and args.dry_run):
+        from neo4j import GraphDatabase
+
+        driver = GraphDatabase.driver(
+            os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+        )
+
+    try:
+        if args.csv:
+            users, movies, ratings = load_ratings_csv(args.csv)
+        else:
+            users, movies, ratings = fetch_ratings(driver, database)
+        matrix, movie_ids = build_matrix(users, movies, ratings)
+        logger.info(f"Rating matrix: {matrix.shape[0]:,} users x {matrix.shape[1]:,} movies, "
+                    f"{matrix.nnz:,} ratings")
+
+        job = ItemSimilarityJob(driver, database)
+        job.run(matrix, movie_ids, args.top_k, args.metric, args.min_overlap, args.block_size, args.dry_run)
+    except Exception as e:
+        logger.error(f"Similarity job failed: {e}")
+        return 1
+    finally:
+        if driver:
+            driver.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
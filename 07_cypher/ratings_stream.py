@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Streaming Ratings Ingestion
+
+Ratings otherwise only enter the graph through the bulk LOAD CSV of
+import_data.py, which reloads the whole file. This job follows new rating
+events as they arrive instead:
+
+    1. tail an append-only JSONL or CSV event file (or read a local queue),
+       with the columns of ratings.csv: movieId, userId, name, rating,
+       timestamp and optionally emittedAt, the epoch seconds at which the
+       producer wrote the event
+    2. group the events into micro-batches, flushed at --batch-size events or
+       --max-wait seconds after the first event of the batch
+    3. upsert User and RATED with one UNWIND query per batch and update the
+       running m.ratingCount and m.averageRating of the rated movies
+    4. after every committed batch, record the file offset in a checkpoint
+       file and log the end-to-end lag: commit time minus emittedAt (or minus
+       the time the event was read, when the producer sets none)
+
+Within a batch the latest event per (user, movie) wins. An event only
+replaces a stored rating with an older timestamp, so replaying the file after
+a restart neither moves ratings back nor counts them twice. Events for
+unknown movies are skipped.
+
+The aggregates are only kept up to date by this job. While it runs, it must
+be the only writer of RATED. At startup the job compares the sum of
+m.ratingCount with the number of RATED relationships. When they differ, or
+some movie has no aggregates (e.g. after import_data.py reloaded the
+ratings), the aggregates of every movie are recomputed from RATED. Run with
+--recompute-aggregates after a bulk load that changed ratings without
+changing their number.
+
+Usage:
+    python ratings_stream.py ratings_events.jsonl
+    python ratings_stream.py ratings_events.csv --batch-size 1000 --max-wait 0.5
+    python ratings_stream.py ratings_events.jsonl --no-follow      # stop at the end of the file
+    python ratings_stream.py ratings_events.jsonl --recompute-aggregates
+
+    # Replay ratings.csv as live events, 200 per second
+    python ratings_stream.py ratings_events.jsonl --produce ../01_import-data/data/ratings.csv --rate 200
+
+Requirements:
+    - .env file with NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, NEO4J_DATABASE
+"""
+
+import os
+import io
+import csv
+import json
+import time
+import queue
+import logging
+import argparse
+from array import array
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "ratings_stream.json"
+BATCH_SIZE = 500
+MAX_WAIT_SECONDS = 1.0
+POLL_SECONDS = 0.1
+
+UPSERT_QUERY = """
+    UNWIND $events AS e
+    MATCH (m:Movie {movieId: e.movieId})
+    MERGE (u:User {userId: e.userId})
+    SET u.name = coalesce(e.name, u.name)
+    WITH e, m, u
+    OPTIONAL MATCH (u)-[old:RATED]->(m)
+    WITH e, m, u, old
+    WHERE old IS NULL OR old.timestamp IS NULL OR old.timestamp < e.timestamp
+    WITH e, m, u, old IS NULL AS isNew, coalesce(old.rating, 0.0) AS previous
+    MERGE (u)-[r:RATED]->(m)
+    SET r.rating = e.rating, r.timestamp = e.timestamp
+    WITH m, count(*) AS applied,
+         sum(CASE WHEN isNew THEN 1 ELSE 0 END) AS added,
+         sum(e.rating - previous) AS delta
+    WITH m, applied, added, delta,
+         coalesce(m.ratingCount, 0) AS ratings, coalesce(m.averageRating, 0.0) AS mean
+    SET m.ratingCount = ratings + added,
+        m.averageRating = CASE WHEN ratings + added = 0 THEN null
+                               ELSE (mean * ratings + delta) / (ratings + added) END
+    RETURN sum(applied) AS applied, sum(added) AS added, count(m) AS movies
+"""
+
+# The relationship count comes from the count store, the sum from one pass over the movies
+AGGREGATES_DRIFT_QUERY = """
+    CALL () {
+        MATCH (m:Movie)
+        RETURN sum(coalesce(m.ratingCount, 0)) AS counted, count(m) - count(m.ratingCount) AS missing
+    }
+    CALL () {
+        MATCH ()-[r:RATED]->()
+        RETURN count(r) AS ratings
+    }
+    RETURN counted, missing, ratings
+"""
+
+RECOMPUTE_AGGREGATES_QUERY = """
+    MATCH (m:Movie)
+    CALL (m) {
+        OPTIONAL MATCH (:User)-[r:RATED]->(m)
+        WITH count(r) AS ratings, avg(r.rating) AS mean
+        SET m.ratingCount = ratings, m.averageRating = mean
+    } IN TRANSACTIONS OF 1000 ROWS
+"""
+
+
+def percentile(values: array, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def parse_event(raw: Dict[str, Any], read_at: float) -> Optional[Dict[str, Any]]:
+    """Typed event from a JSON object or CSV row, None when it is not a valid rating."""
+    try:
+        event = {
+            "userId": int(raw["userId"]),
+            "movieId": int(raw["movieId"]),
+            "rating": float(raw["rating"]),
+            "timestamp": int(float(raw["timestamp"])),
+            "name": raw.get("name") or None,
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not 0 <= event["rating"] <= 5:
+        return None
+    emitted = raw.get("emittedAt")
+    event["emittedAt"] = float(emitted) if emitted not in (None, "") else read_at
+    return event
+
+
+class FileSource:
+    """Complete lines appended to a JSONL or CSV file since a byte offset."""
+
+    def __init__(self, path: str, offset: int = 0, follow: bool = True):
+        self.path = path
+        self.offset = offset
+        self.follow = follow
+        self.closed = False
+        self.invalid = 0
+        self.is_csv = path.lower().endswith(".csv")
+        self.header: Optional[List[str]] = None
+
+    def read(self, max_events: int) -> List[Dict[str, Any]]:
+        """Up to max_events new events; a line without its newline yet is left for later."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < self.offset:
+                logger.warning(f"{self.path} was truncated, reading it from the start")
+                self.offset, self.header = 0, None
+            if self.is_csv and self.header is None:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    return []
+                self.header = next(csv.reader([line.decode("utf-8-sig")]))
+                self.offset = max(self.offset, f.tell())
+            f.seek(self.offset)
+            events = []
+            read_at = time.time()
+            while len(events) < max_events:
+                line = f.readline()
+                if not line:
+                    self.closed = not self.follow
+                    break
+                if not line.endswith(b"\n") and self.follow:
+                    # The producer has not finished writing this line yet
+                    break
+                self.offset += len(line)
+                self.parse(line, read_at, events)
+        return events
+
+    def parse(self, line: bytes, read_at: float, events: List[Dict[str, Any]]):
+        text = line.decode("utf-8").strip()
+        if not text:
+            return
+        try:
+            raw = dict(zip(self.header, next(csv.reader(io.StringIO(text))))) if self.is_csv else json.loads(text)
+        except (ValueError, StopIteration):
+            raw = None
+        event = parse_event(raw, read_at) if isinstance(raw, dict) else None
+        if event is None:
+            self.invalid += 1
+            logger.warning(f"Skipping invalid event: {text[:200]}")
+        else:
+            events.append(event)
+
+
+class QueueSource:
+    """Events put on a local queue; None marks the end of the stream."""
+
+    def __init__(self, events: "queue.Queue"):
+        self.queue = events
+        self.closed = False
+        self.invalid = 0
+
+    def read(self, max_events: int) -> List[Dict[str, Any]]:
+        events = []
+        read_at = time.time()
+        while len(events) < max_events:
+            try:
+                raw = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if raw is None:
+                self.closed = True
+                break
+            event = parse_event(raw, read_at)
+            if event is None:
+                self.invalid += 1
+            else:
+                events.append(event)
+        return events
+
+
+class RatingsStream:
+    """Write rating events to the graph in micro-batches."""
+
+    def __init__(
+        self,
+        driver,
+        database: Optional[str] = None,
+        batch_size: int = BATCH_SIZE,
+        max_wait: float = MAX_WAIT_SECONDS,
+        checkpoint_file: Optional[str] = CHECKPOINT_FILE,
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            driver: Neo4j driver
+            database: Neo4j database name
+            batch_size: Events per batch at most
+            max_wait: Seconds a batch waits for more events after its first one
+            checkpoint_file: JSON file with the committed offset per event file, None to keep none
+        """
+        self.driver = driver
+        self.database = database
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.checkpoint_file = checkpoint_file
+        self.lags = array("d")
+        self.stats = {"events": 0, "batches": 0, "applied": 0, "added": 0, "skipped": 0}
+        self.started = time.monotonic()
+
+    def load_offset(self, path: str) -> int:
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return 0
+        with open(self.checkpoint_file) as f:
+            return json.load(f).get(os.path.abspath(path), 0)
+
+    def save_offset(self, path: str, offset: int):
+        checkpoints = {}
+        if os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file) as f:
+                checkpoints = json.load(f)
+        checkpoints[os.path.abspath(path)] = offset
+        temporary = f"{self.checkpoint_file}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(checkpoints, f, indent=2)
+        os.replace(temporary, self.checkpoint_file)
+
+    def check_aggregates(self, recompute: bool = False) -> bool:
+        """Recompute the aggregates of every movie when they disagree with RATED.
+
+        Args:
+            recompute: Recompute even when the totals agree
+
+        Returns:
+            Whether the aggregates were recomputed
+        """
+        with self.driver.session(database=self.database) as session:
+            drift = session.run(AGGREGATES_DRIFT_QUERY).single()
+            if not recompute and drift["missing"] == 0 and drift["counted"] == drift["ratings"]:
+                return False
+            if not recompute:
+                logger.warning(
+                    f"Rating aggregates are out of date ({drift['counted']:,} counted, "
+                    f"{drift['ratings']:,} RATED, {drift['missing']:,} movies without), recomputing them"
+                )
+            session.run(RECOMPUTE_AGGREGATES_QUERY).consume()
+        logger.info("Recomputed the rating aggregates of every movie")
+        return True
+
+    def write_batch(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Upsert one batch in a transaction and record its lag."""
+        latest: Dict[tuple, Dict[str, Any]] = {}
+        for event in events:
+            key = (event["userId"], event["movieId"])
+            if key not in latest or event["timestamp"] >= latest[key]["timestamp"]:
+                latest[key] = event
+        rows = [{k: v for k, v in event.items() if k != "emittedAt"} for event in latest.values()]
+
+        def work(tx):
+            return tx.run(UPSERT_QUERY, events=rows).single()
+
+        with self.driver.session(database=self.database) as session:
+            record = session.execute_write(work)
+
+        committed = time.time()
+        for event in events:
+            self.lags.append(committed - event["emittedAt"])
+        result = {
+            "events": len(events),
+            "applied": record["applied"] if record else 0,
+            "added": record["added"] if record else 0,
+        }
+        result["skipped"] = len(events) - result["applied"]
+        self.stats["batches"] += 1
+        for name in ("events", "applied", "added", "skipped"):
+            self.stats[name] += result[name]
+        return result
+
+    def flush(self, batch: List[Dict[str, Any]], source) -> None:
+        result = self.write_batch(batch)
+        if self.checkpoint_file and isinstance(source, FileSource):
+            self.save_offset(source.path, source.offset)
+        recent = self.lags[-len(batch):]
+        logger.info(
+            f"Batch of {result['events']} events: {result['applied']} applied "
+            f"({result['added']} new ratings), {result['skipped']} stale or unknown movie, "
+            f"lag p50 {percentile(recent, 0.5) * 1000:.0f} ms, max {max(recent) * 1000:.0f} ms"
+        )
+
+    def run(self, source, idle_timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Consume a source until it is closed, idle for idle_timeout seconds, or interrupted.
+
+        Args:
+            source: FileSource or QueueSource
+            idle_timeout: Stop after this many seconds without events, None to wait forever
+        """
+        batch: List[Dict[str, Any]] = []
+        first_at = last_event_at = time.monotonic()
+        try:
+            while True:
+                events = source.read(self.batch_size - len(batch))
+                now = time.monotonic()
+                if events:
+                    if not batch:
+                        first_at = now
+                    batch.extend(events)
+                    last_event_at = now
+                if batch and (len(batch) >= self.batch_size or now - first_at >= self.max_wait or source.closed):
+                    self.flush(batch, source)
+                    batch = []
+                    continue
+                if source.closed or (idle_timeout is not None and now - last_event_at >= idle_timeout):
+                    break
+                if not events:
+                    time.sleep(min(POLL_SECONDS, self.max_wait))
+        except KeyboardInterrupt:
+            logger.info("Interrupted, writing the pending batch")
+        if batch:
+            self.flush(batch, source)
+        return self.report(source)
+
+    def report(self, source=None) -> Dict[str, Any]:
+        """Totals, throughput and end-to-end lag percentiles in milliseconds."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return dict(
+            self.stats,
+            invalid=getattr(source, "invalid", 0),
+            eventsPerSecond=round(self.stats["events"] / elapsed, 1),
+            lagMs={name: round(percentile(self.lags, q) * 1000, 1)
+                   for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        )
+
+
+def produce(csv_path: str, events_path: str, rate: float, limit: Optional[int] = None) -> int:
+    """Append the rows of a ratings CSV to a JSONL event file at a given rate."""
+    produced = 0
+    interval = 1.0 / rate if rate > 0 else 0.0
+    with open(csv_path, newline="", encoding="utf-8-sig") as source, open(events_path, "a") as sink:
+        for row in csv.DictReader(source):
+            if limit is not None and produced >= limit:
+                break
+            row["emittedAt"] = time.time()
+            sink.write(json.dumps(row) + "\n")
+            sink.flush()
+            produced += 1
+            if interval:
+                time.sleep(interval)
+    logger.info(f"Produced {produced:,} events into {events_path}")
+    return produced
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Stream rating events into the movie graph")
+    parser.add_argument("events", help="Append-only JSONL or CSV event file")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Events per batch at most")
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT_SECONDS,
+                        help="Seconds a batch waits for more events")
+    parser.add_argument("--no-follow", action="store_true", help="Stop at the end of the file")
+    parser.add_argument("--idle-timeout", type=float, help="Stop after this many seconds without events")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="Checkpoint file")
+    parser.add_argument("--from-start", action="store_true", help="Ignore the checkpoint")
+    parser.add_argument("--recompute-aggregates", action="store_true",
+                        help="Recompute ratingCount and averageRating of every movie before streaming")
+    parser.add_argument("--produce", metavar="CSV", help="Append the rows of this ratings CSV as events instead")
+    parser.add_argument("--rate", type=float, default=100, help="Events per second when producing, 0 for no limit")
+    parser.add_argument("--limit", type=int, help="Events to produce at most")
+    args = parser.parse_args()
+
+    if args.produce:
+        produce(args.produce, args.events, args.rate, args.limit)
+        return 0
+
+    load_dotenv()
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
+    )
+    try:
+        stream = RatingsStream(driver, os.getenv("NEO4J_DATABASE"), args.batch_size, args.max_wait, args.checkpoint)
+        offset = 0 if args.from_start else stream.load_offset(args.events)
+        if offset:
+            logger.info(f"Resuming {args.events} at byte {offset:,}")
+        stream.check_aggregates(args.recompute_aggregates)
+        report = stream.run(FileSource(args.events, offset, follow=not args.no_follow), args.idle_timeout)
+        logger.info(f"Stream report: {json.dumps(report)}")
+    except Exception as e:
+        logger.error(f"Ratings stream failed: {e}")
+        return 1
+    finally:
+        driver.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Prefix Autocomplete Index
+
+In-process completion of movie titles, person names and genres, so that a
+lookup by free text resolves to an entity id before any Cypher runs instead
+of scanning on the server.
+
+Names are normalized (case, accents and punctuation folded) and every word
+start of a name becomes a key: "The Matrix Reloaded" is found from "the mat",
+"matrix" and "rel". Keys are kept in sorted arrays per label and searched by
+binary search, so a completion costs O(log n + limit). When a prefix of at
+least three characters has too few completions, the prefixes one edit away
+(deletion, substitution, insertion or transposition) are looked up as well,
+trying only the characters that actually continue a key.
+
+The index is saved to a JSON file and loaded from it at startup. A refresh
+only reads the movies and persons with an id above the largest one already
+indexed, plus the genres; a label whose count of known ids changed (deleted
+nodes) is read again completely. Renamed entities need --rebuild.
+
+Usage:
+    python autocomplete.py "tom han"
+    python autocomplete.py --kind Genre comdy
+    python autocomplete.py --rebuild
+
+Requirements:
+    - Movie graph in Neo4j or Kuzu (see graph_backend.py)
+"""
+
+import os
+import re
+import json
+import time
+import bisect
+import logging
+import argparse
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from graph_backend import GraphBackend, get_backend
+
+INDEX_FILE = "autocomplete_index.json"
+# Words of a name that become keys; later words are only found through earlier ones
+MAX_KEY_WORDS = 6
+# Shortest prefix for which typos are tolerated
+MIN_FUZZY_LENGTH = 3
+
+# Label -> (id property, name property)
+ENTITIES = {
+    "Genre": ("name", "name"),
+    "Person": ("tmdbId", "name"),
+    "Movie": ("movieId", "title"),
+}
+
+# Genres are few and have no numeric id, so they are always read completely
+COUNT_QUERY = "MATCH (n:{label}) WHERE n.{id} <= $after AND n.{name} IS NOT NULL RETURN count(n) AS known"
+ENTRIES_QUERY = """
+    MATCH (n:{label})
+    WHERE n.{id} > $after AND n.{name} IS NOT NULL
+    RETURN n.{id} AS id, n.{name} AS name
+    ORDER BY id
+"""
+GENRES_QUERY = "MATCH (n:Genre) WHERE n.name IS NOT NULL RETURN n.name AS id, n.name AS name"
+
+
+def normalize(text: str) -> str:
+    """Lower-case words without accents or punctuation."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    return " ".join(re.findall(r"\w+", text))
+
+
+class PrefixArray:
+    """Sorted keys with the entry each key belongs to."""
+
+    def __init__(self, pairs: Iterable[Tuple[str, int]] = ()):
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.entries = array("i", (entry for _, entry in pairs))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def starting_with(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """Up to limit (key, entry) pairs whose key starts with prefix, in key order."""
+        start = bisect.bisect_left(self.keys, prefix)
+        matches = []
+        for i in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[i].startswith(prefix):
+                break
+            matches.append((self.keys[i], self.entries[i]))
+        return matches
+
+    def next_characters(self, prefix: str) -> List[str]:
+        """Characters that follow prefix in some key, one binary search each."""
+        characters = []
+        start = bisect.bisect_left(self.keys, prefix)
+        while start < len(self.keys) and self.keys[start].startswith(prefix):
+            if len(self.keys[start]) == len(prefix):
+                start += 1
+                continue
+            character = self.keys[start][len(prefix)]
+            characters.append(character)
+            start = bisect.bisect_left(self.keys, prefix + chr(ord(character) + 1), start)
+        return characters
+
+    def near(self, prefix: str, limit: int) -> List[Tuple[str, int]]:
+        """Up to limit pairs per prefix one deletion, transposition, substitution or insertion away.
+
+        Only characters that occur in the keys are tried, and only up to the
+        first position where no key continues the prefix, like a trie walk.
+        """
+        variants = set()
+        for i in range(len(prefix)):
+            head = prefix[:i]
+            variants.add(head + prefix[i + 1:])
+            if i + 1 < len(prefix):
+                variants.add(head + prefix[i + 1] + prefix[i] + prefix[i + 2:])
+            for character in self.next_characters(head):
+                variants.add(head + character + prefix[i + 1:])
+                variants.add(head + character + prefix[i:])
+            if not self.starting_with(prefix[:i + 1], 1):
+                break
+        variants.discard(prefix)
+        matches = []
+        for variant in variants:
+            if variant.strip():
+                matches.extend(self.starting_with(variant, limit))
+        return matches
+
+
+class AutocompleteIndex:
+    """Completion of entity names to (label, id, name) per label."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.entries: List[Tuple[str, object, str]] = []
+        # Largest id and number of entries per label, for incremental refreshes
+        self.after: Dict[str, object] = {}
+        self.counts: Dict[str, int] = {}
+        self.names: Dict[str, PrefixArray] = {}
+        self.words: Dict[str, PrefixArray] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, label: str, rows: Iterable[Dict]):
+        """Add {id, name} rows of a label; call build() afterwards."""
+        for row in rows:
+            if row.get("id") is not None and row.get("name") is not None:
+                self.entries.append((label, row["id"], str(row["name"])))
+
+    def remove(self, label: str):
+        """Drop every entry of a label."""
+        self.entries = [entry for entry in self.entries if entry[0] != label]
+
+    def build(self):
+        """Rebuild the sorted key arrays from the entries."""
+        names = {label: [] for label in ENTITIES}
+        words = {label: [] for label in ENTITIES}
+        for i, (label, _, name) in enumerate(self.entries):
+            key_words = normalize(name).split()
+            if not key_words:
+                continue
+            names.setdefault(label, []).append((" ".join(key_words), i))
+            for position in range(1, min(len(key_words), MAX_KEY_WORDS)):
+                words.setdefault(label, []).append((" ".join(key_words[position:]), i))
+        self.names = {label: PrefixArray(pairs) for label, pairs in names.items()}
+        self.words = {label: PrefixArray(pairs) for label, pairs in words.items()}
+        self.counts = {label: sum(1 for entry in self.entries if entry[0] == label) for label in ENTITIES}
+
+    def entry(self, i: int, typo: bool = False) -> Dict:
+        label, entity_id, name = self.entries[i]
+        return {"label": label, "id": entity_id, "name": name, "typo": typo}
+
+    def lookup(self, prefix: str, labels: List[str], limit: int, fuzzy: bool = False) -> List[Tuple[int, str, int]]:
+        """(word position, key, entry) of the keys starting with a normalized prefix, or one edit away."""
+        matches = []
+        for label in labels:
+            for position, arrays in ((0, self.names), (1, self.words)):
+                if label in arrays:
+                    found = arrays[label].near(prefix, limit) if fuzzy else arrays[label].starting_with(prefix, limit)
+                    matches.extend((position, key, i) for key, i in found)
+        return matches
+
+    def complete(self, text: str, label: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """Completions of text, whole-name matches before word matches, typos last.
+
+        Args:
+            text: What the user typed so far
+            label: Only complete entities of this label
+            limit: Maximum number of completions
+
+        Returns:
+            Dictionaries with label, id, name and typo
+        """
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        labels = [label] if label else list(ENTITIES)
+
+        results, seen = [], set()
+        for _, _, i in sorted(self.lookup(prefix, labels, limit)):
+            if i not in seen:
+                seen.add(i)
+                results.append(self.entry(i))
+        if len(results) < limit and len(prefix) >= MIN_FUZZY_LENGTH:
+            for _, _, i in sorted(self.lookup(prefix, labels, limit, fuzzy=True)):
+                if i not in seen:
+                    seen.add(i)
+                    results.append(self.entry(i, typo=True))
+        return results[:limit]
+
+    def resolve(self, text: str, label: Optional[str] = None) -> Optional[Dict]:
+        """Entity named exactly text (up to normalization), else the best completion."""
+        key = normalize(text)
+        completions = self.complete(text, label, limit=10)
+        for completion in completions:
+            if normalize(completion["name"]) == key:
+                return completion
+        return completions[0] if completions else None
+
+    def refresh(self, backend: GraphBackend) -> int:
+        """Read the entities added since the last refresh.
+
+        Returns:
+            Number of entries added
+        """
+        before = len(self.entries)
+        for label, (id_property, name_property) in ENTITIES.items():
+            if label == "Genre":
+                self.remove(label)
+                self.add(label, backend.query(GENRES_QUERY))
+                continue
+
+            fields = {"label": label, "id": id_property, "name": name_property}
+            after = self.after.get(label)
+            if after is not None:
+                known = backend.query(COUNT_QUERY.format(**fields), {"after": after})[0]["known"]
+                if known != self.counts.get(label):
+                    self.logger.info(f"{label} nodes were removed, reading all of them again")
+                    self.remove(label)
+                    after = None
+            rows = backend.query(ENTRIES_QUERY.format(**fields), {"after": after if after is not None else -1})
+            self.add(label, rows)
+            if rows:
+                self.after[label] = rows[-1]["id"]
+        self.build()
+        return len(self.entries) - before
+
+    def save(self, path: str):
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"after": self.after, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "AutocompleteIndex":
+        index = cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        index.after = data["after"]
+        index.entries = [tuple(entry) for entry in data["entries"]]
+        index.build()
+        return index
+
+
+def open_index(backend: GraphBackend, path: str = INDEX_FILE, rebuild: bool = False) -> AutocompleteIndex:
+    """Load the index file, bring it up to date with the graph and save it if it changed."""
+    logger = logging.getLogger(__name__)
+    if os.path.exists(path) and not rebuild:
+        index = AutocompleteIndex.load(path)
+        logger.info(f"Loaded {len(index):,} names from {path}")
+    else:
+        index = AutocompleteIndex()
+
+    start = time.perf_counter()
+    added = index.refresh(backend)
+    logger.info(f"Refreshed autocomplete index: {added:+,} names in {time.perf_counter() - start:.2f}s")
+    if added or rebuild or not os.path.exists(path):
+        index.save(path)
+    return index
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Complete movie titles, person names and genres")
+    parser.add_argument("text", nargs="?", help="Text to complete")
+    parser.add_argument("--kind", choices=list(ENTITIES), help="Only complete this label")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--index", default=INDEX_FILE, help="Index file")
+    parser.add_argument("--rebuild", action="store_true", help="Read every name from the graph again")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        with get_backend() as backend:
+            index = open_index(backend, args.index, args.rebuild)
+    except Exception as e:
+        logging.error(f"Could not build the autocomplete index: {e}")
+        return 1
+
+    if args.text:
+        start = time.perf_counter()
+        completions = index.complete(args.text, args.kind, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for completion in completions:
+            flag = " (typo)" if completion["typo"] else ""
+            print(f"{completion['label']:<8} {str(completion['id']):<10} {completion['name']}{flag}")
+        print(f"{len(completions)} completions in {elapsed:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Backend Benchmark
+
+Runs the same named movie-graph queries against Neo4j and the embedded Kuzu
+database and reports latency percentiles per query. A backend that cannot be
+reached is skipped. Latencies are only comparable when the backends return
+the same rows, so the run fails when their row counts differ.
+
+Usage:
+    python benchmark_backends.py [--iterations 200] [--backends neo4j,kuzu] [--output results.json]
+
+Requirements:
+    - Kuzu movie database (python ../12_kuzu-quickstart/movie_graph.py)
+    - Optionally a Neo4j database loaded with the movie graph
+"""
+
+import json
+import time
+import logging
+import argparse
+import statistics
+from typing import Dict, List
+
+from graph_backend import GraphBackend, get_backend
+
+WORKLOAD = [
+    ("top_movies_by_genre", {"genre": "Comedy", "limit": 5}),
+    ("top_movies_by_genre", {"genre": "Drama", "limit": 5}),
+    ("genres", {}),
+    ("movies_by_person", {"name": "Tom Hanks"}),
+    ("co_actors", {"name": "Tom Hanks", "limit": 10}),
+    ("movie_ratings", {"title": "Toy Story"}),
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile of samples using nearest rank."""
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def benchmark(backend: GraphBackend, iterations: int, warmup: int = 10) -> Dict[str, Dict]:
+    """Measure the latency of every workload query on one backend."""
+    results = {}
+    for query_name, parameters in WORKLOAD:
+        key = f"{query_name}({', '.join(f'{k}={v}' for k, v in parameters.items())})"
+        for _ in range(warmup):
+            backend.run_named(query_name, **parameters)
+
+        samples = []
+        rows = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = len(backend.run_named(query_name, **parameters))
+            samples.append((time.perf_counter() - start) * 1000)
+
+        results[key] = {
+            "rows": rows,
+            "mean_ms": statistics.fmean(samples),
+            "p50_ms": percentile(samples, 50),
+            "p99_ms": percentile(samples, 99),
+        }
+    return results
+
+
+def row_count_mismatches(results: Dict[str, Dict[str, Dict]]) -> List[str]:
+    """Queries whose row counts differ between the backends."""
+    mismatches = []
+    queries = {key for backend_results in results.values() for key in backend_results}
+    for key in sorted(queries):
+        counts = {
+            name: backend_results[key]["rows"] for name, backend_results in results.items() if key in backend_results
+        }
+        if len(set(counts.values())) > 1:
+            mismatches.append(f"{key}: " + ", ".join(f"{name} {rows}" for name, rows in counts.items()))
+    return mismatches
+
+
+def display_results(results: Dict[str, Dict[str, Dict]]) -> None:
+    """Print latency percentiles side by side for every backend."""
+    print(f"\n{'=' * 100}")
+    print(f"{'Query':<50} {'Backend':<8} {'Rows':>6} {'Mean ms':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    print(f"{'-' * 100}")
+    queries = {key for backend_results in results.values() for key in backend_results}
+    for key in sorted(queries):
+        for backend_name, backend_results in results.items():
+            if key not in backend_results:
+                continue
+            r = backend_results[key]
+            print(
+                f"{key[:49]:<50} {backend_name:<8} {r['rows']:>6} "
+                f"{r['mean_ms']:>10.3f} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f}"
+            )
+    print(f"{'=' * 100}\n")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the movie graph backends")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed runs per query")
+    parser.add_argument("--backends", default="neo4j,kuzu", help="Comma separated backends")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    results = {}
+    for name in args.backends.split(","):
+        try:
+            name = name.strip()
+            # Server latencies, not query cache hits
+            backend = get_backend(name, query_cache=False) if name == "neo4j" else get_backend(name)
+            backend.query("RETURN 1 AS ok")
+        except Exception as e:
+            logging.warning(f"Skipping {name} backend: {e}")
+            continue
+        with backend:
+            logging.info(f"Benchmarking {name} backend...")
+            results[name] = benchmark(backend, args.iterations)
+
+    if not results:
+        logging.error("No backend available")
+        return 1
+
+    display_results(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    mismatches = row_count_mismatches(results)
+    for mismatch in mismatches:
+        logging.error(f"Backends return different row counts for {mismatch}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Offline Bulk-Import File Generator
+
+Turns the CRM CSV files into input files for `neo4j-admin database import`,
+which writes the store files directly and is much faster than transactional
+Cypher for the first load of a large dataset:
+
+    import/
+        nodes_Account.csv               accountId:ID(Account),accountName,annualRevenue:long,...
+        rels_BELONGS_TO_ACCOUNT.csv     :START_ID(Contact),:END_ID(Account)
+        import.sh                       the neo4j-admin command for these files
+        report.json                     row counts and integrity problems
+
+Nodes and their typed properties come from data_model.json; relationships
+from the field mappings of ingest_config.yaml when it has them, otherwise
+from the first source table holding the key columns of both end nodes. Every
+source CSV is read once: each row is converted and written to all node and
+relationship files it feeds. Each label gets its own ID space.
+
+Before anything is imported, the report lists duplicate and missing node
+keys, malformed source rows, values that do not convert to their data model
+type, relationship types without a source, and relationships whose end node
+does not exist. The first row of a key is imported; later rows with the same
+key are duplicates, except for derived nodes such as case owners, which
+repeat on every source row and only count when their properties differ.
+Relationships are checked after the pass against the node keys collected
+during it; the generated command skips dangling ones, and the script exits
+with an error while any are left unless --allow-dangling is given.
+
+Usage:
+    python bulk_import.py
+    python bulk_import.py --output import --array-delimiter ";" --allow-dangling
+    bash import/import.sh    # with the database stopped
+
+Requirements:
+    - assets/data_model/data_model.json and CSV files in data/
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from index_advisor import CONFIG_FILE, DATA_MODEL_FILE
+from ingest import case_owner_id
+
+logger = logging.getLogger(__name__)
+
+# data_model.json type -> neo4j-admin header type
+ADMIN_TYPES = {
+    "STRING": "string",
+    "INTEGER": "long",
+    "FLOAT": "double",
+    "BOOLEAN": "boolean",
+    "DATE": "date",
+    "LOCAL_DATETIME": "localdatetime",
+    "DATETIME": "datetime",
+}
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"]
+# Source values of list properties are separated like the movie genres
+SOURCE_ARRAY_DELIMITER = "|"
+# Keys that ingest.py derives from the source value rather than copying it
+KEY_TRANSFORMS: Dict[str, Callable[[str], Optional[str]]] = {"CaseOwner": case_owner_id}
+MAX_SAMPLES = 10
+
+
+def admin_type(model_type: str) -> Tuple[str, bool]:
+    """neo4j-admin type of a data model type and whether it is a list."""
+    model_type = (model_type or "STRING").upper()
+    is_list = model_type.startswith("LIST")
+    if is_list:
+        model_type = model_type[4:].strip("<> ") or "STRING"
+    return ADMIN_TYPES.get(model_type, "string"), is_list
+
+
+def convert_scalar(value: str, kind: str) -> str:
+    """Canonical text of a value for its neo4j-admin type; raises ValueError."""
+    if kind == "long":
+        return str(int(value) if value.lstrip("-").isdigit() else int(float(value)))
+    if kind == "double":
+        return repr(float(value))
+    if kind == "boolean":
+        lowered = value.lower()
+        if lowered not in ("true", "false", "yes", "no", "1", "0"):
+            raise ValueError(f"not a boolean: {value}")
+        return "true" if lowered in ("true", "yes", "1") else "false"
+    if kind == "date":
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+        raise ValueError(f"not a date: {value}")
+    return value
+
+
+def convert_value(value: Optional[str], kind: str, is_list: bool, array_delimiter: str) -> str:
+    """Field text for the import file; empty for missing values."""
+    value = (value or "").strip()
+    if not value:
+        return ""
+    if is_list:
+        items = [item.strip() for item in value.split(SOURCE_ARRAY_DELIMITER) if item.strip()]
+        return array_delimiter.join(convert_scalar(item, kind) for item in items)
+    return convert_scalar(value, kind)
+
+
+class NodeFile:
+    """Import file of one label, fed from one source table."""
+
+    def __init__(self, node: Dict, output_dir: str, array_delimiter: str):
+        self.label = node["label"]
+        self.key = node["key_property"]["name"]
+        self.key_column = node["key_property"]["source"]["column_name"]
+        self.table = node["key_property"]["source"]["table_name"]
+        self.transform = KEY_TRANSFORMS.get(self.label)
+        self.array_delimiter = array_delimiter
+        self.properties = [
+            (p["name"], p["source"]["column_name"], *admin_type(p.get("type")))
+            for p in node.get("properties", [])
+            if (p.get("source") or {}).get("table_name") == self.table
+        ]
+        self.file_name = f"nodes_{self.label}.csv"
+        self.path = os.path.join(output_dir, self.file_name)
+        self.ids = set()
+        # Fields written for each derived node, to tell repeats from conflicts
+        self.derived_fields: Dict[str, List[str]] = {}
+        self.stats = {"rows": 0, "duplicates": 0, "repeats": 0, "missingKeys": 0}
+        self.samples: List[str] = []
+        self.errors: Dict[str, int] = {}
+
+        self.handle = open(self.path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.handle)
+        header = [f"{self.key}:ID({self.label})"]
+        for name, _, kind, is_list in self.properties:
+            header.append(f"{name}:{kind}{'[]' if is_list else ''}" if kind != "string" or is_list else name)
+        self.writer.writerow(header)
+
+    def node_id(self, value: Optional[str]) -> Optional[str]:
+        """ID of the node a source value refers to."""
+        value = (value or "").strip()
+        if value and self.transform:
+            value = self.transform(value)
+        return value or None
+
+    def convert(self, node_id: str, row: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """Fields of the import file row and the properties that failed to convert."""
+        fields = [node_id]
+        failed = []
+        for name, column, kind, is_list in self.properties:
+            try:
+                fields.append(convert_value(row.get(column), kind, is_list, self.array_delimiter))
+            except ValueError:
+                failed.append(name)
+                fields.append("")
+        return fields, failed
+
+    def duplicate(self, node_id: str):
+        """Count a second row for an already written key."""
+        self.stats["duplicates"] += 1
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(node_id)
+
+    def write(self, row: Dict[str, str]):
+        node_id = self.node_id(row.get(self.key_column))
+        if node_id is None:
+            self.stats["missingKeys"] += 1
+            return
+        if node_id in self.ids:
+            if self.transform is None:
+                self.duplicate(node_id)
+            elif self.convert(node_id, row)[0] == self.derived_fields[node_id]:
+                # Derived nodes such as case owners repeat on every source row
+                self.stats["repeats"] += 1
+            else:
+                self.duplicate(node_id)
+            return
+        self.ids.add(node_id)
+
+        fields, failed = self.convert(node_id, row)
+        for name in failed:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        if self.transform is not None:
+            self.derived_fields[node_id] = fields
+        self.writer.writerow(fields)
+        self.stats["rows"] += 1
+
+    def close(self):
+        self.handle.close()
+
+
+class RelationshipFile:
+    """Import file of one relationship type, fed from one source table."""
+
+    def __init__(self, rel_type: str, start: NodeFile, end: NodeFile, table: str,
+                 start_column: str, end_column: str, output_dir: str):
+        self.type = rel_type
+        self.start = start
+        self.end = end
+        self.table = table
+        self.start_column = start_column
+        self.end_column = end_column
+        self.file_name = f"rels_{rel_type}.csv"
+        self.path = os.path.join(output_dir, self.file_name)
+        self.references: List[Tuple[str, str]] = []
+        self.stats = {"rows": 0, "missingKeys": 0, "dangling": 0}
+        self.samples: List[Dict[str, Optional[str]]] = []
+
+        self.handle = open(self.path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.handle)
+        self.writer.writerow([f":START_ID({start.label})", f":END_ID({end.label})"])
+
+    def write(self, row: Dict[str, str]):
+        start_id = self.start.node_id(row.get(self.start_column))
+        end_id = self.end.node_id(row.get(self.end_column))
+        if start_id is None or end_id is None:
+            self.stats["missingKeys"] += 1
+            return
+        self.writer.writerow([start_id, end_id])
+        self.references.append((start_id, end_id))
+        self.stats["rows"] += 1
+
+    def check(self):
+        """Count relationships whose end nodes are not in the node files."""
+        for start_id, end_id in self.references:
+            start_found = start_id in self.start.ids
+            end_found = end_id in self.end.ids
+            if start_found and end_found:
+                continue
+            self.stats["dangling"] += 1
+            if len(self.samples) < MAX_SAMPLES:
+                self.samples.append({
+                    "start": None if start_found else start_id,
+                    "end": None if end_found else end_id,
+                })
+        self.references = []
+
+    def close(self):
+        self.handle.close()
+
+
+class BulkImportGenerator:
+    """Write neo4j-admin import files for the CRM data model."""
+
+    def __init__(self, data_model: Dict, config: Optional[Dict] = None, data_dir: str = "data",
+                 output_dir: str = "import", array_delimiter: str = ";"):
+        """
+        Initialize the generator.
+
+        Args:
+            data_model: Parsed data_model.json
+            config: Parsed ingest configuration, for the relationship field mappings
+            data_dir: Directory containing the CSV files
+            output_dir: Directory receiving the import files
+            array_delimiter: Separator of list values in the import files
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_model = data_model
+        self.config = config or {}
+        self.data_dir = Path(data_dir)
+        self.output_dir = output_dir
+        self.array_delimiter = array_delimiter
+
+    def read_header(self, table: str) -> List[str]:
+        path = self.data_dir / table
+        if not path.exists():
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return next(csv.reader(f), [])
+
+    def relationship_source(self, rel: Dict, start: NodeFile, end: NodeFile) -> Optional[Tuple[str, str, str]]:
+        """(table, start column, end column) a relationship type is read from."""
+        mapped = (self.config.get("loading_queries", {}) or {}).get("relationships", {}).get(rel["type"])
+        if mapped and mapped.get("source_data") and mapped.get("field_mappings"):
+            mappings = mapped["field_mappings"]
+            if "sourceId" in mappings and "targetId" in mappings:
+                return mapped["source_data"], mappings["sourceId"], mappings["targetId"]
+
+        tables = [start.table, end.table] + sorted({node.table for node in self.node_files.values()})
+        for table in dict.fromkeys(tables):
+            header = self.read_header(table)
+            if start.key_column in header and end.key_column in header and start.key_column != end.key_column:
+                return table, start.key_column, end.key_column
+        return None
+
+    def run(self) -> Dict[str, Any]:
+        """Write the import files and return the integrity report."""
+        start_time = time.time()
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.node_files: Dict[str, NodeFile] = {}
+        rel_files: List[RelationshipFile] = []
+        unmapped: List[str] = []
+        try:
+            for node in self.data_model.get("nodes", []):
+                self.node_files[node["label"]] = NodeFile(node, self.output_dir, self.array_delimiter)
+            for rel in self.data_model.get("relationships", []):
+                start = self.node_files.get(rel["start_node_label"])
+                end = self.node_files.get(rel["end_node_label"])
+                source = self.relationship_source(rel, start, end) if start and end else None
+                if source is None:
+                    unmapped.append(rel["type"])
+                    continue
+                rel_files.append(RelationshipFile(rel["type"], start, end, *source, self.output_dir))
+
+            # One pass per source table, writing every file the table feeds
+            malformed: Dict[str, int] = {}
+            tables: Dict[str, List] = {}
+            for output in [*self.node_files.values(), *rel_files]:
+                tables.setdefault(output.table, []).append(output)
+            for table, outputs in tables.items():
+                path = self.data_dir / table
+                if not path.exists():
+                    raise FileNotFoundError(f"CSV file not found: {path}")
+                rows = 0
+                with open(path, "r", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        rows += 1
+                        if None in row:
+                            # More fields than the header, so columns may be shifted
+                            malformed[table] = malformed.get(table, 0) + 1
+                        for output in outputs:
+                            output.write(row)
+                self.logger.info(f"Converted {rows:,} rows of {table} into {len(outputs)} files")
+        finally:
+            for output in [*self.node_files.values(), *rel_files]:
+                output.close()
+
+        for rel_file in rel_files:
+            rel_file.check()
+
+        report = {
+            "nodes": {label: {**node.stats, "samples": node.samples} for label, node in self.node_files.items()},
+            "relationships": {
+                rel.type: {**rel.stats, "source": rel.table, "samples": rel.samples} for rel in rel_files
+            },
+            "conversionErrors": {
+                f"{label}.{name}": count
+                for label, node in self.node_files.items() for name, count in node.errors.items()
+            },
+            "malformedRows": malformed,
+            "unmappedRelationships": unmapped,
+        }
+        report["command"] = self.command(rel_files, dangling=any(rel.stats["dangling"] for rel in rel_files))
+        with open(os.path.join(self.output_dir, "report.json"), "w") as f:
+            json.dump(report, f, indent=2)
+        with open(os.path.join(self.output_dir, "import.sh"), "w") as f:
+            f.write("#!/bin/sh\n# Run with the target database stopped; it is replaced.\n")
+            f.write('cd "$(dirname "$0")"\n')
+            f.write(report["command"] + "\n")
+        self.logger.info(f"Wrote import files to {self.output_dir} in {time.time() - start_time:.1f}s")
+        return report
+
+    def command(self, rel_files: List[RelationshipFile], dangling: bool, database: str = "neo4j") -> str:
+        """neo4j-admin command importing the generated files."""
+        parts = ["neo4j-admin database import full"]
+        parts += [f"--nodes={node.label}={node.file_name}" for node in self.node_files.values()]
+        parts += [f"--relationships={rel.type}={rel.file_name}" for rel in rel_files]
+        parts += [f"--array-delimiter='{self.array_delimiter}'", "--overwrite-destination"]
+        if dangling:
+            parts.append("--skip-bad-relationships")
+        parts.append(database)
+        return " \\\n    ".join(parts)
+
+
+def log_report(report: Dict[str, Any]) -> int:
+    """Log the integrity problems of a report and return how many there are."""
+    problems = 0
+    for label, stats in report["nodes"].items():
+        logger.info(f"{label}: {stats['rows']:,} nodes")
+        if stats["missingKeys"]:
+            problems += stats["missingKeys"]
+            logger.warning(f"{label}: {stats['missingKeys']:,} rows without a key")
+        if stats["duplicates"]:
+            problems += stats["duplicates"]
+            logger.warning(f"{label}: {stats['duplicates']:,} rows repeat an existing key, only the first "
+                           f"is imported, e.g. {stats['samples'][:3]}")
+    for rel_type, stats in report["relationships"].items():
+        logger.info(f"{rel_type}: {stats['rows']:,} relationships from {stats['source']}")
+        if stats["dangling"]:
+            problems += stats["dangling"]
+            logger.warning(f"{rel_type}: {stats['dangling']:,} relationships to missing nodes, "
+                           f"e.g. {stats['samples'][:3]}")
+    for field, count in report["conversionErrors"].items():
+        problems += count
+        logger.warning(f"{field}: {count:,} values do not match the data model type")
+    for table, count in report["malformedRows"].items():
+        problems += count
+        logger.warning(f"{table}: {count:,} rows have more fields than the header")
+    for rel_type in report["unmappedRelationships"]:
+        logger.warning(f"{rel_type}: no source table holds the keys of both end nodes, not generated")
+    return problems
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Generate neo4j-admin import files for the CRM data")
+    parser.add_argument("--data-model", default=DATA_MODEL_FILE, help="data_model.json to read")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Ingest configuration with field mappings")
+    parser.add_argument("--data-dir", default="data", help="Directory containing the CSV files")
+    parser.add_argument("--output", default="import", help="Directory receiving the import files")
+    parser.add_argument("--array-delimiter", default=";", help="Separator of list values")
+    parser.add_argument("--allow-dangling", action="store_true",
+                        help="Succeed even when relationships point to missing nodes")
+    args = parser.parse_args()
+
+    try:
+        with open(args.data_model, "r") as f:
+            data_model = json.load(f)
+        config = None
+        if os.path.exists(args.config):
+            with open(args.config, "r") as f:
+                config = yaml.safe_load(f)
+
+        generator = BulkImportGenerator(data_model, config, args.data_dir, args.output, args.array_delimiter)
+        report = generator.run()
+        problems = log_report(report)
+        dangling = sum(stats["dangling"] for stats in report["relationships"].values())
+        logger.info(f"{problems:,} integrity problems; details in {os.path.join(args.output, 'report.json')}")
+        if dangling and not args.allow_dangling:
+            logger.error("Relationships point to missing nodes; fix the data or pass --allow-dangling")
+            return 1
+    except Exception as e:
+        logger.error(f"Bulk import generation failed: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Graph Backends
+
+A small query API over the movie graph that can be served either by a Neo4j
+server or by an embedded Kuzu database (see 12_kuzu-quickstart/movie_graph.py).
+Both backends expose the same named queries and return plain dictionaries, so
+movie_search and the retrieval code do not depend on a particular database.
+
+The backend is chosen with GRAPH_BACKEND=neo4j|kuzu; the Kuzu database path is
+read from KUZU_DATABASE, relative paths being resolved against this directory
+rather than the working directory. Reads of the Neo4j backend go through the shared
+query cache (misc/query_cache.py) when NEO4J_QUERY_CACHE_SIZE enables it.
+"""
+
+import os
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODULE_DIR = Path(__file__).resolve().parent
+
+# The query cache lives with the other shared tools in misc/
+sys.path.insert(0, str(MODULE_DIR.parent / "misc"))
+
+KUZU_DATABASE = str(MODULE_DIR / os.getenv("KUZU_DATABASE", "../12_kuzu-quickstart/movies.kuzu"))
+
+NEO4J_QUERIES = {
+    "top_movies_by_genre": """
+        MATCH (m:Movie)
+        WHERE m.imdbRating IS NOT NULL
+          AND $genre IN m.genres
+        RETURN m.title AS title, m.year AS year, m.imdbRating AS imdbRating, m.genres AS genres
+        ORDER BY m.imdbRating DESC
+        LIMIT $limit
+    """,
+    "genres": """
+        MATCH (g:Genre)
+        RETURN g.name AS name
+        ORDER BY name
+    """,
+    "movies_by_person": """
+        MATCH (p:Person {name: $name})-[r:ACTED_IN|DIRECTED]->(m:Movie)
+        RETURN m.title AS title, m.year AS year, type(r) AS relationship
+        ORDER BY year
+    """,
+    "co_actors": """
+        MATCH (p:Person {name: $name})-[:ACTED_IN]->(:Movie)<-[:ACTED_IN]-(other:Person)
+        RETURN other.name AS name, count(*) AS movies
+        ORDER BY movies DESC, name
+        LIMIT $limit
+    """,
+    "movie_ratings": """
+        MATCH (u:User)-[r:RATED]->(m:Movie {title: $title})
+        RETURN count(r) AS ratings, avg(r.rating) AS averageRating
+    """,
+}
+
+# Properties of the movie graph that are not strings, for the index advisor
+NEO4J_PROPERTY_TYPES = {
+    ("Movie", "genres"): "LIST<STRING>",
+    ("Movie", "countries"): "LIST<STRING>",
+    ("Movie", "languages"): "LIST<STRING>",
+}
+
+# Kuzu speaks Cypher as well; only list membership and relationship type
+# functions differ from Neo4j.
+KUZU_QUERIES = dict(
+    NEO4J_QUERIES,
+    top_movies_by_genre="""
+        MATCH (m:Movie)
+        WHERE m.imdbRating IS NOT NULL
+          AND list_contains(m.genres, $genre)
+        RETURN m.title AS title, m.year AS year, m.imdbRating AS imdbRating, m.genres AS genres
+        ORDER BY m.imdbRating DESC
+        LIMIT $limit
+    """,
+    movies_by_person="""
+        MATCH (p:Person {name: $name})-[r:ACTED_IN|DIRECTED]->(m:Movie)
+        RETURN m.title AS title, m.year AS year, label(r) AS relationship
+        ORDER BY year
+    """,
+)
+
+
+class GraphBackend(ABC):
+    """Common query API implemented by every backend."""
+
+    name = "base"
+    queries: Dict[str, str] = {}
+
+    @abstractmethod
+    def query(self, cypher: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Run a read query and return its records as dictionaries."""
+
+    def run_named(self, query_name: str, **parameters) -> List[Dict]:
+        """Run one of the named queries shared by all backends."""
+        return self.query(self.queries[query_name], parameters)
+
+    def top_movies_by_genre(self, genre: str, limit: int = 5) -> List[Dict]:
+        """Top movies by IMDb rating for a genre."""
+        return self.run_named("top_movies_by_genre", genre=genre, limit=limit)
+
+    def genres(self) -> List[str]:
+        """All genre names."""
+        return [record["name"] for record in self.run_named("genres")]
+
+    def movies_by_person(self, name: str) -> List[Dict]:
+        """Movies a person acted in or directed."""
+        return self.run_named("movies_by_person", name=name)
+
+    def co_actors(self, name: str, limit: int = 10) -> List[Dict]:
+        """People who acted together with a person most often."""
+        return self.run_named("co_actors", name=name, limit=limit)
+
+    def movie_ratings(self, title: str) -> Dict:
+        """Number of user ratings and average rating of a movie."""
+        records = self.run_named("movie_ratings", title=title)
+        return records[0] if records else {"ratings": 0, "averageRating": None}
+
+    def close(self):
+        """Release the underlying connection."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Neo4jBackend(GraphBackend):
+    """Backend served by a Neo4j server."""
+
+    name = "neo4j"
+    queries = NEO4J_QUERIES
+
+    def __init__(self, driver=None, database: Optional[str] = None, query_cache: bool = True):
+        from neo4j import GraphDatabase
+
+        from query_cache import get_cache
+        from query_profiler import instrument
+
+        self.owns_driver = driver is None
+        self.cache = get_cache() if query_cache else None
+        self.driver = instrument(driver or GraphDatabase.driver(
+            os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+            auth=(os.getenv("NEO4J_USERNAME", "neo4j"), os.getenv("NEO4J_PASSWORD", "password")),
+        ))
+        self.database = database or os.getenv("NEO4J_DATABASE", "neo4j")
+
+    def query(self, cypher: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        def fetch():
+            with self.driver.session(database=self.database) as session:
+                return session.run(cypher, parameters or {}).data()
+
+        if self.cache is None:
+            return fetch()
+        return self.cache.run(self.driver, cypher, parameters, fetch, database=self.database)
+
+    def close(self):
+        if self.owns_driver:
+            self.driver.close()
+
+
+class KuzuBackend(GraphBackend):
+    """Embedded backend reading an on-disk Kuzu database, no server required."""
+
+    name = "kuzu"
+    queries = KUZU_QUERIES
+
+    def __init__(self, db_path: str = KUZU_DATABASE, read_only: bool = True):
+        import kuzu
+
+        if not Path(db_path).exists():
+            raise FileNotFoundError(
+                f"Kuzu database not found: {db_path} "
+                "(create it with 12_kuzu-quickstart/movie_graph.py)"
+            )
+        self.db = kuzu.Database(db_path, read_only=read_only)
+        self.conn = kuzu.Connection(self.db)
+
+    def query(self, cypher: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        result = self.conn.execute(cypher, parameters or {})
+        return list(result.rows_as_dict())
+
+    def close(self):
+        self.conn.close()
+        self.db.close()
+
+
+def get_backend(name: Optional[str] = None, **kwargs) -> GraphBackend:
+    """Create the backend selected by name or the GRAPH_BACKEND variable."""
+    name = (name or os.getenv("GRAPH_BACKEND", "neo4j")).lower()
+    if name == "neo4j":
+        return Neo4jBackend(**kwargs)
+    if name == "kuzu":
+        return KuzuBackend(**kwargs)
+    raise ValueError(f"Unknown graph backend: {name}")
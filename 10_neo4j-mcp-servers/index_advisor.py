@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Index Advisor
+
+Derives the indexes the CRM ingest and the movie queries need, instead of
+relying on a hand-written initializing_queries.indexes list:
+
+    - the key property of every node in data_model.json, which relationship
+      loaders MATCH endpoints on (unless a uniqueness constraint covers it)
+    - properties looked up in MATCH/MERGE patterns and WHERE predicates of
+      the loading queries and the graph backend queries
+
+Equality, range, IN, STARTS WITH and IS NOT NULL lookups get a RANGE index,
+CONTAINS and ENDS WITH on strings a TEXT index, and regular expressions or
+predicates on toLower()/toUpper() of a property a FULLTEXT index per label.
+List-valued properties (Movie.genres) get no index. Indexes that already
+exist are left out. With --apply the missing ones are created and the
+advisor waits until those are ONLINE, so it can run before data loads.
+
+Usage:
+    python index_advisor.py                 # print the recommended statements
+    python index_advisor.py --apply         # create them and wait for them
+    python index_advisor.py --config ingest_config.yaml --no-backend-queries
+
+Requirements:
+    - .env file with NEO4J_URI, NEO4J_USERNAME and NEO4J_PASSWORD for --apply
+      or to leave out existing indexes
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import argparse
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import yaml
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+DATA_MODEL_FILE = "assets/data_model/data_model.json"
+CONFIG_FILE = "ingest_config.yaml"
+
+CLAUSE_KEYWORDS = (
+    r"OPTIONAL\s+MATCH|MATCH|MERGE|CREATE|WHERE|(?<!STARTS )(?<!ENDS )WITH|RETURN|UNWIND|SET|REMOVE|"
+    r"DETACH\s+DELETE|DELETE|CALL|ORDER\s+BY|SKIP|LIMIT|FOREACH|UNION|ON\s+CREATE|ON\s+MATCH"
+)
+CLAUSE_PATTERN = re.compile(rf"\b({CLAUSE_KEYWORDS})\b", re.IGNORECASE)
+NODE_PATTERN = re.compile(r"\(\s*(\w*)\s*((?::\s*`?\w+`?\s*)+)(\{[^}]*\})?\s*\)")
+RELATIONSHIP_PATTERN = re.compile(r"\[\s*(\w*)\s*:\s*`?(\w+)`?[^\]{]*(\{[^}]*\})?\s*\]")
+MAP_KEY_PATTERN = re.compile(r"(\w+)\s*:")
+PREDICATE_PATTERN = re.compile(
+    r"(?:(\w+)\s*\(\s*)?\b(\w+)\.(\w+)\s*\)?\s*"
+    r"(<>|<=|>=|=~|=|<|>|IN\b|STARTS\s+WITH|ENDS\s+WITH|CONTAINS|IS\s+NOT\s+NULL)",
+    re.IGNORECASE,
+)
+INDEX_NAME_PATTERN = re.compile(r"\bINDEX\s+`?(\w+)`?\s+(?:IF\s+NOT\s+EXISTS\s+)?FOR\b", re.IGNORECASE)
+CONSTRAINT_PATTERN = re.compile(
+    r"FOR\s*\(\s*(\w+)\s*:\s*`?(\w+)`?\s*\)\s*REQUIRE\s*\(?([\w.,\s]+?)\)?\s+IS\s+(?:UNIQUE|NODE\s+KEY)",
+    re.IGNORECASE,
+)
+
+RANGE_OPERATORS = {"=", "<>", "<", ">", "<=", ">=", "IN", "STARTS WITH", "IS NOT NULL"}
+TEXT_OPERATORS = {"CONTAINS", "ENDS WITH"}
+CASE_FUNCTIONS = {"tolower", "toupper"}
+
+
+def index_key(spec: Dict) -> Tuple:
+    """Identity of an index: type, entity, label or type, properties."""
+    return spec["type"], spec["entity"], spec["label"], tuple(spec["properties"])
+
+
+def index_name(spec: Dict) -> str:
+    """Name of a recommended index, e.g. movie_title or movie_genres_text."""
+    base = spec["label"].lower()
+    if spec["type"] == "FULLTEXT":
+        return f"{base}_fulltext"
+    name = f"{base}_{'_'.join(spec['properties'])}"
+    return name if spec["type"] == "RANGE" else f"{name}_{spec['type'].lower()}"
+
+
+def statement_index_name(statement: str) -> Optional[str]:
+    """Name given in a CREATE ... INDEX statement, None for unnamed indexes."""
+    match = INDEX_NAME_PATTERN.search(statement)
+    return match.group(1) if match else None
+
+
+def index_statement(spec: Dict) -> str:
+    """CREATE ... INDEX statement for a recommended index."""
+    name = index_name(spec)
+    if spec["entity"] == "NODE":
+        pattern = f"(n:`{spec['label']}`)"
+    else:
+        pattern = f"()-[n:`{spec['label']}`]-()"
+    fields = ", ".join(f"n.`{p}`" for p in spec["properties"])
+    if spec["type"] == "FULLTEXT":
+        return f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR {pattern} ON EACH [{fields}]"
+    prefix = "CREATE INDEX" if spec["type"] == "RANGE" else f"CREATE {spec['type']} INDEX"
+    return f"{prefix} {name} IF NOT EXISTS FOR {pattern} ON ({fields})"
+
+
+def split_clauses(query: str) -> List[Tuple[str, str]]:
+    """Split a Cypher query into (keyword, body) pairs."""
+    query = " ".join(query.split())
+    matches = list(CLAUSE_PATTERN.finditer(query))
+    clauses = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(query)
+        keyword = " ".join(match.group(1).upper().split())
+        clauses.append((keyword, query[match.end():end]))
+    return clauses
+
+
+def map_keys(properties: Optional[str]) -> List[str]:
+    """Keys of an inline property map such as {accountId: record.targetId}."""
+    if not properties:
+        return []
+    return MAP_KEY_PATTERN.findall(properties.strip("{}"))
+
+
+def query_lookups(query: str) -> List[Dict]:
+    """Properties a query looks entities up by.
+
+    Returns:
+        List of lookups with entity, label, property and operator
+    """
+    clauses = split_clauses(query)
+    labels: Dict[str, str] = {}
+    relationship_types: Dict[str, str] = {}
+    lookups = []
+
+    for keyword, body in clauses:
+        for variable, label_text, properties in NODE_PATTERN.findall(body):
+            label = label_text.replace("`", "").split(":")[1].strip()
+            if variable:
+                labels.setdefault(variable, label)
+            if keyword in ("MATCH", "OPTIONAL MATCH", "MERGE"):
+                for prop in map_keys(properties):
+                    lookups.append({"entity": "NODE", "label": label, "property": prop, "operator": "="})
+        for variable, rel_type, properties in RELATIONSHIP_PATTERN.findall(body):
+            if variable:
+                relationship_types.setdefault(variable, rel_type)
+            if keyword in ("MATCH", "OPTIONAL MATCH", "MERGE"):
+                for prop in map_keys(properties):
+                    lookups.append({"entity": "RELATIONSHIP", "label": rel_type, "property": prop, "operator": "="})
+
+    for keyword, body in clauses:
+        if keyword != "WHERE":
+            continue
+        for function, variable, prop, operator in PREDICATE_PATTERN.findall(body):
+            operator = " ".join(operator.upper().split())
+            if function.lower() in CASE_FUNCTIONS or operator == "=~":
+                operator = "FULLTEXT"
+            elif function:
+                # Any other function hides the property from index lookups
+                continue
+            if variable in labels:
+                lookups.append({"entity": "NODE", "label": labels[variable], "property": prop, "operator": operator})
+            elif variable in relationship_types:
+                lookups.append({
+                    "entity": "RELATIONSHIP", "label": relationship_types[variable],
+                    "property": prop, "operator": operator,
+                })
+    return lookups
+
+
+def constraint_properties(statements: Iterable[str]) -> Set[Tuple[str, str]]:
+    """(label, property) pairs covered by uniqueness or node key constraints."""
+    covered = set()
+    for statement in statements:
+        for variable, label, properties in CONSTRAINT_PATTERN.findall(statement):
+            props = [p.strip().split(".")[-1] for p in properties.split(",")]
+            # Composite constraints only back lookups on the full property list
+            if len(props) == 1:
+                covered.add((label, props[0]))
+    return covered
+
+
+def iter_config_queries(config: Dict) -> Iterable[Tuple[str, str]]:
+    """(name, Cypher) of every loading query in an ingest configuration."""
+    loading = config.get("loading_queries", {}) or {}
+    for group in ("nodes", "relationships"):
+        for name, entry in (loading.get(group, {}) or {}).items():
+            if entry.get("query"):
+                yield f"{group}.{name}", entry["query"]
+
+
+class IndexAdvisor:
+    """Recommend and create the indexes used by the loading and read queries."""
+
+    def __init__(self, data_model: Optional[Dict] = None, config: Optional[Dict] = None,
+                 queries: Optional[Dict[str, str]] = None,
+                 property_types: Optional[Dict[Tuple[str, str], str]] = None):
+        """
+        Initialize the advisor.
+
+        Args:
+            data_model: Parsed data_model.json
+            config: Parsed ingest configuration with loading and initializing queries
+            queries: Additional named Cypher queries, e.g. the graph backend queries
+            property_types: Types of (label, property) pairs not in the data model
+        """
+        self.logger = logging.getLogger(__name__)
+        self.data_model = data_model or {"nodes": [], "relationships": []}
+        self.config = config or {}
+        self.queries = dict(iter_config_queries(self.config))
+        self.queries.update(queries or {})
+        self.property_types = {
+            (node["label"], prop["name"]): prop["type"]
+            for node in self.data_model.get("nodes", [])
+            for prop in [node["key_property"], *node.get("properties", [])]
+            if prop
+        }
+        self.property_types.update(property_types or {})
+
+    @classmethod
+    def from_files(cls, data_model_file: str = DATA_MODEL_FILE, config_file: Optional[str] = CONFIG_FILE,
+                   include_backend_queries: bool = True) -> "IndexAdvisor":
+        """Create an advisor from data_model.json, an optional config file and the backend queries."""
+        with open(data_model_file, "r", encoding="utf-8") as f:
+            data_model = json.load(f)
+        config = {}
+        if config_file and os.path.exists(config_file):
+            with open(config_file, "r", encoding="utf-8") as f:
+                config = yaml.safe_load(f) or {}
+        queries, property_types = {}, {}
+        if include_backend_queries:
+            from graph_backend import NEO4J_PROPERTY_TYPES, NEO4J_QUERIES
+            queries = {f"backend.{name}": query for name, query in NEO4J_QUERIES.items()}
+            property_types = NEO4J_PROPERTY_TYPES
+        return cls(data_model, config, queries, property_types)
+
+    def is_string(self, label: str, prop: str) -> bool:
+        """Whether a property holds strings; unknown properties are assumed to."""
+        return self.property_types.get((label, prop), "STRING") == "STRING"
+
+    def is_list(self, label: str, prop: str) -> bool:
+        """Whether a property holds lists, which neither RANGE nor TEXT indexes serve."""
+        return self.property_types.get((label, prop), "").startswith("LIST")
+
+    def recommend(self) -> List[Dict]:
+        """Indexes needed by the data model and the queries.
+
+        Returns:
+            List of index specs with type, entity, label, properties and reasons
+        """
+        initializing = self.config.get("initializing_queries", {}) or {}
+        covered = constraint_properties(initializing.get("constraints", []) or [])
+        specs: Dict[Tuple, Dict] = {}
+
+        def add(index_type: str, entity: str, label: str, properties: List[str], reason: str):
+            spec = {"type": index_type, "entity": entity, "label": label, "properties": properties}
+            specs.setdefault(index_key(spec), {**spec, "reasons": []})["reasons"].append(reason)
+
+        for node in self.data_model.get("nodes", []):
+            key = node.get("key_property")
+            if key and (node["label"], key["name"]) not in covered:
+                add("RANGE", "NODE", node["label"], [key["name"]], "data model key")
+
+        fulltext: Dict[Tuple[str, str], List[str]] = {}
+        for name, query in self.queries.items():
+            for lookup in query_lookups(query):
+                entity, label, prop, operator = (lookup[k] for k in ("entity", "label", "property", "operator"))
+                if self.is_list(label, prop):
+                    continue
+                if operator in RANGE_OPERATORS:
+                    if entity == "NODE" and (label, prop) in covered:
+                        continue
+                    add("RANGE", entity, label, [prop], f"{name}: {prop} {operator}")
+                elif operator in TEXT_OPERATORS and self.is_string(label, prop):
+                    add("TEXT", entity, label, [prop], f"{name}: {prop} {operator}")
+                elif operator == "FULLTEXT":
+                    props = fulltext.setdefault((entity, label), [])
+                    if prop not in props:
+                        props.append(prop)
+        for (entity, label), props in fulltext.items():
+            add("FULLTEXT", entity, label, props, f"case-insensitive or regex search on {', '.join(props)}")
+
+        # An IS NOT NULL guard next to CONTAINS is served by the text index
+        text_indexed = {(spec["entity"], spec["label"], spec["properties"][0])
+                        for spec in specs.values() if spec["type"] == "TEXT"}
+        return [
+            spec for spec in specs.values()
+            if not (spec["type"] == "RANGE"
+                    and (spec["entity"], spec["label"], spec["properties"][0]) in text_indexed
+                    and all(reason.endswith("IS NOT NULL") for reason in spec["reasons"]))
+        ]
+
+    def existing(self, driver, database: Optional[str] = None) -> Set[Tuple]:
+        """Keys of the indexes already present, including constraint-backed ones."""
+        with driver.session(database=database) as session:
+            records = session.run(
+                "SHOW INDEXES YIELD type, entityType, labelsOrTypes, properties "
+                "WHERE labelsOrTypes IS NOT NULL "
+                "RETURN type, entityType, labelsOrTypes, properties"
+            ).data()
+        keys = set()
+        for record in records:
+            for label in record["labelsOrTypes"]:
+                keys.add((record["type"], record["entityType"], label, tuple(record["properties"])))
+        return keys
+
+    def missing(self, driver=None, database: Optional[str] = None) -> List[Dict]:
+        """Recommended indexes not yet in the database (all of them without a driver)."""
+        specs = self.recommend()
+        if driver is None:
+            return specs
+        existing = self.existing(driver, database)
+        return [spec for spec in specs if index_key(spec) not in existing]
+
+    def statements(self, driver=None, database: Optional[str] = None) -> List[str]:
+        """CREATE INDEX statements for the missing indexes."""
+        return [index_statement(spec) for spec in self.missing(driver, database)]
+
+    def apply(self, driver, database: Optional[str] = None, timeout: float = 300.0) -> List[str]:
+        """Create the missing indexes and wait until they are online."""
+        statements = self.statements(driver, database)
+        with driver.session(database=database) as session:
+            for statement in statements:
+                session.run(statement).consume()
+                self.logger.info(f"Created index: {statement}")
+        if statements:
+            wait_for_indexes(driver, [statement_index_name(statement) for statement in statements], database, timeout)
+        return statements
+
+
+def wait_for_indexes(driver, names: Iterable[str], database: Optional[str] = None, timeout: float = 300.0,
+                     interval: float = 1.0):
+    """Block until the named indexes are ONLINE; other indexes are not looked at.
+
+    Raises:
+        RuntimeError: One of the indexes failed to populate
+        TimeoutError: Indexes were still populating after timeout seconds
+    """
+    names = sorted({name for name in names if name})
+    if not names:
+        return
+    deadline = time.time() + timeout
+    while True:
+        with driver.session(database=database) as session:
+            pending = session.run(
+                "SHOW INDEXES YIELD name, state, populationPercent "
+                "WHERE name IN $names AND state <> 'ONLINE' RETURN name, state, populationPercent",
+                {"names": names},
+            ).data()
+        failed = [index["name"] for index in pending if index["state"] == "FAILED"]
+        if failed:
+            raise RuntimeError(f"Index population failed: {', '.join(failed)}")
+        if not pending:
+            return
+        if time.time() > deadline:
+            raise TimeoutError(f"Indexes still populating after {timeout}s: "
+                               f"{', '.join(index['name'] for index in pending)}")
+        logger.info("Waiting for indexes: " + ", ".join(
+            f"{index['name']} {index['populationPercent']:.0f}%" for index in pending
+        ))
+        time.sleep(interval)
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Recommend and create indexes for the CRM and movie graphs")
+    parser.add_argument("--data-model", default=DATA_MODEL_FILE, help="Path to data_model.json")
+    parser.add_argument("--config", default=CONFIG_FILE, help="Ingest configuration with loading queries")
+    parser.add_argument("--no-backend-queries", action="store_true", help="Ignore the graph backend queries")
+    parser.add_argument("--apply", action="store_true", help="Create missing indexes and wait for them")
+    parser.add_argument("--offline", action="store_true", help="Do not connect; list every recommended index")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for index population")
+    args = parser.parse_args()
+
+    advisor = IndexAdvisor.from_files(args.data_model, args.config, not args.no_backend_queries)
+    driver = None
+    database = None
+    if not args.offline:
+        from neo4j import GraphDatabase
+
+        load_dotenv()
+        database = os.getenv("NEO4J_DATABASE", "neo4j")
+        driver = GraphDatabase.driver(
+            os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+            auth=(os.getenv("NEO4J_USERNAME", "neo4j"), os.getenv("NEO4J_PASSWORD", "password")),
+        )
+
+    try:
+        if args.apply:
+            if driver is None:
+                logger.error("--apply needs a database connection")
+                return 1
+            statements = advisor.apply(driver, database, args.timeout)
+            logger.info(f"Created {len(statements)} indexes")
+        else:
+            for spec in advisor.missing(driver, database):
+                print(f"{index_statement(spec)};  // {'; '.join(spec['reasons'])}")
+    except Exception as e:
+        logger.error(f"Index advisor failed: {e}")
+        return 1
+    finally:
+        if driver:
+            driver.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -4,9 +4,18 @@ Neo4j Data Ingest Script
 
 This script loads CRM data from CSV files into Neo4j using the data model
 and configuration specified in ingest_config.yaml and data_model/data_model.json.
+When the configuration lists no indexes, they are derived by index_advisor.py.
+Node and relationship types that are still empty are loaded with CREATE
+instead of MERGE (see initial_load.py). Relationship records whose end nodes
+neither were among the loaded nodes nor already exist in the database are
+counted and reported instead of being sent (see reference_filter.py).
+
+Every write evicts the labels and relationship types it touches from the
+shared query cache (misc/query_cache.py).
 
 Usage:
     python ingest.py
+    python ingest.py --initial-load   # CREATE everywhere, for a known-empty database
 
 Requirements:
     - Neo4j database running and accessible
@@ -16,28 +25,80 @@ Requirements:
 """
 
 import os
+import sys
 import csv
 import json
 import yaml
 import logging
+import argparse
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime
 
+import numpy as np
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+from index_advisor import DATA_MODEL_FILE, IndexAdvisor, statement_index_name, wait_for_indexes
+from initial_load import create_plan, deduplicate, target_is_empty
+from query_profiler import instrument
+from reference_filter import KeySet, record_lookups
+
+# The query cache lives with the other shared tools in misc/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "misc"))
+
+from query_cache import get_cache  # noqa: E402
+
+
+def case_owner_id(name: str) -> Optional[str]:
+    """Generate a unique ID for a case owner from their name."""
+    if not name or name.strip() == '':
+        return None
+    return name.lower().replace(' ', '_').replace('.', '')
+
 
 class Neo4jIngest:
     """Main class for ingesting CRM data into Neo4j."""
     
-    def __init__(self, config_file: str = "ingest_config.yaml"):
-        """Initialize the ingest process."""
+    def __init__(
+        self,
+        config_file: str = "ingest_config.yaml",
+        config: Optional[Dict] = None,
+        driver=None,
+        data_dir: str = "data",
+        initial_load: Optional[bool] = None,
+    ):
+        """Initialize the ingest process.
+        
+        Args:
+            config_file: YAML configuration file, ignored when config is given
+            config: Already loaded configuration
+            driver: Existing Neo4j driver to use instead of connecting from .env
+            data_dir: Directory containing the CSV files
+            initial_load: True to always CREATE, False to always MERGE, None to
+                CREATE only into node and relationship types that are still empty
+        """
         self.setup_logging()
-        self.load_environment()
-        self.load_config(config_file)
+        self.data_dir = Path(data_dir)
+        self.initial_load = initial_load
+        # Keys of the nodes loaded in this run, per (label, key property)
+        self.key_sets: Dict[Tuple[str, str], KeySet] = {}
+        # Key sets of labels MERGEd into, which may miss nodes of earlier runs
+        self.partial_keys: Set[Tuple[str, str]] = set()
+        # Dangling references per relationship type of the last load_relationships
+        self.dangling: Dict[str, Dict[str, Any]] = {}
         
-        self.connect_to_neo4j()
+        if config is not None:
+            self.config = config
+        else:
+            self.load_config(config_file)
+            
+        if driver is not None:
+            self.driver = instrument(driver)
+            self.neo4j_database = os.getenv("NEO4J_DATABASE", "neo4j")
+        else:
+            self.load_environment()
+            self.connect_to_neo4j()
         
     def setup_logging(self):
         """Configure logging."""
@@ -74,10 +135,10 @@ class Neo4jIngest:
     def connect_to_neo4j(self):
         """Establish connection to Neo4j database."""
         try:
-            self.driver = GraphDatabase.driver(
+            self.driver = instrument(GraphDatabase.driver(
                 self.neo4j_uri,
                 auth=(self.neo4j_username, self.neo4j_password)
-            )
+            ))
             # Test connection
             self.driver.verify_connectivity()
             self.logger.info("Successfully connected to Neo4j")
@@ -85,15 +146,18 @@ class Neo4jIngest:
             raise ConnectionError(f"Failed to connect to Neo4j: {e}")
             
     def run_query(self, query: str, parameters: Optional[Dict] = None):
-        """Execute a Cypher query."""
-        with self.driver.session(database=self.neo4j_database) as session:
-            try:
-                result = session.run(query, parameters or {})
-                return result.consume()
-            except Exception as e:
-                self.logger.error(f"Query failed: {query}")
-                self.logger.error(f"Error: {e}")
-                raise
+        """Execute a Cypher write query and evict what it may have changed from the query cache."""
+        try:
+            with self.driver.session(database=self.neo4j_database) as session:
+                try:
+                    result = session.run(query, parameters or {})
+                    return result.consume()
+                except Exception as e:
+                    self.logger.error(f"Query failed: {query}")
+                    self.logger.error(f"Error: {e}")
+                    raise
+        finally:
+            get_cache().invalidate_query(query)
                 
     def create_constraints(self):
         """Create database constraints."""
@@ -116,6 +180,16 @@ class Neo4jIngest:
         self.logger.info("Creating database indexes...")
         indexes = self.config.get('initializing_queries', {}).get('indexes', []) or []
         
+        if not indexes:
+            # Derive lookups on keys and query predicates from the data model and loading queries
+            data_model = None
+            if Path(DATA_MODEL_FILE).exists():
+                with open(DATA_MODEL_FILE, 'r') as f:
+                    data_model = json.load(f)
+            advisor = IndexAdvisor(data_model=data_model, config=self.config)
+            indexes = advisor.statements(self.driver, self.neo4j_database)
+            self.logger.info(f"Index advisor recommends {len(indexes)} indexes")
+            
         if not indexes:
             self.logger.info("No indexes to create")
             return
@@ -131,10 +205,90 @@ class Neo4jIngest:
                     self.logger.error(f"Failed to create index: {e}")
                     raise
                     
+        # Loads should not start before the indexes they MATCH on are usable
+        wait_for_indexes(self.driver, [statement_index_name(index) for index in indexes], self.neo4j_database)
+        self.logger.info("All created indexes are online")
+                    
+    def loading_query(self, name: str, query: str, records: List[Dict]) -> Tuple[str, List[Dict]]:
+        """Query and records for a load: CREATE into an empty target, MERGE otherwise."""
+        plan = create_plan(query) if self.initial_load is not False else None
+        if plan is None:
+            return query, records
+        if self.initial_load is None and not target_is_empty(self.driver, self.neo4j_database, plan):
+            return query, records
+            
+        unique = deduplicate(records, plan['key_fields'])
+        self.logger.info(
+            f"Initial load of {name}: CREATE instead of MERGE, "
+            f"{len(records) - len(unique)} duplicate or keyless records dropped"
+        )
+        return plan['query'], unique
+        
+    def remember_keys(self, query: str, records: List[Dict]):
+        """Record the keys of loaded nodes for the relationship pre-filter.
+        
+        A CREATE load went into an empty label, so its keys are all the label
+        has; after a MERGE load the label may also hold nodes of earlier runs.
+        """
+        for keyword in ('CREATE', 'MERGE'):
+            for label, key_property, field in record_lookups(query, (keyword,)):
+                keys = self.key_sets.setdefault((label, key_property), KeySet())
+                keys.add(record.get(field) for record in records)
+                if keyword == 'MERGE':
+                    self.partial_keys.add((label, key_property))
+                    
+    def existing_keys(self, label: str, key_property: str, values: List[Any]) -> List[Any]:
+        """Those of the values that are keys of nodes already in the database."""
+        query = (
+            f"UNWIND $keys AS key MATCH (n:`{label}` {{`{key_property}`: key}}) "
+            f"RETURN collect(DISTINCT key) AS existing"
+        )
+        with self.driver.session(database=self.neo4j_database) as session:
+            record = session.run(query, {'keys': values}).single()
+        return record['existing'] if record else []
+            
+    def resolvable_records(self, relationship_type: str, query: str, records: List[Dict]) -> List[Dict]:
+        """Drop records whose MATCHed end nodes do not exist, counting them per end.
+        
+        Keys missing from a partial key set are looked up in the database
+        before their records are dropped.
+        """
+        lookups = [
+            lookup for lookup in record_lookups(query, ('MATCH',))
+            if (lookup[0], lookup[1]) in self.key_sets
+        ]
+        if not lookups or not records:
+            return records
+            
+        resolvable = np.ones(len(records), dtype=bool)
+        missing = {}
+        for label, key_property, field in lookups:
+            keys = self.key_sets[(label, key_property)]
+            values = [record.get(field) for record in records]
+            found = keys.contains(values)
+            if (label, key_property) in self.partial_keys and not found.all():
+                unknown = list(dict.fromkeys(values[i] for i in np.flatnonzero(~found) if values[i] is not None))
+                if unknown:
+                    keys.add(self.existing_keys(label, key_property, unknown))
+                    found = keys.contains(values)
+            missing[f"{label}.{key_property}"] = int((~found).sum())
+            resolvable &= found
+            
+        dangling = int((~resolvable).sum())
+        if dangling:
+            samples = [records[i] for i in np.flatnonzero(~resolvable)[:5]]
+            self.dangling[relationship_type] = {'records': dangling, 'missing': missing, 'samples': samples}
+            self.logger.warning(
+                f"{relationship_type}: {dangling} of {len(records)} records reference nodes that do not exist "
+                f"({', '.join(f'{end}: {count}' for end, count in missing.items() if count)}), "
+                f"e.g. {samples[0]}"
+            )
+        return [record for record, keep in zip(records, resolvable) if keep]
+        
     def load_csv_data(self, file_path: str, field_mappings: Dict[str, str]) -> List[Dict]:
         """Load and transform CSV data according to field mappings."""
         records = []
-        csv_path = Path("data") / file_path
+        csv_path = self.data_dir / file_path
         
         if not csv_path.exists():
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
@@ -189,16 +343,14 @@ class Neo4jIngest:
         
     def generate_case_owner_id(self, name: str) -> str:
         """Generate a unique ID for case owners from their names."""
-        if not name or name.strip() == '':
-            return None
-        return name.lower().replace(' ', '_').replace('.', '')
+        return case_owner_id(name)
         
     def load_case_owners(self):
         """Load unique case owners from cases.csv."""
         self.logger.info("Loading case owners...")
         
         # Get unique case owners from cases.csv
-        csv_path = Path("data") / "cases.csv"
+        csv_path = self.data_dir / "cases.csv"
         case_owners = set()
         
         with open(csv_path, 'r', encoding='utf-8') as f:
@@ -218,7 +370,9 @@ class Neo4jIngest:
             
         # Load into Neo4j
         query = self.config['loading_queries']['nodes']['CaseOwner']['query']
+        query, records = self.loading_query('CaseOwner', query, records)
         self.run_query(query, {'records': records})
+        self.remember_keys(query, records)
         self.logger.info(f"Loaded {len(records)} case owners")
         
     def load_nodes(self):
@@ -242,6 +396,7 @@ class Neo4jIngest:
             query = config['query']
             
             records = self.load_csv_data(source_file, field_mappings)
+            query, records = self.loading_query(node_type, query, records)
             
             # Process records in batches
             batch_size = 1000
@@ -249,6 +404,7 @@ class Neo4jIngest:
                 batch = records[i:i + batch_size]
                 self.run_query(query, {'records': batch})
                 
+            self.remember_keys(query, records)
             self.logger.info(f"Loaded {len(records)} {node_type} nodes")
             
     def load_relationships(self):
@@ -256,6 +412,7 @@ class Neo4jIngest:
         self.logger.info("Loading relationships...")
         
         relationships_config = self.config.get('loading_queries', {}).get('relationships', {})
+        self.dangling = {}
         
         for relationship_type, config in relationships_config.items():
             if relationship_type == 'CONVERTED_TO_OPPORTUNITY':
@@ -273,6 +430,8 @@ class Neo4jIngest:
                 records = self.load_assigned_to_relationships()
             else:
                 records = self.load_csv_data(source_data, field_mappings)
+            records = self.resolvable_records(relationship_type, query, records)
+            query, records = self.loading_query(relationship_type, query, records)
             
             # Process records in batches
             batch_size = 1000
@@ -286,10 +445,17 @@ class Neo4jIngest:
                     
             self.logger.info(f"Loaded {len(records)} {relationship_type} relationships")
             
+        if self.dangling:
+            total = sum(report['records'] for report in self.dangling.values())
+            self.logger.warning(
+                f"Skipped {total} relationship records with dangling references: "
+                + ", ".join(f"{name} {report['records']}" for name, report in self.dangling.items())
+            )
+            
     def load_assigned_to_relationships(self) -> List[Dict]:
         """Load ASSIGNED_TO relationships with proper case owner ID transformation."""
         records = []
-        csv_path = Path("data") / "cases.csv"
+        csv_path = self.data_dir / "cases.csv"
         
         with open(csv_path, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
@@ -358,9 +524,14 @@ class Neo4jIngest:
 
 def main():
     """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load the CRM data into Neo4j")
+    parser.add_argument("--initial-load", action="store_true",
+                        help="Load with CREATE instead of MERGE; the database must be empty")
+    args = parser.parse_args()
+    
     ingest = None
     try:
-        ingest = Neo4jIngest()
+        ingest = Neo4jIngest(initial_load=True if args.initial_load else None)
         ingest.run_ingest()
         ingest.verify_data()
         
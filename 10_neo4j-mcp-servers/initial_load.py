@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Initial-Load Fast Path
+
+The loading queries of ingest_config.yaml MERGE every row, which costs an
+index lookup per row even when the target label or relationship type is
+still empty. For such loads the MERGE can be replaced by a CREATE:
+
+    UNWIND $records AS record                 UNWIND $records AS record
+    MERGE (n:Account {accountId: ...})   ->   CREATE (n:Account {accountId: ...})
+    SET n += record                           SET n += record
+
+provided no two records of a load hit the same entity. Records are therefore
+deduplicated client-side on the record fields the MATCH/MERGE patterns use,
+keeping the last record per key, which is the record whose SET a MERGE would
+have applied last. Uniqueness constraints stay in place, so a record that
+slips through still fails loudly instead of creating a duplicate.
+
+Queries that cannot be rewritten safely (no or several MERGE clauses,
+ON MATCH SET, MERGE of a path) keep their MERGE.
+
+Usage:
+    plan = create_plan(query)
+    if plan and target_is_empty(driver, database, plan):
+        query, records = plan["query"], deduplicate(records, plan["key_fields"])
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from index_advisor import NODE_PATTERN, RELATIONSHIP_PATTERN, split_clauses
+
+UNWIND_VARIABLE_PATTERN = re.compile(r"\bAS\s+(\w+)\s*$", re.IGNORECASE)
+MERGE_PATTERN = re.compile(r"\bMERGE\b", re.IGNORECASE)
+ON_CREATE_PATTERN = re.compile(r"\bON\s+CREATE\s+SET\b", re.IGNORECASE)
+
+
+def create_plan(query: str) -> Optional[Dict]:
+    """CREATE variant of a single-MERGE loading query.
+
+    Returns:
+        Dict with entity ("NODE" or "RELATIONSHIP"), label, key_fields (record
+        fields identifying the merged entity) and the rewritten query, or None
+        when the query has to keep its MERGE
+    """
+    clauses = split_clauses(query)
+    keywords = [keyword for keyword, _ in clauses]
+    if keywords.count("MERGE") != 1 or "ON MATCH" in keywords or "CALL" in keywords:
+        return None
+    unwind = [body for keyword, body in clauses if keyword == "UNWIND"]
+    variable = UNWIND_VARIABLE_PATTERN.search(unwind[0]) if len(unwind) == 1 else None
+    if not variable:
+        return None
+    field_pattern = re.compile(rf"\b{variable.group(1)}\.(\w+)")
+
+    merge_index = keywords.index("MERGE")
+    merge_body = clauses[merge_index][1]
+    relationships = RELATIONSHIP_PATTERN.findall(merge_body)
+    nodes = NODE_PATTERN.findall(merge_body)
+    if len(relationships) > 1 or (relationships and nodes):
+        # A merged path would also create its labelled end nodes
+        return None
+    if relationships:
+        entity, label = "RELATIONSHIP", relationships[0][1]
+    else:
+        if len(nodes) != 1:
+            return None
+        entity, label = "NODE", nodes[0][1].replace("`", "").split(":")[1].strip()
+
+    # Everything a MERGE would have looked the entity up by
+    key_fields = []
+    for keyword, body in clauses[:merge_index + 1]:
+        if keyword in ("MATCH", "MERGE"):
+            for field in field_pattern.findall(body):
+                if field not in key_fields:
+                    key_fields.append(field)
+    if not key_fields:
+        return None
+
+    rewritten = ON_CREATE_PATTERN.sub("SET", MERGE_PATTERN.sub("CREATE", query, count=1))
+    return {"entity": entity, "label": label, "key_fields": key_fields, "query": rewritten}
+
+
+def deduplicate(records: List[Dict], key_fields: List[str]) -> List[Dict]:
+    """Keep the last record per key, in order of first appearance.
+
+    Records with a null key are dropped: MERGE rejects them for nodes and
+    MATCHes nothing for relationships, while CREATE would store them.
+    """
+    latest: Dict[tuple, Dict] = {}
+    for record in records:
+        key = tuple(record.get(field) for field in key_fields)
+        if None not in key:
+            latest[key] = record
+    return list(latest.values())
+
+
+def target_is_empty(driver, database: Optional[str], plan: Dict) -> bool:
+    """Whether no node of the label or relationship of the type exists yet."""
+    if plan["entity"] == "NODE":
+        query = f"MATCH (n:`{plan['label']}`) WITH n LIMIT 1 RETURN count(n) AS found"
+    else:
+        query = f"MATCH ()-[r:`{plan['label']}`]->() WITH r LIMIT 1 RETURN count(r) AS found"
+    with driver.session(database=database) as session:
+        record = session.run(query).single()
+    return not record or not record["found"]
@@ -1,62 +1,39 @@
 #!/usr/bin/env python3
 """
 Movie Search CLI Application
-Connects to Neo4j and searches for top-rated movies by genre.
+Connects to the movie graph and searches for top-rated movies by genre.
+The graph is served by Neo4j or by an embedded Kuzu database, selected with
+GRAPH_BACKEND=neo4j|kuzu (see graph_backend.py). The genre typed by the user
+is completed and resolved with the autocomplete index (see autocomplete.py),
+so it need not be spelled exactly.
 """
 
-import os
 import sys
-from neo4j import GraphDatabase
-from dotenv import load_dotenv
+from typing import Optional
 
-load_dotenv()
+from autocomplete import AutocompleteIndex, open_index
+from graph_backend import GraphBackend, get_backend
 
-NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
-NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
-NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
 
-
-def get_top_movies_by_genre(genre: str) -> list:
+def get_top_movies_by_genre(genre: str, backend: Optional[GraphBackend] = None) -> list:
     """
-    Query Neo4j for top 5 movies by IMDb rating for a given genre.
+    Query the movie graph for top 5 movies by IMDb rating for a given genre.
 
     Args:
         genre: Genre name to search for
+        backend: Graph backend to query, created from the environment if omitted
 
     Returns:
         List of movie dictionaries with title, year, imdbRating, and genres
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USERNAME, NEO4J_PASSWORD))
+    owns_backend = backend is None
+    backend = backend or get_backend()
 
     try:
-        with driver.session(database=NEO4J_DATABASE) as session:
-            query = """
-                MATCH (m:Movie)
-                WHERE m.genres IS NOT NULL 
-                  AND m.imdbRating IS NOT NULL
-                  AND m.genres CONTAINS $genre
-                RETURN m.title, m.year, m.imdbRating, m.genres
-                ORDER BY m.imdbRating DESC
-                LIMIT 5
-            """
-
-            result = session.run(query, {"genre": genre})
-            movies = []
-
-            for record in result:
-                movies.append(
-                    {
-                        "title": record["m.title"],
-                        "year": record["m.year"],
-                        "imdbRating": record["m.imdbRating"],
-                        "genres": record["m.genres"],
-                    }
-                )
-
-            return movies
+        return backend.top_movies_by_genre(genre, limit=5)
     finally:
-        driver.close()
+        if owns_backend:
+            backend.close()
 
 
 def display_movies(genre: str, movies: list) -> None:
@@ -86,26 +63,58 @@ def display_movies(genre: str, movies: list) -> None:
     print(f"{'=' * 80}\n")
 
 
+def enable_genre_completion(index: AutocompleteIndex) -> None:
+    """Complete genre names with the tab key where readline is available."""
+    try:
+        import readline
+    except ImportError:
+        return
+
+    def complete(text, state):
+        names = [match["name"] for match in index.complete(text, label="Genre")]
+        return names[state] if state < len(names) else None
+
+    readline.set_completer_delims("")
+    readline.set_completer(complete)
+    readline.parse_and_bind("tab: complete")
+
+
 def main():
     """Main entry point for the application."""
     print("\n" + "=" * 80)
     print("Neo4j Movie Search - Find Top Rated Movies by Genre")
     print("=" * 80)
 
+    backend = None
     try:
+        backend = get_backend()
+        index = open_index(backend)
+        enable_genre_completion(index)
+
         genre = input("\nEnter a genre name (e.g., Comedy, Action, Drama): ").strip()
 
         if not genre:
             print("Error: Genre name cannot be empty")
             sys.exit(1)
 
+        match = index.resolve(genre, label="Genre")
+        if match is None:
+            print(f"Error: No genre matches '{genre}'")
+            sys.exit(1)
+        if match["name"] != genre:
+            print(f"Using genre: {match['name']}")
+        genre = match["name"]
+
         print(f"\nSearching for top movies in genre: {genre}...")
-        movies = get_top_movies_by_genre(genre)
+        movies = get_top_movies_by_genre(genre, backend)
         display_movies(genre, movies)
 
     except Exception as e:
         print(f"\nError: {e}")
         sys.exit(1)
+    finally:
+        if backend is not None:
+            backend.close()
 
 
 if __name__ == "__main__":
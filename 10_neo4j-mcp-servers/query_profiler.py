@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Query Profiler
+
+Opt-in instrumentation for the Neo4j driver. instrument(driver) returns the
+driver unchanged unless NEO4J_PROFILE=1; otherwise it returns a wrapper whose
+sessions and transactions time every Cypher call. Code that only calls
+driver.session().run(...), such as execute_query in utils.py,
+Neo4jIngest.run_query and the Neo4j graph backend used by movie_search,
+needs no other change.
+
+For each distinct query the profiler keeps a latency histogram. The first
+call and then every NEO4J_PROFILE_SAMPLE_EVERY-th call is run with PROFILE
+and its plan is summarised: total db hits, rows, and any NodeByLabelScan or
+AllNodesScan operators. Calls slower than NEO4J_SLOW_QUERY_MS are appended
+to a JSON lines slow-query log. The histograms are written to
+NEO4J_PROFILE_REPORT when the process exits.
+
+Results of instrumented calls are fetched eagerly so they can be timed.
+
+Usage:
+    NEO4J_PROFILE=1 python movie_search.py Comedy
+    NEO4J_PROFILE=1 NEO4J_SLOW_QUERY_MS=50 python ingest.py
+    python query_profiler.py query_profile.json
+
+Requirements:
+    - neo4j Python driver
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency histogram buckets in milliseconds
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+# Operators that read every node of a label or of the whole graph
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+
+# Statements that cannot be prefixed with PROFILE
+UNPROFILABLE_PREFIXES = ("PROFILE", "EXPLAIN", "CREATE CONSTRAINT", "CREATE INDEX", "CREATE RANGE",
+                         "CREATE TEXT", "CREATE POINT", "CREATE FULLTEXT", "CREATE VECTOR", "CREATE LOOKUP",
+                         "DROP", "SHOW", "CALL DB.", "CALL DBMS.", "CYPHER ", "USE ")
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so the same query always maps to the same key."""
+    return " ".join(query.split())
+
+
+def can_profile(query: str) -> bool:
+    """Whether a query can be run with a PROFILE prefix."""
+    statement = normalize_query(query).upper()
+    return not statement.startswith(UNPROFILABLE_PREFIXES) and "IN TRANSACTIONS" not in statement
+
+
+def summarize_plan(plan: Optional[Dict]) -> Dict[str, Any]:
+    """Summarise a PROFILE plan: db hits, rows and full scan operators.
+
+    Args:
+        plan: ResultSummary.profile as returned by the server
+
+    Returns:
+        Dictionary with dbHits, rows, operators and scans
+    """
+    summary = {"dbHits": 0, "rows": 0, "operators": [], "scans": []}
+    if not plan:
+        return summary
+    summary["rows"] = plan.get("rows", 0)
+
+    stack = [plan]
+    while stack:
+        operator = stack.pop()
+        name = operator.get("operatorType", "").split("@")[0]
+        summary["dbHits"] += operator.get("dbHits", 0)
+        summary["operators"].append(name)
+        if name in SCAN_OPERATORS:
+            details = operator.get("args", {}).get("Details", "")
+            summary["scans"].append(f"{name}({details})" if details else name)
+        stack.extend(operator.get("children", []))
+    return summary
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float):
+        """Record one observation."""
+        self.counts[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the given percentile."""
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max_ms
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the histogram."""
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "meanMs": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50Ms": self.percentile(50),
+            "p99Ms": self.percentile(99),
+            "maxMs": round(self.max_ms, 3),
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+        }
+
+
+class QueryProfiler:
+    """Collect latencies, sampled plans and slow queries for Cypher calls."""
+
+    def __init__(
+        self,
+        slow_query_ms: float = 100.0,
+        sample_every: int = 100,
+        slow_log: Optional[str] = "slow_queries.log",
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            slow_query_ms: Calls at least this slow are written to the slow log
+            sample_every: Profile the first call of a query and every n-th after it, 0 disables
+            slow_log: JSON lines file for slow calls, None to keep them in memory only
+        """
+        self.logger = logging.getLogger(__name__)
+        self.slow_query_ms = slow_query_ms
+        self.sample_every = sample_every
+        self.slow_log = slow_log
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.plans: Dict[str, Dict[str, Any]] = {}
+        self.slow_queries: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "QueryProfiler":
+        """Create a profiler configured from NEO4J_* environment variables."""
+        return cls(
+            slow_query_ms=float(os.getenv("NEO4J_SLOW_QUERY_MS", "100")),
+            sample_every=int(os.getenv("NEO4J_PROFILE_SAMPLE_EVERY", "100")),
+            slow_log=os.getenv("NEO4J_SLOW_QUERY_LOG", "slow_queries.log"),
+        )
+
+    def should_profile(self, query: str) -> bool:
+        """Whether the next call of a query should be run with PROFILE."""
+        if not self.sample_every or not can_profile(query):
+            return False
+        histogram = self.histograms.get(normalize_query(query))
+        calls = histogram.count if histogram else 0
+        return calls % self.sample_every == 0
+
+    def run(self, runner, query: str, parameters: Optional[Dict] = None, **kwargs) -> "ProfiledResult":
+        """Run a query through session.run or tx.run and record it."""
+        profile = self.should_profile(query)
+        statement = f"PROFILE {query}" if profile else query
+
+        start = time.perf_counter()
+        result = runner(statement, parameters, **kwargs)
+        records = list(result)
+        summary = result.consume()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        self.record(query, parameters, duration_ms, summary, profile)
+        return ProfiledResult(records, summary, result.keys() if hasattr(result, "keys") else [])
+
+    def record(self, query: str, parameters: Optional[Dict], duration_ms: float, summary, profiled: bool):
+        """Add one call to the histograms, plan samples and slow log."""
+        key = normalize_query(query)
+        plan = summarize_plan(getattr(summary, "profile", None)) if profiled else None
+
+        with self.lock:
+            self.histograms.setdefault(key, LatencyHistogram()).add(duration_ms)
+            if plan is not None:
+                self.plans[key] = plan
+                if plan["scans"]:
+                    self.logger.warning(f"Full scan in query plan ({', '.join(plan['scans'])}): {key[:200]}")
+            if duration_ms < self.slow_query_ms:
+                return
+            entry = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "durationMs": round(duration_ms, 3),
+                "query": key,
+                "parameters": sorted(parameters or {}),
+                "plan": self.plans.get(key),
+            }
+            self.slow_queries.append(entry)
+            if self.slow_log:
+                with open(self.slow_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, default=str) + "\n")
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-query statistics, slowest mean first."""
+        with self.lock:
+            rows = [
+                {"query": key, **histogram.to_dict(), "plan": self.plans.get(key)}
+                for key, histogram in self.histograms.items()
+            ]
+        return sorted(rows, key=lambda row: row["meanMs"], reverse=True)
+
+    def write_report(self, path: str):
+        """Write the per-query statistics to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, default=str)
+        self.logger.info(f"Wrote query profile for {len(self.histograms)} queries to {path}")
+
+
+class ProfiledResult:
+    """Eagerly fetched result with the Result methods used in this repo."""
+
+    def __init__(self, records: List, summary, keys: List[str]):
+        self.records = records
+        self.summary = summary
+        self._keys = list(keys)
+
+    def __iter__(self) -> Iterator:
+        return iter(self.records)
+
+    def keys(self) -> List[str]:
+        return self._keys
+
+    def data(self, *keys) -> List[Dict[str, Any]]:
+        return [record.data(*keys) for record in self.records]
+
+    def single(self, strict: bool = False):
+        if strict and len(self.records) != 1:
+            raise ValueError(f"Expected exactly one record, got {len(self.records)}")
+        return self.records[0] if self.records else None
+
+    def value(self, key=0, default=None) -> List:
+        return [record.value(key, default) for record in self.records]
+
+    def values(self, *keys) -> List[List]:
+        return [record.values(*keys) for record in self.records]
+
+    def consume(self):
+        return self.summary
+
+
+class ProfilingTransaction:
+    """Transaction wrapper that records every run call."""
+
+    def __init__(self, tx, profiler: QueryProfiler):
+        self._tx = tx
+        self._profiler = profiler
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs) -> ProfiledResult:
+        return self._profiler.run(self._tx.run, query, parameters, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+    def __enter__(self):
+        self._tx.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._tx.__exit__(*exc)
+
+
+class ProfilingSession:
+    """Session wrapper that records run calls and managed transactions."""
+
+    def __init__(self, session, profiler: QueryProfiler):
+        self._session = session
+        self._profiler = profiler
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs) -> ProfiledResult:
+        return self._profiler.run(self._session.run, query, parameters, **kwargs)
+
+    def begin_transaction(self, *args, **kwargs) -> ProfilingTransaction:
+        return ProfilingTransaction(self._session.begin_transaction(*args, **kwargs), self._profiler)
+
+    def execute_read(self, work, *args, **kwargs):
+        return self._session.execute_read(lambda tx: work(ProfilingTransaction(tx, self._profiler), *args, **kwargs))
+
+    def execute_write(self, work, *args, **kwargs):
+        return self._session.execute_write(lambda tx: work(ProfilingTransaction(tx, self._profiler), *args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+    def __enter__(self):
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._session.__exit__(*exc)
+
+
+class ProfilingDriver:
+    """Driver wrapper whose sessions are instrumented."""
+
+    def __init__(self, driver, profiler: QueryProfiler):
+        self._driver = driver
+        self.profiler = profiler
+
+    def session(self, **kwargs) -> ProfilingSession:
+        return ProfilingSession(self._driver.session(**kwargs), self.profiler)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def __enter__(self):
+        self._driver.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._driver.__exit__(*exc)
+
+
+_default_profiler: Optional[QueryProfiler] = None
+
+
+def get_profiler() -> QueryProfiler:
+    """Process-wide profiler; writes its report to NEO4J_PROFILE_REPORT at exit (empty disables)."""
+    global _default_profiler
+    if _default_profiler is None:
+        _default_profiler = QueryProfiler.from_env()
+        report_path = os.getenv("NEO4J_PROFILE_REPORT", "query_profile.json")
+        if report_path:
+            atexit.register(_default_profiler.write_report, report_path)
+    return _default_profiler
+
+
+def profiling_enabled() -> bool:
+    """Whether NEO4J_PROFILE asks for instrumentation."""
+    return os.getenv("NEO4J_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+def instrument(driver, profiler: Optional[QueryProfiler] = None):
+    """Wrap a driver for profiling when enabled, otherwise return it unchanged.
+
+    Args:
+        driver: Neo4j driver
+        profiler: Profiler to record into; passing one enables instrumentation
+            regardless of NEO4J_PROFILE
+
+    Returns:
+        The driver or a ProfilingDriver around it
+    """
+    if isinstance(driver, ProfilingDriver):
+        return driver
+    if profiler is None:
+        if not profiling_enabled():
+            return driver
+        profiler = get_profiler()
+    return ProfilingDriver(driver, profiler)
+
+
+def main():
+    """Print a query profile report written by an instrumented run."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    path = sys.argv[1] if len(sys.argv) > 1 else "query_profile.json"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+    except FileNotFoundError:
+        logger.error(f"Report {path} not found, run a script with NEO4J_PROFILE=1 first")
+        return 1
+
+    print(f"\n{'=' * 100}")
+    print(f"{'Calls':>7} {'Mean ms':>9} {'p99 ms':>8} {'DB hits':>9}  Query")
+    print(f"{'-' * 100}")
+    for row in rows:
+        plan = row.get("plan") or {}
+        flag = " [" + ", ".join(plan["scans"]) + "]" if plan.get("scans") else ""
+        print(f"{row['count']:>7} {row['meanMs']:>9.2f} {row['p99Ms']:>8} {plan.get('dbHits', '-'):>9}  "
+              f"{row['query'][:60]}{flag}")
+    print(f"{'=' * 100}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
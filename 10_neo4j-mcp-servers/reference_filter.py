@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Client-Side Referential Pre-Filter
+
+A relationship loading query such as
+
+    UNWIND $records AS record
+    MATCH (s:Case {caseId: record.sourceId})
+    MATCH (t:CaseOwner {ownerId: record.targetId})
+    MERGE (s)-[:ASSIGNED_TO]->(t)
+
+silently produces nothing for records whose end nodes do not exist, so bad
+references cost a round trip and go unnoticed. While the node types are
+loaded, the ingest remembers their keys in a KeySet per (label, key
+property); relationship records are then checked against the key sets of the
+labels their MATCH patterns look up, and only resolvable records are sent.
+
+Keys are stored as sorted 64-bit hashes, about 8 bytes per key whatever the
+key length. A hash collision can only let a dangling record through to the
+server, where the MATCH drops it as before; it never drops a valid record.
+Labels that were not loaded in the same run are not checked. A label loaded
+with MERGE may also hold nodes of earlier runs, so keys missing from its key
+set are confirmed against the database with one UNWIND ... MATCH before
+their records are dropped; only CREATE loads, which went into an empty
+label, are trusted as complete.
+
+Usage:
+    keys = KeySet()
+    keys.add(record["accountId"] for record in account_records)
+    found = keys.contains([record["targetId"] for record in relationship_records])
+"""
+
+import re
+import hashlib
+from array import array
+from typing import Any, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from index_advisor import NODE_PATTERN, split_clauses
+
+MAP_ENTRY_TEMPLATE = r"(\w+)\s*:\s*{variable}\.(\w+)"
+
+
+def key_hash(value: Any) -> int:
+    """Signed 64-bit hash of a key; 1 and "1" differ, as they do in Neo4j."""
+    digest = hashlib.blake2b(f"{type(value).__name__}:{value}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def record_lookups(query: str, keywords: Sequence[str]) -> List[Tuple[str, str, str]]:
+    """(label, property, record field) of every node pattern keyed by a record field.
+
+    Args:
+        query: Loading query over UNWIND $records AS <variable>
+        keywords: Clauses to look in, e.g. ("MATCH",) or ("MERGE", "CREATE")
+    """
+    clauses = split_clauses(query)
+    unwind = [body for keyword, body in clauses if keyword == "UNWIND"]
+    variable = re.search(r"\bAS\s+(\w+)\s*$", unwind[0], re.IGNORECASE) if unwind else None
+    if not variable:
+        return []
+    entry_pattern = re.compile(MAP_ENTRY_TEMPLATE.format(variable=variable.group(1)))
+
+    lookups = []
+    for keyword, body in clauses:
+        if keyword not in keywords:
+            continue
+        for _, label_text, properties in NODE_PATTERN.findall(body):
+            label = label_text.replace("`", "").split(":")[1].strip()
+            for prop, field in entry_pattern.findall(properties or ""):
+                lookups.append((label, prop, field))
+    return lookups
+
+
+class KeySet:
+    """Node keys held as sorted 64-bit hashes."""
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.int64)
+        self.pending = array("q")
+
+    def add(self, values: Iterable[Any]):
+        """Add keys; None is ignored."""
+        for value in values:
+            if value is not None:
+                self.pending.append(key_hash(value))
+
+    def merge(self):
+        if self.pending:
+            self.hashes = np.union1d(self.hashes, np.frombuffer(self.pending, dtype=np.int64))
+            self.pending = array("q")
+
+    def __len__(self) -> int:
+        self.merge()
+        return len(self.hashes)
+
+    def contains(self, values: Sequence[Any]) -> np.ndarray:
+        """Boolean mask of the values that are keys; None never is."""
+        self.merge()
+        present = np.array([value is not None for value in values], dtype=bool)
+        if not len(self.hashes):
+            return np.zeros(len(values), dtype=bool)
+        hashes = np.fromiter(
+            (key_hash(value) if value is not None else 0 for value in values), dtype=np.int64, count=len(values)
+        )
+        positions = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        return present & (self.hashes[positions] == hashes)
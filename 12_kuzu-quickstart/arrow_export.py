@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Arrow Result Export
+
+Moves Kuzu query results into Arrow, Parquet and Polars without creating a
+Python object per row. Kuzu materializes a query result natively; it is
+converted to Arrow record batches of `chunk_size` rows in C++ and handed on
+batch by batch, so the only Python objects are the batches themselves.
+
+Usage:
+    python arrow_export.py [--rows 10000000] [--chunk-size 1000000]
+
+Running the module benchmarks time and peak memory of rows_as_dict against
+the Arrow, Parquet and Polars paths. By default the rows are generated by an
+UNWIND query shaped like the ratings graph (userId, movieId, rating,
+timestamp); --db runs the RATED query against a real movie database instead.
+"""
+
+import os
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import kuzu
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+RATINGS_QUERY = """
+    MATCH (u:User)-[r:RATED]->(m:Movie)
+    RETURN u.userId AS userId, m.movieId AS movieId, r.rating AS rating, r.timestamp AS timestamp
+"""
+
+SYNTHETIC_RATINGS_QUERY = """
+    UNWIND range(0, $rows - 1) AS i
+    RETURN i % 610 AS userId, i % 9742 AS movieId, (i % 10 + 1) / 2.0 AS rating, 828124615 + i AS timestamp
+"""
+
+
+def fetch_batches(
+    conn: kuzu.Connection,
+    query: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[pa.Schema, List[pa.RecordBatch]]:
+    """Run a query and return its schema and its result as batches of chunk_size rows.
+
+    The schema comes with the result, so it is known even when there are no rows.
+    """
+    result = conn.execute(query, parameters or {})
+    try:
+        table = result.get_as_arrow(chunk_size=chunk_size)
+    finally:
+        result.close()
+    return table.schema, table.to_batches()
+
+
+def iter_record_batches(
+    conn: kuzu.Connection,
+    query: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """Yield the result of a query as Arrow record batches of chunk_size rows."""
+    _, batches = fetch_batches(conn, query, parameters, chunk_size)
+    # Hand batches out one at a time and drop our reference, so consumers
+    # that write and discard them let the buffers be freed as they go.
+    batches.reverse()
+    while batches:
+        yield batches.pop()
+
+
+def to_arrow(
+    conn: kuzu.Connection,
+    query: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pa.Table:
+    """Collect a query result into a chunked Arrow table (no rechunking)."""
+    schema, batches = fetch_batches(conn, query, parameters, chunk_size)
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def write_parquet(
+    conn: kuzu.Connection,
+    query: str,
+    path: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """Stream a query result into a Parquet file, one row group per batch."""
+    schema, batches = fetch_batches(conn, query, parameters, chunk_size)
+    batches.reverse()
+    rows = 0
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        while batches:
+            batch = batches.pop()
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def to_polars(
+    conn: kuzu.Connection,
+    query: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """Return a query result as a Polars DataFrame sharing the Arrow buffers."""
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("to_polars needs polars (pip install polars)") from e
+
+    return pl.from_arrow(to_arrow(conn, query, parameters, chunk_size), rechunk=False)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_method(method: str, db_path: Optional[str], rows: int, chunk_size: int, queue) -> None:
+    """Run one export method in a fresh process and report time and memory."""
+    db = kuzu.Database(db_path, read_only=True) if db_path else kuzu.Database()
+    conn = kuzu.Connection(db)
+    query, parameters = (RATINGS_QUERY, {}) if db_path else (SYNTHETIC_RATINGS_QUERY, {"rows": rows})
+
+    baseline = current_rss_mb()
+    start = time.perf_counter()
+    if method == "rows_as_dict":
+        result = conn.execute(query, parameters)
+        records = list(result.rows_as_dict())
+        count = len(records)
+    elif method == "arrow_batches":
+        count = sum(batch.num_rows for batch in iter_record_batches(conn, query, parameters, chunk_size))
+    elif method == "parquet":
+        with tempfile.TemporaryDirectory() as tmp:
+            count = write_parquet(conn, query, os.path.join(tmp, "ratings.parquet"), parameters, chunk_size)
+    elif method == "polars":
+        count = to_polars(conn, query, parameters, chunk_size).height
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    elapsed = time.perf_counter() - start
+
+    queue.put({
+        "method": method,
+        "rows": count,
+        "seconds": elapsed,
+        "peak_mb": peak_rss_mb() - baseline,
+    })
+
+
+def benchmark(db_path: Optional[str], rows: int, chunk_size: int):
+    """Compare all export methods, each in its own process."""
+    ctx = multiprocessing.get_context("spawn")
+    methods = ["rows_as_dict", "arrow_batches", "parquet", "polars"]
+    try:
+        import polars  # noqa: F401
+    except ImportError:
+        logging.warning("polars is not installed, skipping the polars method (pip install polars)")
+        methods.remove("polars")
+    results = []
+    for method in methods:
+        queue = ctx.Queue()
+        process = ctx.Process(target=run_method, args=(method, db_path, rows, chunk_size, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            logging.error(f"{method} failed with exit code {process.exitcode}")
+            continue
+        results.append(queue.get())
+
+    print(f"\n{'=' * 64}")
+    print(f"{'Method':<16} {'Rows':>12} {'Seconds':>10} {'Peak MB':>10} {'Rows/s':>12}")
+    print(f"{'-' * 64}")
+    for r in results:
+        print(
+            f"{r['method']:<16} {r['rows']:>12} {r['seconds']:>10.2f} "
+            f"{r['peak_mb']:>10.1f} {r['rows'] / r['seconds']:>12.0f}"
+        )
+    print(f"{'=' * 64}\n")
+    return results
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark Kuzu result export paths")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Synthetic result rows")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per Arrow batch")
+    parser.add_argument("--db", help="Movie database to export RATED from instead of synthetic rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    benchmark(args.db, args.rows, args.chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
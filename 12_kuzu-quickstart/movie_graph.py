@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Kuzu Movie Graph
+
+Defines the movie schema (Person, Movie, User, Genre, ACTED_IN, DIRECTED,
+RATED, IN_GENRE) as Kuzu node and rel tables and bulk-loads it from the
+CSV files in 01_import-data/data. The resulting on-disk database is the
+embedded, serverless counterpart of the graph created by import_data.py.
+
+Usage:
+    python movie_graph.py [--db movies.kuzu] [--data ../01_import-data/data]
+"""
+
+import csv
+import logging
+import argparse
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import kuzu
+import pyarrow as pa
+
+DEFAULT_DB_PATH = "movies.kuzu"
+DEFAULT_DATA_DIR = "../01_import-data/data"
+
+SCHEMA = [
+    """
+    CREATE NODE TABLE Person(
+        tmdbId INT64 PRIMARY KEY, imdbId INT64, name STRING, bornIn STRING,
+        bio STRING, poster STRING, url STRING, born DATE, died DATE
+    )
+    """,
+    """
+    CREATE NODE TABLE Movie(
+        movieId INT64 PRIMARY KEY, tmdbId INT64, imdbId INT64, title STRING,
+        year INT64, plot STRING, released DATE, budget INT64, revenue INT64,
+        runtime INT64, imdbRating DOUBLE, imdbVotes INT64, poster STRING,
+        url STRING, countries STRING[], languages STRING[], genres STRING[]
+    )
+    """,
+    "CREATE NODE TABLE User(userId INT64 PRIMARY KEY, name STRING)",
+    "CREATE NODE TABLE Genre(name STRING PRIMARY KEY)",
+    "CREATE REL TABLE ACTED_IN(FROM Person TO Movie, role STRING)",
+    "CREATE REL TABLE DIRECTED(FROM Person TO Movie)",
+    "CREATE REL TABLE RATED(FROM User TO Movie, rating DOUBLE, timestamp INT64)",
+    "CREATE REL TABLE IN_GENRE(FROM Movie TO Genre)",
+]
+
+
+def to_int(value: str) -> Optional[int]:
+    """Convert a CSV value such as '30000000.0' to an integer."""
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def to_float(value: str) -> Optional[float]:
+    """Convert a CSV value to a float."""
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def to_date(value: str) -> Optional[date]:
+    """Convert an ISO date string to a date."""
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def to_list(value: str) -> List[str]:
+    """Split a pipe separated CSV value into a list."""
+    if value is None:
+        return []
+    return [item.strip() for item in value.split("|") if item.strip()]
+
+
+def read_csv(path: Path) -> List[Dict[str, str]]:
+    """Read a CSV file, tolerating a UTF-8 byte order mark."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def build_tables(data_dir: str) -> Dict[str, pa.Table]:
+    """Convert the movie CSV files into Arrow tables in load order."""
+    data = Path(data_dir)
+    persons = read_csv(data / "persons.csv")
+    movies = read_csv(data / "movies.csv")
+
+    person_ids = set()
+    person_rows = []
+    for row in persons:
+        tmdb_id = to_int(row["person_tmdbId"])
+        if tmdb_id is None or tmdb_id in person_ids:
+            continue
+        person_ids.add(tmdb_id)
+        person_rows.append({
+            "tmdbId": tmdb_id,
+            "imdbId": to_int(row.get("person_imdbId")),
+            "name": row.get("name"),
+            "bornIn": row.get("bornIn") or None,
+            "bio": row.get("bio") or None,
+            "poster": row.get("person_poster") or None,
+            "url": row.get("person_url") or None,
+            "born": to_date(row.get("born")),
+            "died": to_date(row.get("died")),
+        })
+
+    movie_ids = set()
+    movie_rows = []
+    genres = {}
+    in_genre = []
+    for row in movies:
+        movie_id = to_int(row["movieId"])
+        if movie_id is None or movie_id in movie_ids:
+            continue
+        movie_ids.add(movie_id)
+        movie_genres = to_list(row.get("genres"))
+        movie_rows.append({
+            "movieId": movie_id,
+            "tmdbId": to_int(row.get("movie_tmdbId")),
+            "imdbId": to_int(row.get("movie_imdbId")),
+            "title": row.get("title"),
+            "year": to_int(row.get("year")),
+            "plot": row.get("plot") or None,
+            "released": to_date(row.get("released")),
+            "budget": to_int(row.get("budget")),
+            "revenue": to_int(row.get("revenue")),
+            "runtime": to_int(row.get("runtime")),
+            "imdbRating": to_float(row.get("imdbRating")),
+            "imdbVotes": to_int(row.get("imdbVotes")),
+            "poster": row.get("movie_poster") or None,
+            "url": row.get("movie_url") or None,
+            "countries": to_list(row.get("countries")),
+            "languages": to_list(row.get("languages")),
+            "genres": movie_genres,
+        })
+        for genre in movie_genres:
+            genres.setdefault(genre, {"name": genre})
+            in_genre.append({"from": movie_id, "to": genre})
+
+    acted_in = [
+        {"from": to_int(row["person_tmdbId"]), "to": to_int(row["movieId"]), "role": row.get("role") or None}
+        for row in read_csv(data / "acted_in.csv")
+    ]
+    directed = [
+        {"from": to_int(row["person_tmdbId"]), "to": to_int(row["movieId"])}
+        for row in read_csv(data / "directed.csv")
+    ]
+
+    users = {}
+    rated = []
+    for row in read_csv(data / "ratings.csv"):
+        user_id = to_int(row.get("userId"))
+        movie_id = to_int(row.get("movieId"))
+        if user_id is None or movie_id is None:
+            continue
+        users.setdefault(user_id, {"userId": user_id, "name": row.get("name") or None})
+        rated.append({
+            "from": user_id,
+            "to": movie_id,
+            "rating": to_float(row.get("rating")),
+            "timestamp": to_int(row.get("timestamp")),
+        })
+
+    # Kuzu rejects relationships whose endpoints do not exist, MATCH in
+    # Cypher silently skips them; drop them here to keep the same behaviour.
+    acted_in = [r for r in acted_in if r["from"] in person_ids and r["to"] in movie_ids]
+    directed = [r for r in directed if r["from"] in person_ids and r["to"] in movie_ids]
+    rated = [r for r in rated if r["to"] in movie_ids]
+
+    return {
+        "Person": pa.Table.from_pylist(person_rows),
+        "Movie": pa.Table.from_pylist(movie_rows),
+        "User": pa.Table.from_pylist(list(users.values())),
+        "Genre": pa.Table.from_pylist(list(genres.values())),
+        "ACTED_IN": pa.Table.from_pylist(acted_in),
+        "DIRECTED": pa.Table.from_pylist(directed),
+        "RATED": pa.Table.from_pylist(rated),
+        "IN_GENRE": pa.Table.from_pylist(in_genre),
+    }
+
+
+def load_movie_graph(db_path: str = DEFAULT_DB_PATH, data_dir: str = DEFAULT_DATA_DIR) -> kuzu.Database:
+    """Create the movie schema in a fresh Kuzu database and bulk-load it."""
+    logger = logging.getLogger(__name__)
+    if Path(db_path).exists():
+        raise FileExistsError(f"Kuzu database already exists: {db_path}")
+
+    tables = build_tables(data_dir)
+
+    db = kuzu.Database(db_path)
+    conn = kuzu.Connection(db)
+    for statement in SCHEMA:
+        conn.execute(statement)
+
+    # COPY ... FROM <variable> scans the Arrow table in place
+    for name, rows in tables.items():
+        if rows.num_rows == 0:
+            continue
+        conn.execute(f"COPY {name} FROM rows")
+        logger.info(f"Loaded {rows.num_rows} {name} rows")
+
+    conn.close()
+    return db
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load the movie graph into Kuzu")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Kuzu database path")
+    parser.add_argument("--data", default=DEFAULT_DATA_DIR, help="Directory with the movie CSV files")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        load_movie_graph(args.db, args.data)
+    except Exception as e:
+        logging.error(f"Loading the movie graph failed: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Bill of Materials Rollups
+
+Loads the furniture bill of materials (products -> assemblies -> parts ->
+suppliers) from the CSV files in data/, computes per-product total cost and
+critical-path lead time and writes both the BOM graph and the rollups to Neo4j.
+
+Each part is sourced from its preferred supplier (or the cheapest one with
+--strategy cheapest). Rollups are cached per product; when a supplier row
+changes only the products that contain the affected part are recomputed, so
+the graph agent can answer cost questions with a property lookup instead of a
+deep traversal. Changed supplier rows passed with --changes are applied the
+same way and also keep the supplier outage impact index (--impact-index)
+current.
+
+Graph model:
+    (:Product)-[:HAS_ASSEMBLY {quantity}]->(:Assembly)-[:HAS_PART {quantity}]->(:Part)
+    (:Supplier)-[:SUPPLIES {unitCost, leadTimeDays, minimumOrderQuantity, preferred}]->(:Part)
+
+Usage:
+    python bom.py [--strategy preferred|cheapest] [--changes rows.csv] [--impact-index impact_index.json]
+
+Requirements:
+    - Neo4j database running and accessible
+    - .env file with database credentials
+"""
+
+import os
+import csv
+import json
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from dotenv import load_dotenv
+from neo4j import GraphDatabase, Driver
+
+STRATEGIES = ("preferred", "cheapest")
+
+
+def parse_money(value: str) -> Optional[float]:
+    """Convert a price such as '$42.73' or '$1,289' to a float."""
+    if value is None:
+        return None
+    value = value.strip().replace("$", "").replace(",", "")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_int(value: str) -> Optional[int]:
+    """Convert a CSV value to an integer."""
+    if value is None or value.strip() == "":
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def read_csv(path: Path) -> List[Dict[str, str]]:
+    """Read a CSV file into a list of rows."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+class BillOfMaterials:
+    """In-memory bill of materials with the indexes needed for rollups."""
+
+    def __init__(self):
+        self.products: Dict[str, Dict] = {}
+        self.assemblies: Dict[str, Dict] = {}
+        self.parts: Dict[str, Dict] = {}
+        self.suppliers: Dict[str, Dict] = {}
+        # part_id -> supplier_id -> offer
+        self.offers: Dict[str, Dict[str, Dict]] = {}
+        # product_id -> assembly ids, assembly_id -> [(part_id, quantity)]
+        self.product_assemblies: Dict[str, List[str]] = {}
+        self.assembly_parts: Dict[str, List[tuple]] = {}
+        # part_id -> product ids containing it, supplier_id -> part ids offered
+        self.part_products: Dict[str, Set[str]] = {}
+        self.supplier_parts: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_csv(cls, data_dir: str = "data") -> "BillOfMaterials":
+        """Load the BOM from products, assemblies, parts and supplier CSV files."""
+        data = Path(data_dir)
+        bom = cls()
+
+        for row in read_csv(data / "products.csv"):
+            bom.products[row["product_id"]] = {
+                "productId": row["product_id"],
+                "name": row["product_name"],
+                "price": parse_money(row.get("price")),
+                "description": row.get("description") or None,
+            }
+
+        for row in read_csv(data / "assemblies.csv"):
+            bom.add_assembly(
+                row["assembly_id"], row["assembly_name"], row["product_id"], parse_int(row.get("quantity")) or 1
+            )
+
+        for row in read_csv(data / "parts.csv"):
+            bom.add_part(row["part_id"], row["part_name"], row["assembly_id"], parse_int(row.get("quantity")) or 1)
+
+        suppliers_path = data / "suppliers.csv"
+        if suppliers_path.exists():
+            for row in read_csv(suppliers_path):
+                bom.suppliers[row["supplier_id"]] = {
+                    "supplierId": row["supplier_id"],
+                    "name": row.get("name"),
+                    "specialty": row.get("specialty") or None,
+                    "city": row.get("city") or None,
+                    "country": row.get("country") or None,
+                }
+
+        for row in read_csv(data / "part_supplier_mapping.csv"):
+            bom.set_offer(row)
+
+        return bom
+
+    def add_assembly(self, assembly_id: str, name: str, product_id: str, quantity: int):
+        """Register an assembly used `quantity` times by a product."""
+        self.assemblies[assembly_id] = {
+            "assemblyId": assembly_id,
+            "name": name,
+            "productId": product_id,
+            "quantity": quantity,
+        }
+        self.product_assemblies.setdefault(product_id, []).append(assembly_id)
+        self.assembly_parts.setdefault(assembly_id, [])
+
+    def add_part(self, part_id: str, name: str, assembly_id: str, quantity: int):
+        """Register a part used `quantity` times by an assembly."""
+        self.parts.setdefault(part_id, {"partId": part_id, "name": name})
+        self.assembly_parts.setdefault(assembly_id, []).append((part_id, quantity))
+        assembly = self.assemblies.get(assembly_id)
+        if assembly:
+            self.part_products.setdefault(part_id, set()).add(assembly["productId"])
+
+    def set_offer(self, row: Dict[str, str]) -> str:
+        """Add or replace a part_supplier_mapping row and return its part id."""
+        part_id = row["part_id"]
+        supplier_id = row["supplier_id"]
+        self.offers.setdefault(part_id, {})[supplier_id] = {
+            "supplierId": supplier_id,
+            "supplierName": row.get("supplier_name") or None,
+            "unitCost": parse_money(row.get("unit_cost")),
+            "leadTimeDays": parse_int(row.get("lead_time_days")),
+            "minimumOrderQuantity": parse_int(row.get("minimum_order_quantity")),
+            "preferred": (row.get("preferred_supplier") or "").strip().lower() in ("yes", "true", "1"),
+        }
+        self.supplier_parts.setdefault(supplier_id, set()).add(part_id)
+        self.suppliers.setdefault(supplier_id, {"supplierId": supplier_id, "name": row.get("supplier_name")})
+        return part_id
+
+    def remove_offer(self, part_id: str, supplier_id: str) -> str:
+        """Remove a supplier row for a part and return the part id."""
+        self.offers.get(part_id, {}).pop(supplier_id, None)
+        self.supplier_parts.get(supplier_id, set()).discard(part_id)
+        return part_id
+
+    def parts_of_supplier(self, supplier_id: str) -> Set[str]:
+        """Parts for which a supplier has an offer."""
+        return self.supplier_parts.get(supplier_id, set())
+
+    def sourcing_fingerprint(self) -> str:
+        """Hash of which products contain each part and who supplies it."""
+        sourcing = {
+            part_id: [sorted(self.part_products.get(part_id, set())), sorted(self.offers.get(part_id, {}))]
+            for part_id in set(self.part_products) | set(self.offers)
+        }
+        return hashlib.sha256(json.dumps(sourcing, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def choose_offer(offers: Dict[str, Dict], strategy: str = "preferred") -> Optional[Dict]:
+    """Pick the supplier offer used for a part."""
+    priced = [offer for offer in offers.values() if offer["unitCost"] is not None]
+    if not priced:
+        return None
+    cheapest = min(priced, key=lambda o: (o["unitCost"], o["leadTimeDays"] or 0, o["supplierId"]))
+    if strategy == "cheapest":
+        return cheapest
+    preferred = [offer for offer in priced if offer["preferred"]]
+    if preferred:
+        return min(preferred, key=lambda o: (o["unitCost"], o["supplierId"]))
+    return cheapest
+
+
+class RollupEngine:
+    """Compute and cache cost and lead-time rollups per product."""
+
+    def __init__(self, bom: BillOfMaterials, strategy: str = "preferred", indexes: Optional[List] = None):
+        """
+        Args:
+            bom: Bill of materials the rollups are computed from
+            strategy: Supplier choice per part
+            indexes: Indexes with a refresh_part(part_id, previous_suppliers)
+                method, refreshed whenever a supplier row is ingested
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown sourcing strategy: {strategy}")
+        self.bom = bom
+        self.strategy = strategy
+        self.indexes = indexes or []
+        self.choices: Dict[str, Optional[Dict]] = {}
+        self.cache: Dict[str, Dict] = {}
+
+    def choice(self, part_id: str) -> Optional[Dict]:
+        """Cached supplier choice for a part."""
+        if part_id not in self.choices:
+            self.choices[part_id] = choose_offer(self.bom.offers.get(part_id, {}), self.strategy)
+        return self.choices[part_id]
+
+    def compute(self, product_id: str) -> Dict:
+        """Roll up cost and lead time of a single product."""
+        total_cost = 0.0
+        lead_time = 0
+        critical_part = None
+        unpriced_parts = set()
+        empty_assemblies = []
+
+        for assembly_id in self.bom.product_assemblies.get(product_id, []):
+            assembly = self.bom.assemblies[assembly_id]
+            parts = self.bom.assembly_parts.get(assembly_id, [])
+            if not parts:
+                empty_assemblies.append(assembly_id)
+                continue
+            for part_id, quantity in parts:
+                offer = self.choice(part_id)
+                if offer is None:
+                    unpriced_parts.add(part_id)
+                    continue
+                total_cost += assembly["quantity"] * quantity * offer["unitCost"]
+                # Parts are procured in parallel, so the slowest one is the critical path
+                if (offer["leadTimeDays"] or 0) > lead_time:
+                    lead_time = offer["leadTimeDays"]
+                    critical_part = part_id
+
+        price = self.bom.products.get(product_id, {}).get("price")
+        total_cost = round(total_cost, 2)
+        return {
+            "productId": product_id,
+            "totalCost": total_cost,
+            "leadTimeDays": lead_time,
+            "criticalPart": critical_part,
+            "margin": round(price - total_cost, 2) if price is not None else None,
+            "unpricedParts": sorted(unpriced_parts),
+            "emptyAssemblies": empty_assemblies,
+            "strategy": self.strategy,
+        }
+
+    def rollup(self, product_id: str) -> Dict:
+        """Return the cached rollup of a product, computing it on first use."""
+        if product_id not in self.cache:
+            self.cache[product_id] = self.compute(product_id)
+        return self.cache[product_id]
+
+    def rollup_all(self) -> Dict[str, Dict]:
+        """Rollups of every product."""
+        return {product_id: self.rollup(product_id) for product_id in self.bom.products}
+
+    def invalidate_parts(self, part_ids: Iterable[str]) -> Set[str]:
+        """Recompute the products containing the given parts and return their ids."""
+        affected = set()
+        for part_id in part_ids:
+            self.choices.pop(part_id, None)
+            affected |= self.bom.part_products.get(part_id, set())
+        for product_id in affected:
+            self.cache[product_id] = self.compute(product_id)
+        return affected
+
+    def refresh_indexes(self, part_id: str, previous_suppliers: Set[str]):
+        """Bring the registered indexes up to date after the offers of a part changed."""
+        for index in self.indexes:
+            index.refresh_part(part_id, previous_suppliers)
+
+    def update_supplier_row(self, row: Dict[str, str]) -> Set[str]:
+        """Apply a changed part_supplier_mapping row and return affected products."""
+        previous = set(self.bom.offers.get(row["part_id"], {}))
+        part_id = self.bom.set_offer(row)
+        self.refresh_indexes(part_id, previous)
+        return self.invalidate_parts([part_id])
+
+    def remove_supplier_row(self, part_id: str, supplier_id: str) -> Set[str]:
+        """Drop a supplier row and return affected products."""
+        previous = set(self.bom.offers.get(part_id, {}))
+        self.bom.remove_offer(part_id, supplier_id)
+        self.refresh_indexes(part_id, previous)
+        return self.invalidate_parts([part_id])
+
+
+class BomGraphLoader:
+    """Write the BOM graph and product rollups to Neo4j."""
+
+    def __init__(self, driver: Driver, database: str = "neo4j"):
+        self.driver = driver
+        self.database = database
+        self.logger = logging.getLogger(__name__)
+
+    def run_query(self, query: str, parameters: Optional[Dict] = None):
+        """Execute a Cypher query."""
+        with self.driver.session(database=self.database) as session:
+            return session.run(query, parameters or {}).consume()
+
+    def create_constraints(self):
+        """Create uniqueness constraints for all BOM node keys."""
+        for label, key in [
+            ("Product", "productId"),
+            ("Assembly", "assemblyId"),
+            ("Part", "partId"),
+            ("Supplier", "supplierId"),
+        ]:
+            self.run_query(
+                f"CREATE CONSTRAINT {label}_{key} IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.{key} IS UNIQUE"
+            )
+
+    def load(self, bom: BillOfMaterials):
+        """Load products, assemblies, parts, suppliers and their relationships."""
+        self.create_constraints()
+
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MERGE (p:Product {productId: record.productId})
+            SET p.name = record.name, p.price = record.price, p.description = record.description
+            """,
+            {"records": list(bom.products.values())},
+        )
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MERGE (a:Assembly {assemblyId: record.assemblyId})
+            SET a.name = record.name
+            WITH a, record
+            MATCH (p:Product {productId: record.productId})
+            MERGE (p)-[r:HAS_ASSEMBLY]->(a)
+            SET r.quantity = record.quantity
+            """,
+            {"records": list(bom.assemblies.values())},
+        )
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MERGE (p:Part {partId: record.partId})
+            SET p.name = record.name
+            """,
+            {"records": list(bom.parts.values())},
+        )
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MATCH (a:Assembly {assemblyId: record.assemblyId})
+            MATCH (p:Part {partId: record.partId})
+            MERGE (a)-[r:HAS_PART]->(p)
+            SET r.quantity = record.quantity
+            """,
+            {"records": [
+                {"assemblyId": assembly_id, "partId": part_id, "quantity": quantity}
+                for assembly_id, parts in bom.assembly_parts.items()
+                for part_id, quantity in parts
+            ]},
+        )
+        self.write_suppliers(bom, bom.suppliers.keys())
+        self.write_offers(bom, bom.offers.keys())
+        self.logger.info(
+            f"Loaded {len(bom.products)} products, {len(bom.assemblies)} assemblies, "
+            f"{len(bom.parts)} parts and {len(bom.suppliers)} suppliers"
+        )
+
+    def write_suppliers(self, bom: BillOfMaterials, supplier_ids: Iterable[str]):
+        """Create or update the given Supplier nodes."""
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MERGE (s:Supplier {supplierId: record.supplierId})
+            SET s += record
+            """,
+            {"records": [bom.suppliers[supplier_id] for supplier_id in supplier_ids]},
+        )
+
+    def ingest_supplier_rows(self, engine: RollupEngine, rows: Iterable[Dict[str, str]]) -> Set[str]:
+        """Apply changed part_supplier_mapping rows and write what they affect.
+
+        The rows go through the rollup engine, which also refreshes its
+        registered indexes; only the touched offers and the rollups of the
+        affected products are written back.
+
+        Returns:
+            Ids of the products whose rollups changed
+        """
+        part_ids = set()
+        supplier_ids = set()
+        affected = set()
+        for row in rows:
+            affected |= engine.update_supplier_row(row)
+            part_ids.add(row["part_id"])
+            supplier_ids.add(row["supplier_id"])
+        self.write_suppliers(engine.bom, supplier_ids)
+        self.write_offers(engine.bom, part_ids)
+        self.write_rollups(engine.rollup(product_id) for product_id in affected)
+        self.logger.info(f"Ingested {len(part_ids)} changed parts, {len(affected)} product rollups updated")
+        return affected
+
+    def write_offers(self, bom: BillOfMaterials, part_ids: Iterable[str]):
+        """Replace the SUPPLIES relationships of the given parts."""
+        part_ids = list(part_ids)
+        self.run_query(
+            """
+            UNWIND $partIds AS partId
+            MATCH (:Supplier)-[r:SUPPLIES]->(:Part {partId: partId})
+            DELETE r
+            """,
+            {"partIds": part_ids},
+        )
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MATCH (s:Supplier {supplierId: record.supplierId})
+            MATCH (p:Part {partId: record.partId})
+            MERGE (s)-[r:SUPPLIES]->(p)
+            SET r.unitCost = record.unitCost,
+                r.leadTimeDays = record.leadTimeDays,
+                r.minimumOrderQuantity = record.minimumOrderQuantity,
+                r.preferred = record.preferred
+            """,
+            {"records": [
+                dict(offer, partId=part_id)
+                for part_id in part_ids
+                for offer in bom.offers.get(part_id, {}).values()
+            ]},
+        )
+
+    def write_rollups(self, rollups: Iterable[Dict]):
+        """Store rollups as properties on the Product nodes."""
+        self.run_query(
+            """
+            UNWIND $records AS record
+            MATCH (p:Product {productId: record.productId})
+            SET p.totalCost = record.totalCost,
+                p.leadTimeDays = record.leadTimeDays,
+                p.criticalPart = record.criticalPart,
+                p.margin = record.margin,
+                p.unpricedParts = record.unpricedParts,
+                p.costStrategy = record.strategy
+            """,
+            {"records": list(rollups)},
+        )
+
+
+def display_rollups(rollups: Dict[str, Dict], bom: BillOfMaterials) -> None:
+    """Print the product rollups as a table."""
+    print(f"\n{'=' * 80}")
+    print(f"{'Product':<26} {'Price':>10} {'Cost':>10} {'Margin':>10} {'Lead days':>10}  Critical part")
+    print(f"{'-' * 80}")
+    for product_id, rollup in sorted(rollups.items()):
+        product = bom.products[product_id]
+        print(
+            f"{product['name'][:25]:<26} {product['price'] or 0:>10.2f} {rollup['totalCost']:>10.2f} "
+            f"{rollup['margin'] or 0:>10.2f} {rollup['leadTimeDays']:>10}  {rollup['criticalPart'] or '-'}"
+        )
+    print(f"{'=' * 80}\n")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load the BOM graph and product rollups")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="preferred", help="Supplier choice per part")
+    parser.add_argument("--data", default="data", help="Directory with the BOM CSV files")
+    parser.add_argument("--changes", help="CSV of changed part_supplier_mapping rows to ingest after the load")
+    parser.add_argument("--impact-index", help="Supplier outage impact index to keep current (JSON file)")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the rollups")
+    args = parser.parse_args()
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    bom = BillOfMaterials.from_csv(args.data)
+    indexes = []
+    if args.impact_index:
+        from supplier_impact import SupplierImpactIndex
+
+        # The BOM was just read from the CSV files, so build the index from it
+        indexes.append(SupplierImpactIndex(bom))
+    engine = RollupEngine(bom, args.strategy, indexes)
+    rollups = engine.rollup_all()
+    display_rollups(rollups, bom)
+    if args.dry_run:
+        return 0
+
+    driver = GraphDatabase.driver(
+        os.getenv("NEO4J_URI"),
+        auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD")),
+    )
+    try:
+        loader = BomGraphLoader(driver, os.getenv("NEO4J_DATABASE", "neo4j"))
+        loader.load(bom)
+        loader.write_rollups(rollups.values())
+        if args.changes:
+            loader.ingest_supplier_rows(engine, read_csv(Path(args.changes)))
+        if args.impact_index:
+            indexes[0].save(args.impact_index)
+    except Exception as e:
+        logging.error(f"Loading the BOM failed: {e}")
+        return 1
+    finally:
+        driver.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
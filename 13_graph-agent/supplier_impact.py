@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Supplier Outage Impact Index
+
+Precomputes, for every supplier, which products are affected if the supplier
+goes down and which of those have no alternative source. Products and parts
+are numbered once and every supplier keeps three bitsets (plain Python ints):
+
+    products   - products that contain a part the supplier offers
+    parts      - parts for which the supplier is the only source
+    stranded   - products that contain such a single-sourced part
+
+"Which products are affected if SUP-011 goes down?" becomes a dictionary
+lookup instead of a traversal through part_supplier_mapping -> parts ->
+assemblies -> products. When a supplier row is ingested through the
+RollupEngine of bom.py, which refreshes its registered indexes, only the
+bitsets of the suppliers of that part are rebuilt. A saved index carries a
+fingerprint of the BOM sourcing it was built from; SupplierImpactIndex.load
+rebuilds it when the BOM no longer matches.
+
+Usage:
+    python supplier_impact.py [--supplier SUP-011] [--input impact_index.json] [--output impact_index.json]
+"""
+
+import json
+import logging
+import argparse
+from typing import Dict, List, Set
+
+from bom import BillOfMaterials
+
+logger = logging.getLogger(__name__)
+
+
+def bits_to_indexes(bits: int) -> List[int]:
+    """Return the positions of the set bits of an integer."""
+    indexes = []
+    while bits:
+        low = bits & -bits
+        indexes.append(low.bit_length() - 1)
+        bits ^= low
+    return indexes
+
+
+class SupplierImpactIndex:
+    """Reverse reachability from suppliers to products stored as bitsets."""
+
+    def __init__(self, bom: BillOfMaterials, rebuild: bool = True):
+        self.bom = bom
+        self.product_ids: List[str] = []
+        self.product_index: Dict[str, int] = {}
+        self.part_ids: List[str] = []
+        self.part_index: Dict[str, int] = {}
+        # part_id -> bitset of products containing the part
+        self.part_products: Dict[str, int] = {}
+        self.supplier_products: Dict[str, int] = {}
+        self.supplier_parts: Dict[str, int] = {}
+        self.supplier_stranded: Dict[str, int] = {}
+        if rebuild:
+            self.rebuild()
+
+    def product_bit(self, product_id: str) -> int:
+        """Bit of a product, numbering new products on first use."""
+        if product_id not in self.product_index:
+            self.product_index[product_id] = len(self.product_ids)
+            self.product_ids.append(product_id)
+        return 1 << self.product_index[product_id]
+
+    def part_bit(self, part_id: str) -> int:
+        """Bit of a part, numbering new parts on first use."""
+        if part_id not in self.part_index:
+            self.part_index[part_id] = len(self.part_ids)
+            self.part_ids.append(part_id)
+        return 1 << self.part_index[part_id]
+
+    def rebuild(self):
+        """Build all bitsets from the bill of materials."""
+        for product_id in self.bom.products:
+            self.product_bit(product_id)
+        self.part_products = {}
+        for part_id, product_ids in self.bom.part_products.items():
+            bits = 0
+            for product_id in product_ids:
+                bits |= self.product_bit(product_id)
+            self.part_products[part_id] = bits
+
+        self.supplier_products = {}
+        self.supplier_parts = {}
+        self.supplier_stranded = {}
+        for part_id, offers in self.bom.offers.items():
+            self.add_part_offers(part_id, offers)
+
+    def add_part_offers(self, part_id: str, offers: Dict[str, Dict]):
+        """Set the bits contributed by the suppliers of one part."""
+        products = self.part_products.get(part_id, 0)
+        single_source = len(offers) == 1
+        for supplier_id in offers:
+            self.supplier_products[supplier_id] = self.supplier_products.get(supplier_id, 0) | products
+            if single_source:
+                self.supplier_parts[supplier_id] = self.supplier_parts.get(supplier_id, 0) | self.part_bit(part_id)
+                self.supplier_stranded[supplier_id] = self.supplier_stranded.get(supplier_id, 0) | products
+
+    def rebuild_supplier(self, supplier_id: str):
+        """Recompute the bitsets of one supplier from the parts it offers."""
+        self.supplier_products[supplier_id] = 0
+        self.supplier_parts[supplier_id] = 0
+        self.supplier_stranded[supplier_id] = 0
+        for part_id in self.bom.parts_of_supplier(supplier_id):
+            products = self.part_products.get(part_id, 0)
+            self.supplier_products[supplier_id] |= products
+            if len(self.bom.offers[part_id]) == 1:
+                self.supplier_parts[supplier_id] |= self.part_bit(part_id)
+                self.supplier_stranded[supplier_id] |= products
+
+    def refresh_part(self, part_id: str, previous_suppliers: Set[str] = frozenset()):
+        """Update the index after the offers or assemblies of a part changed.
+
+        Args:
+            part_id: Part whose supplier rows or product membership changed
+            previous_suppliers: Suppliers that offered the part before the change
+        """
+        bits = 0
+        for product_id in self.bom.part_products.get(part_id, set()):
+            bits |= self.product_bit(product_id)
+        self.part_products[part_id] = bits
+        for supplier_id in set(self.bom.offers.get(part_id, {})) | set(previous_suppliers):
+            self.rebuild_supplier(supplier_id)
+
+    def affected_count(self, supplier_id: str) -> int:
+        """Number of products affected by an outage of a supplier."""
+        return self.supplier_products.get(supplier_id, 0).bit_count()
+
+    def impact(self, supplier_id: str) -> Dict:
+        """Products affected by an outage and those without an alternative source."""
+        return {
+            "supplierId": supplier_id,
+            "affectedProducts": [self.product_ids[i] for i in bits_to_indexes(self.supplier_products.get(supplier_id, 0))],
+            "productsWithoutAlternative": [
+                self.product_ids[i] for i in bits_to_indexes(self.supplier_stranded.get(supplier_id, 0))
+            ],
+            "singleSourcedParts": [self.part_ids[i] for i in bits_to_indexes(self.supplier_parts.get(supplier_id, 0))],
+        }
+
+    def to_dict(self) -> Dict:
+        """Serialize the index with bitsets as hex strings."""
+        return {
+            "fingerprint": self.bom.sourcing_fingerprint(),
+            "products": self.product_ids,
+            "parts": self.part_ids,
+            "suppliers": {
+                supplier_id: {
+                    "products": format(self.supplier_products.get(supplier_id, 0), "x"),
+                    "parts": format(self.supplier_parts.get(supplier_id, 0), "x"),
+                    "stranded": format(self.supplier_stranded.get(supplier_id, 0), "x"),
+                }
+                for supplier_id in sorted(self.supplier_products)
+            },
+        }
+
+    def save(self, path: str):
+        """Write the index to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def from_dict(cls, data: Dict, bom: BillOfMaterials) -> "SupplierImpactIndex":
+        """Restore a serialized index on top of the bill of materials it was built from.
+
+        The product and part numbering and the supplier bitsets are taken as
+        saved and the part -> products bitsets are derived from the BOM again
+        so later supplier rows can be ingested. An index saved for different
+        BOM sourcing is rebuilt from the BOM instead.
+        """
+        if data.get("fingerprint") != bom.sourcing_fingerprint():
+            logger.warning("Saved impact index does not match the bill of materials, rebuilding it")
+            return cls(bom)
+        index = cls(bom, rebuild=False)
+        for product_id in data["products"]:
+            index.product_bit(product_id)
+        for part_id in data["parts"]:
+            index.part_bit(part_id)
+        for part_id, product_ids in bom.part_products.items():
+            bits = 0
+            for product_id in product_ids:
+                bits |= index.product_bit(product_id)
+            index.part_products[part_id] = bits
+        for supplier_id, bitsets in data["suppliers"].items():
+            index.supplier_products[supplier_id] = int(bitsets["products"], 16)
+            index.supplier_parts[supplier_id] = int(bitsets["parts"], 16)
+            index.supplier_stranded[supplier_id] = int(bitsets["stranded"], 16)
+        return index
+
+    @classmethod
+    def load(cls, path: str, bom: BillOfMaterials) -> "SupplierImpactIndex":
+        """Read an index written by save()."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), bom)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Build the supplier outage impact index")
+    parser.add_argument("--data", default="data", help="Directory with the BOM CSV files")
+    parser.add_argument("--supplier", help="Print the impact of an outage of this supplier")
+    parser.add_argument("--input", help="Read a saved index instead of building it")
+    parser.add_argument("--output", help="Write the index to this JSON file")
+    args = parser.parse_args()
+
+    bom = BillOfMaterials.from_csv(args.data)
+    index = SupplierImpactIndex.load(args.input, bom) if args.input else SupplierImpactIndex(bom)
+
+    if args.output:
+        index.save(args.output)
+
+    suppliers = [args.supplier] if args.supplier else sorted(index.supplier_products)
+    print(f"\n{'=' * 80}")
+    print(f"{'Supplier':<10} {'Affected':>9} {'No alternative':>15}  Single-sourced parts")
+    print(f"{'-' * 80}")
+    for supplier_id in suppliers:
+        impact = index.impact(supplier_id)
+        print(
+            f"{supplier_id:<10} {len(impact['affectedProducts']):>9} "
+            f"{len(impact['productsWithoutAlternative']):>15}  {', '.join(impact['singleSourcedParts']) or '-'}"
+        )
+    print(f"{'=' * 80}\n")
+    if args.supplier:
+        print(json.dumps(index.impact(args.supplier), indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,26 +1,17 @@
-import os
-from re import M
+import asyncio
 from dotenv import load_dotenv
 
 load_dotenv()
 
-import openai
+from llm_gateway import get_gateway
 
-model_name = os.getenv("MODEL_NAME")
-base_url = os.getenv("BASE_URL")
-api_key = os.getenv("API_KEY")
 
+async def main():
+    gateway = get_gateway()
+    async for token in gateway.stream([{"role": "user", "content": "Hello, how are you?"}]):
+        print(token, end="", flush=True)
+    print()
+    await gateway.aclose()
 
-client = openai.OpenAI(
-    base_url=base_url,
-    api_key=api_key,
-)
 
-response = client.chat.completions.create(
-    model=model_name,
-    messages=[
-        {"role": "user", "content": "Hello, how are you?"}
-    ],
-)
-
-print(response.choices[0].message.content)
\ No newline at end of file
+asyncio.run(main())
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Async LLM Gateway
+
+One shared asynchronous client for chat completions and embeddings against
+any OpenAI-compatible API, instead of a new synchronous openai.OpenAI client
+per call:
+
+    - one pooled HTTP client per gateway, so connections are kept alive
+    - at most max_concurrency requests in flight
+    - a token-rate budget (tokens per minute), charged with an estimate
+      before each request and corrected with the reported usage afterwards
+    - identical concurrent requests are coalesced into one upstream call;
+      every caller gets the same result, streamed or not
+    - streaming of completion tokens
+    - latency, time-to-first-token, token and coalescing metrics
+
+Async primitives are bound to an event loop, so get_gateway() keeps one
+gateway per running loop and purpose (a notebook kernel has a single loop).
+Chat and embeddings usually come from different providers, so embeddings get
+their own gateway with their own endpoint and key.
+
+Usage:
+    gateway = get_gateway()
+    reply = await gateway.chat([{"role": "user", "content": "Hello"}])
+    async for token in gateway.stream([{"role": "user", "content": "Hello"}]):
+        print(token, end="")
+    vectors = await get_gateway("embeddings").embed(["The Matrix", "Toy Story"])
+
+    # Offline throughput test against the local stub server
+    python llm_gateway.py --stub --requests 500 --distinct 100 --concurrency 16
+
+Environment:
+    BASE_URL, API_KEY, MODEL_NAME   endpoint, key and chat model (API_KEY falls back to OPENAI_API_KEY)
+    EMBEDDING_BASE_URL              embedding endpoint, default the OpenAI API
+    EMBEDDING_API_KEY               embedding key, falls back to OPENAI_API_KEY
+    EMBEDDING_MODEL                 embedding model, default text-embedding-ada-002
+    LLM_MAX_CONCURRENCY             requests in flight, default 8
+    LLM_TOKENS_PER_MINUTE           token budget, unlimited when unset
+
+Requirements:
+    - openai, httpx
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+import weakref
+from array import array
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import openai
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+# One INFO line per HTTP request drowns everything else at gateway volumes
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+PURPOSES = ("chat", "embeddings")
+# Completion tokens charged up front when a request sets no max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 256
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about 4 characters per token."""
+    return max(1, len(text) // 4)
+
+
+def request_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Identity of a request for coalescing."""
+    return kind + ":" + json.dumps(payload, sort_keys=True, default=str)
+
+
+def percentile(values: array, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TokenBucket:
+    """Token-rate budget refilled continuously at tokens_per_minute."""
+
+    def __init__(self, tokens_per_minute: float):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        """Wait until the budget covers tokens, then charge them.
+
+        Requests larger than the whole budget wait for a full bucket.
+        """
+        needed = min(float(tokens), self.capacity)
+        async with self.lock:
+            self.refill()
+            while self.tokens < needed:
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+                self.refill()
+            self.tokens -= tokens
+
+    def adjust(self, tokens: int):
+        """Charge (positive) or refund (negative) the difference to the estimate."""
+        self.refill()
+        self.tokens = min(self.capacity, self.tokens - tokens)
+
+
+class GatewayMetrics:
+    """Counters and latency samples of a gateway."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.upstream = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies = array("d")
+        self.first_token = array("d")
+        self.queue_wait = array("d")
+
+    def record(self, latency: float, wait: float, usage: Optional[Dict[str, int]] = None,
+               first_token: Optional[float] = None):
+        """Record one upstream request."""
+        self.latencies.append(latency)
+        self.queue_wait.append(wait)
+        if first_token is not None:
+            self.first_token.append(first_token)
+        if usage:
+            self.prompt_tokens += usage.get("prompt_tokens") or 0
+            self.completion_tokens += usage.get("completion_tokens") or 0
+
+    def report(self) -> Dict[str, Any]:
+        """Summary with latency percentiles in milliseconds and throughput."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "requests": self.requests,
+            "upstreamRequests": self.upstream,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+            "requestsPerSecond": round(self.requests / elapsed, 1),
+            "tokensPerSecond": round((self.prompt_tokens + self.completion_tokens) / elapsed, 1),
+            "latencyMs": {name: round(percentile(self.latencies, q) * 1000, 1)
+                          for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+            "firstTokenMs": {name: round(percentile(self.first_token, q) * 1000, 1)
+                             for name, q in (("p50", 0.5), ("p95", 0.95))},
+            "queueWaitMs": {name: round(percentile(self.queue_wait, q) * 1000, 1)
+                            for name, q in (("p50", 0.5), ("p95", 0.95))},
+        }
+
+
+class SharedStream:
+    """Completion stream read once upstream and replayed to every subscriber."""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        # Upstream task and the number of callers reading the stream
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+
+    async def publish(self, token: str):
+        async with self.changed:
+            self.tokens.append(token)
+            self.changed.notify_all()
+
+    async def close(self, error: Optional[BaseException] = None):
+        async with self.changed:
+            self.done = True
+            self.error = error
+            self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.done or len(self.tokens) > position)
+                tokens = self.tokens[position:]
+                done, error = self.done, self.error
+            for token in tokens:
+                yield token
+            position += len(tokens)
+            if done and position >= len(self.tokens):
+                if error is not None:
+                    raise error
+                return
+
+
+class LLMGateway:
+    """Shared async client with concurrency control, rate budget and coalescing."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+        max_concurrency: int = 8,
+        tokens_per_minute: Optional[float] = None,
+        timeout: float = 60.0,
+        coalesce: bool = True,
+    ):
+        """
+        Initialize the gateway.
+
+        Args:
+            base_url: OpenAI-compatible endpoint, None for the OpenAI API
+            api_key: API key
+            model: Default chat model
+            embedding_model: Default embedding model
+            max_concurrency: Requests in flight at most
+            tokens_per_minute: Token budget, None for unlimited
+            timeout: Request timeout in seconds
+            coalesce: Merge identical concurrent requests
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.embedding_model = embedding_model
+        self.coalesce = coalesce
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.budget = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.metrics = GatewayMetrics()
+        self.in_flight: Dict[str, Any] = {}
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=timeout,
+        )
+        self.client = openai.AsyncOpenAI(
+            base_url=base_url, api_key=api_key or "not-needed", http_client=self.http_client, max_retries=2
+        )
+
+    @classmethod
+    def from_env(cls, purpose: str = "chat", **overrides) -> "LLMGateway":
+        """Create a gateway configured from environment variables.
+
+        Args:
+            purpose: "chat" for the chat endpoint (BASE_URL, API_KEY) or
+                "embeddings" for the embedding endpoint (EMBEDDING_BASE_URL,
+                EMBEDDING_API_KEY, defaulting to OpenAI and OPENAI_API_KEY)
+            **overrides: Constructor arguments replacing the environment
+        """
+        if purpose not in PURPOSES:
+            raise ValueError(f"Unknown gateway purpose: {purpose}")
+        tokens_per_minute = os.getenv("LLM_TOKENS_PER_MINUTE")
+        if purpose == "embeddings":
+            endpoint = {
+                "base_url": os.getenv("EMBEDDING_BASE_URL") or None,
+                "api_key": os.getenv("EMBEDDING_API_KEY") or os.getenv("OPENAI_API_KEY"),
+            }
+        else:
+            endpoint = {
+                "base_url": os.getenv("BASE_URL") or None,
+                "api_key": os.getenv("API_KEY") or os.getenv("OPENAI_API_KEY"),
+            }
+        settings = {
+            **endpoint,
+            "model": os.getenv("MODEL_NAME"),
+            "embedding_model": os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL),
+            "max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            "tokens_per_minute": float(tokens_per_minute) if tokens_per_minute else None,
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    async def __aenter__(self) -> "LLMGateway":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the pooled HTTP connections."""
+        await self.client.close()
+
+    async def admit(self, estimate: int) -> float:
+        """Wait for the rate budget and a concurrency slot; returns the time waited."""
+        start = time.monotonic()
+        if self.budget:
+            await self.budget.acquire(estimate)
+        await self.semaphore.acquire()
+        return time.monotonic() - start
+
+    def settle(self, estimate: int, usage: Optional[Dict[str, int]]):
+        """Correct the rate budget with the usage reported upstream."""
+        if self.budget and usage:
+            self.budget.adjust((usage.get("total_tokens") or 0) - estimate)
+
+    async def shared(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run call once for all concurrent callers with the same key."""
+        self.metrics.requests += 1
+        if not self.coalesce:
+            return await call()
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.metrics.coalesced += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        # A cancelled caller must not cancel the call the others wait for
+        return await asyncio.shield(task)
+
+    def chat_payload(self, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {"model": params.pop("model", None) or self.model, "messages": messages}
+        payload.update(params)
+        return payload
+
+    def chat_estimate(self, payload: Dict[str, Any]) -> int:
+        completion = payload.get("max_tokens") or payload.get("max_completion_tokens") or DEFAULT_COMPLETION_ESTIMATE
+        return estimate_tokens(json.dumps(payload["messages"], default=str)) + completion
+
+    async def chat(self, messages: List[Dict[str, Any]], **params) -> str:
+        """Return the completion text of a chat request."""
+        payload = self.chat_payload(messages, params)
+        return await self.shared(request_key("chat", payload), lambda: self.call_chat(payload))
+
+    async def call_chat(self, payload: Dict[str, Any]) -> str:
+        estimate = self.chat_estimate(payload)
+        wait = await self.admit(estimate)
+        start = time.monotonic()
+        try:
+            self.metrics.upstream += 1
+            response = await self.client.chat.completions.create(**payload)
+        except Exception:
+            self.metrics.errors += 1
+            raise
+        finally:
+            self.semaphore.release()
+        usage = response.usage.model_dump() if response.usage else None
+        self.settle(estimate, usage)
+        self.metrics.record(time.monotonic() - start, wait, usage)
+        return response.choices[0].message.content or ""
+
+    async def stream(self, messages: List[Dict[str, Any]], **params) -> AsyncIterator[str]:
+        """Yield the completion text of a chat request as it is generated."""
+        payload = self.chat_payload(messages, params)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        key = request_key("stream", payload)
+        self.metrics.requests += 1
+
+        shared = self.in_flight.get(key) if self.coalesce else None
+        if shared is not None:
+            self.metrics.coalesced += 1
+        else:
+            shared = SharedStream()
+            shared.task = asyncio.ensure_future(self.call_stream(payload, shared))
+            if self.coalesce:
+                self.in_flight[key] = shared
+                shared.task.add_done_callback(lambda _: self.forget(key, shared))
+        shared.subscribers += 1
+        try:
+            async for token in shared.subscribe():
+                yield token
+        finally:
+            shared.subscribers -= 1
+            if shared.subscribers == 0 and not shared.done:
+                # Nobody reads the stream any more: stop it and free its slot
+                self.forget(key, shared)
+                shared.task.cancel()
+
+    def forget(self, key: str, shared: SharedStream):
+        """Stop offering a stream to new callers."""
+        if self.in_flight.get(key) is shared:
+            del self.in_flight[key]
+
+    async def call_stream(self, payload: Dict[str, Any], shared: SharedStream):
+        estimate = self.chat_estimate(payload)
+        error = None
+        try:
+            wait = await self.admit(estimate)
+            start = time.monotonic()
+            first_token = None
+            usage = None
+            response = None
+            try:
+                self.metrics.upstream += 1
+                response = await self.client.chat.completions.create(**payload)
+                async for chunk in response:
+                    if chunk.usage:
+                        usage = chunk.usage.model_dump()
+                    for choice in chunk.choices:
+                        if choice.delta and choice.delta.content:
+                            if first_token is None:
+                                first_token = time.monotonic() - start
+                            await shared.publish(choice.delta.content)
+            finally:
+                self.semaphore.release()
+                if response is not None:
+                    await response.close()
+            self.settle(estimate, usage)
+            self.metrics.record(time.monotonic() - start, wait, usage, first_token)
+        except asyncio.CancelledError:
+            error = RuntimeError("Completion stream was cancelled")
+            raise
+        except Exception as e:
+            self.metrics.errors += 1
+            error = e
+        finally:
+            # Subscribers must never wait for a stream that is gone
+            await shared.close(error)
+
+    async def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Return one embedding per text, in order."""
+        payload = {"model": model or self.embedding_model, "input": list(texts)}
+        return await self.shared(request_key("embed", payload), lambda: self.call_embed(payload))
+
+    async def call_embed(self, payload: Dict[str, Any]) -> List[List[float]]:
+        estimate = sum(estimate_tokens(text) for text in payload["input"])
+        wait = await self.admit(estimate)
+        start = time.monotonic()
+        try:
+            self.metrics.upstream += 1
+            response = await self.client.embeddings.create(**payload)
+        except Exception:
+            self.metrics.errors += 1
+            raise
+        finally:
+            self.semaphore.release()
+        usage = response.usage.model_dump() if response.usage else None
+        self.settle(estimate, usage)
+        self.metrics.record(time.monotonic() - start, wait, usage)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+_gateways: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, LLMGateway]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def get_gateway(purpose: str = "chat", **overrides) -> LLMGateway:
+    """Return the gateway of the running event loop for a purpose, creating it from the environment."""
+    gateways = _gateways.setdefault(asyncio.get_running_loop(), {})
+    gateway = gateways.get(purpose)
+    if gateway is None:
+        gateway = LLMGateway.from_env(purpose, **overrides)
+        gateways[purpose] = gateway
+    return gateway
+
+
+async def run_load(gateway: LLMGateway, requests: int, distinct: int, stream: bool = False) -> Dict[str, Any]:
+    """Send requests drawn from distinct prompts concurrently and report the metrics."""
+    async def one(i: int):
+        messages = [{"role": "user", "content": f"Recommend a movie like number {i % distinct}"}]
+        if stream:
+            return "".join([token async for token in gateway.stream(messages)])
+        return await gateway.chat(messages)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return gateway.metrics.report()
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Load-test the LLM gateway")
+    parser.add_argument("--stub", action="store_true", help="Run against a local stub server")
+    parser.add_argument("--requests", type=int, default=200, help="Requests to send")
+    parser.add_argument("--distinct", type=int, default=50, help="Distinct prompts among them")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at most")
+    parser.add_argument("--tokens-per-minute", type=float, help="Token budget")
+    parser.add_argument("--stream", action="store_true", help="Stream the completions")
+    parser.add_argument("--no-coalesce", action="store_true", help="Send identical requests separately")
+    args = parser.parse_args()
+
+    load_dotenv()
+    server = None
+    settings = {"max_concurrency": args.concurrency, "tokens_per_minute": args.tokens_per_minute,
+                "coalesce": not args.no_coalesce}
+    if args.stub:
+        from llm_stub_server import StubServer
+
+        server = StubServer(latency_ms=50, token_delay_ms=2).start()
+        settings.update(base_url=server.base_url, api_key="stub", model="stub")
+
+    async def run():
+        async with LLMGateway.from_env(**settings) as gateway:
+            return await run_load(gateway, args.requests, args.distinct, args.stream)
+
+    try:
+        report = asyncio.run(run())
+        print(json.dumps(report, indent=2))
+    except Exception as e:
+        logger.error(f"Load test failed: {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
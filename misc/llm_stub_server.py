@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+OpenAI-Compatible Stub Server
+
+Local stand-in for an OpenAI-compatible API so LLM code paths can be tested
+and load-tested offline. Serves:
+
+    POST /v1/chat/completions   deterministic reply, streamed as server-sent
+                                events when "stream" is set
+    POST /v1/embeddings         deterministic unit vectors derived from the text
+    GET  /stats                 requests served and peak concurrency
+
+Responses carry usage figures (about 4 characters per token) so token
+accounting can be checked. Connections are kept alive (HTTP/1.1, streamed
+responses use chunked encoding).
+
+Usage:
+    python llm_stub_server.py --port 8099 --latency-ms 200
+    BASE_URL=http://127.0.0.1:8099/v1 API_KEY=stub MODEL_NAME=stub python hello.py
+"""
+
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count used for the usage figures."""
+    return max(1, len(text) // 4)
+
+
+def reply_for(messages: List[Dict]) -> str:
+    """Deterministic reply to a conversation."""
+    last = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    return f"Stub reply to: {last[:200]}"
+
+
+def embedding_for(text: str, dimensions: int) -> List[float]:
+    """Deterministic unit vector derived from the text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler; configuration and counters live on the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload: Dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self.send_json(self.server.stats())
+        else:
+            self.send_json({"error": {"message": "not found"}}, 404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.rstrip("/")
+        self.server.begin(path)
+        try:
+            time.sleep(self.server.latency)
+            if path.endswith("/chat/completions"):
+                self.chat(request)
+            elif path.endswith("/embeddings"):
+                self.embeddings(request)
+            else:
+                self.send_json({"error": {"message": f"unknown path {self.path}"}}, 404)
+        finally:
+            self.server.end()
+
+    def chat(self, request: Dict):
+        model = request.get("model", "stub")
+        reply = reply_for(request.get("messages", []))
+        usage = {
+            "prompt_tokens": count_tokens(json.dumps(request.get("messages", []))),
+            "completion_tokens": count_tokens(reply),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        created = int(time.time())
+
+        if not request.get("stream"):
+            self.send_json({
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(choices, usage=None):
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": choices}
+            if usage is not None:
+                chunk["usage"] = usage
+            self.send_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            event([{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (request.get("stream_options") or {}).get("include_usage"):
+            event([], usage)
+        self.send_chunk(b"data: [DONE]\n\n")
+        self.send_chunk(b"")
+
+    def embeddings(self, request: Dict):
+        texts = request.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        tokens = sum(count_tokens(text) for text in texts)
+        self.send_json({
+            "object": "list",
+            "model": request.get("model", "stub"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": embedding_for(text, self.server.dimensions)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server that counts requests and concurrent requests."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 token_delay_ms: float = 0.0, dimensions: int = 1536):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 picks a free one
+            latency_ms: Delay before every response
+            token_delay_ms: Delay between streamed words
+            dimensions: Length of the embedding vectors
+        """
+        super().__init__((host, port), StubHandler)
+        self.latency = latency_ms / 1000
+        self.token_delay = token_delay_ms / 1000
+        self.dimensions = dimensions
+        self.lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def begin(self, path: str):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"requests": dict(self.requests), "peakInFlight": self.peak_in_flight}
+
+    def start(self) -> "StubServer":
+        """Serve from a background thread."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    """Main entry point."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(description="Serve a local OpenAI-compatible stub API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Delay before every response")
+    parser.add_argument("--token-delay-ms", type=float, default=10.0, help="Delay between streamed words")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding length")
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency_ms, args.token_delay_ms, args.dimensions)
+    logger.info(f"Stub API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Write-Aware Query Cache
+
+Read-through cache for the shared query helpers (execute_query in utils.py
+and the Neo4j graph backend), which the agents and MCP tools call with the
+same read queries over and over: schema introspection, genre lists, top-N
+queries and verification counts.
+
+    - entries are keyed by the driver, the database, the whitespace-normalized
+      Cypher and the parameters, and hold the result as a list of dictionaries
+    - every entry is tagged with the labels and relationship types its query
+      reads; a query that names none (MATCH (n), SHOW INDEXES,
+      CALL db.labels()), has an untyped relationship pattern or a node
+      variable that is labelled nowhere in the query is tagged "*"
+    - writes evict by tag: a write that goes through the helpers evicts the
+      entries tagged with a label or type it touches, plus the "*" entries.
+      Writes whose targets cannot all be resolved to a label or type, and
+      deletes (which also remove relationships), evict everything
+    - the cache is LRU-bounded by entry count, results above a row limit are
+      not cached, and entries expire after a TTL
+    - hit, miss, eviction, invalidation and expiry counters
+
+Queries containing write clauses, or calling procedures that are not known
+to be read-only, are never cached. Cached rows are handed out as deep copies.
+
+The cache lives in one process. Writes made by other processes (ingest.py,
+the import scripts, ratings_stream.py) cannot evict its entries, which then
+stay stale until the TTL expires. It is therefore off unless
+NEO4J_QUERY_CACHE_SIZE is set, for read-mostly sessions such as notebooks
+and agents over a graph that is not loaded at the same time.
+
+Usage:
+    rows = get_cache().run(driver, "MATCH (g:Genre) RETURN g.name AS name", None, fetch)
+    get_cache().invalidate_query("MERGE (g:Genre {name: $name})")
+    print(get_cache().report())
+
+Environment:
+    NEO4J_QUERY_CACHE_SIZE      entries kept, default 0 (cache off); e.g. 1024 turns it on
+    NEO4J_QUERY_CACHE_TTL       seconds an entry stays valid, default 60; 0 keeps it until evicted
+    NEO4J_QUERY_CACHE_MAX_ROWS  largest result cached, default 10000 rows
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import threading
+import itertools
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+# Tag of entries that any write evicts
+ALL = "*"
+
+STRING_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+COMMENT_PATTERN = re.compile(r"//[^\n]*")
+NAME = r"(?:`[^`]+`|[A-Za-z_]\w*)"
+# (n:Label:Other {...}) and -[r:TYPE|OTHER*1..2]-
+PATTERN_LABELS = re.compile(rf"[(\[]\s*{NAME}?\s*((?::\s*!?{NAME}\s*(?:[|&]\s*!?{NAME}\s*)*)+)")
+# WHERE n:Label, SET n:Label, REMOVE n:Label
+PREDICATE_LABELS = re.compile(
+    rf"\b(?:WHERE|AND|OR|XOR|NOT|SET|REMOVE)\s+\(?\s*{NAME}\s*((?::\s*{NAME}\s*)+)", re.IGNORECASE
+)
+# Node patterns (n), (n:Label ...), (n {...}); not function calls such as count(n)
+NODE_VARIABLE = re.compile(rf"(?<![\w.`])\(\s*({NAME})\s*([:){{])")
+# A node created without label and variable: CREATE ({name: $name})
+ANONYMOUS_UNLABELLED_NODE = re.compile(r"(?<![\w.`])\(\s*\{")
+UNTYPED_RELATIONSHIP = re.compile(rf"-\[\s*{NAME}?\s*(?:\*[\d.]*\s*)?(?:\{{[^}}]*\}}\s*)?\]-|\)\s*<?--?>?\s*\(")
+WRITE_PATTERN = re.compile(
+    r"\b(?:CREATE|MERGE|SET|DELETE|REMOVE|DROP|FOREACH|LOAD\s+CSV|IN\s+TRANSACTIONS|ALTER|GRANT|DENY|REVOKE)\b",
+    re.IGNORECASE,
+)
+DELETE_PATTERN = re.compile(r"\b(?:DELETE|DROP)\b", re.IGNORECASE)
+PROCEDURE_PATTERN = re.compile(r"\bCALL\s+([A-Za-z_][\w.]*)\s*\(", re.IGNORECASE)
+SHOW_PATTERN = re.compile(r"^\s*SHOW\b", re.IGNORECASE)
+
+# Procedures that only read
+READ_PROCEDURES = (
+    "db.labels", "db.relationshiptypes", "db.propertykeys", "db.schema.", "db.indexes",
+    "db.index.vector.querynodes", "db.index.vector.queryrelationships", "db.index.fulltext.query",
+    "dbms.components", "apoc.meta.",
+)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so the same query always maps to the same key."""
+    return " ".join(query.split())
+
+
+def strip_literals(query: str) -> str:
+    """Query without comments and string literals, which may contain keywords."""
+    return STRING_PATTERN.sub("''", COMMENT_PATTERN.sub("", query))
+
+
+def is_read_query(query: str) -> bool:
+    """Whether a query can be answered from the cache."""
+    text = strip_literals(query)
+    if WRITE_PATTERN.search(text):
+        return False
+    return all(name.lower().startswith(READ_PROCEDURES) for name in PROCEDURE_PATTERN.findall(text))
+
+
+def has_unlabelled_variable(text: str) -> bool:
+    """Whether some node variable of a query is labelled in none of its patterns or predicates."""
+    labelled, unlabelled = set(), set()
+    for variable, follower in NODE_VARIABLE.findall(text):
+        (labelled if follower == ":" else unlabelled).add(variable)
+    for match in PREDICATE_LABELS.finditer(text):
+        labelled.add(re.match(rf"\b(?:WHERE|AND|OR|XOR|NOT|SET|REMOVE)\s+\(?\s*({NAME})",
+                              match.group(0), re.IGNORECASE).group(1))
+    return bool(unlabelled - labelled) or bool(ANONYMOUS_UNLABELLED_NODE.search(text))
+
+
+def query_tags(query: str) -> Set[str]:
+    """Labels and relationship types a query names; "*" when it may touch any."""
+    text = strip_literals(query)
+    tags = set()
+    for match in itertools.chain(PATTERN_LABELS.finditer(text), PREDICATE_LABELS.finditer(text)):
+        for name in re.findall(NAME, match.group(1)):
+            tags.add(name.strip("`"))
+    if (not tags or SHOW_PATTERN.search(text) or UNTYPED_RELATIONSHIP.search(text)
+            or has_unlabelled_variable(text)):
+        tags.add(ALL)
+    return tags
+
+
+def write_tags(query: str) -> Set[str]:
+    """Tags a write evicts; "*" stands for every entry.
+
+    A write that may touch an entity whose label or type is unknown, such as
+    m in MATCH (u:User)-[:RATED]->(m) SET m.seen = true, evicts everything.
+    """
+    tags = query_tags(query)
+    if DELETE_PATTERN.search(strip_literals(query)) or ALL in tags:
+        return {ALL}
+    return tags
+
+
+_scopes: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+_scope_ids = itertools.count()
+
+
+def scope_of(driver) -> int:
+    """Stable number per driver, so drivers of different servers never share entries."""
+    try:
+        scope = _scopes.get(driver)
+        if scope is None:
+            scope = _scopes[driver] = next(_scope_ids)
+        return scope
+    except TypeError:
+        return id(driver)
+
+
+class QueryCache:
+    """LRU cache of read query results, evicted by label and relationship type tags."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, max_rows: int = 10000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted; 0 disables caching
+            ttl: Seconds an entry stays valid, 0 for no expiry
+            max_rows: Results with more rows are not cached
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped by every invalidation; a result read before a write is not stored after it
+        self.generation = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "expirations": 0}
+
+    @classmethod
+    def from_env(cls) -> "QueryCache":
+        return cls(
+            max_entries=int(os.getenv("NEO4J_QUERY_CACHE_SIZE", "0")),
+            ttl=float(os.getenv("NEO4J_QUERY_CACHE_TTL", "60")),
+            max_rows=int(os.getenv("NEO4J_QUERY_CACHE_MAX_ROWS", "10000")),
+        )
+
+    @staticmethod
+    def key(driver, query: str, parameters: Optional[Dict[str, Any]], database: Optional[str] = None) -> tuple:
+        return (
+            scope_of(driver),
+            database,
+            normalize_query(query),
+            json.dumps(parameters or {}, sort_keys=True, default=repr),
+        )
+
+    def get(self, key: tuple) -> Optional[List[Dict]]:
+        """Cached rows for a key, counting the hit or miss."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry["stored"] > self.ttl:
+                self.entries.pop(key)
+                self.stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry["rows"]
+
+    def put(self, key: tuple, rows: List[Dict], tags: Set[str], generation: int):
+        """Store rows unless a write happened since they were read."""
+        with self.lock:
+            if generation != self.generation or len(rows) > self.max_rows:
+                return
+            self.entries[key] = {"rows": rows, "tags": tags, "stored": time.monotonic()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def run(self, driver, query: str, parameters: Optional[Dict[str, Any]],
+            fetch: Callable[[], List[Dict]], database: Optional[str] = None) -> List[Dict]:
+        """Rows of a query, from the cache when possible.
+
+        Args:
+            driver: Driver the query runs on
+            query: Cypher query
+            parameters: Query parameters
+            fetch: Runs the query and returns its rows as dictionaries
+            database: Database the query runs against, None for the default
+
+        Returns:
+            Rows as dictionaries; cached rows are deep copies, so callers may modify them
+        """
+        if not is_read_query(query):
+            try:
+                return fetch()
+            finally:
+                self.invalidate_query(query)
+        if not self.max_entries:
+            return fetch()
+
+        key = self.key(driver, query, parameters, database)
+        rows = self.get(key)
+        if rows is None:
+            generation = self.generation
+            rows = fetch()
+            self.put(key, rows, query_tags(query), generation)
+        return copy.deepcopy(rows)
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Evict the entries tagged with any of the tags, and the "*" entries; "*" evicts all.
+
+        Returns:
+            Number of entries evicted
+        """
+        tags = set(tags)
+        with self.lock:
+            self.generation += 1
+            stale = [
+                key for key, entry in self.entries.items()
+                if ALL in tags or ALL in entry["tags"] or entry["tags"] & tags
+            ]
+            for key in stale:
+                del self.entries[key]
+            self.stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def invalidate_query(self, query: str) -> int:
+        """Evict what a write query may have changed."""
+        return self.invalidate(write_tags(query))
+
+    def clear(self):
+        self.invalidate([ALL])
+
+    def report(self) -> Dict[str, Any]:
+        """Counters, current size and hit rate."""
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(
+                self.stats,
+                entries=len(self.entries),
+                hitRate=round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            )
+
+
+_default_cache: Optional[QueryCache] = None
+
+
+def get_cache() -> QueryCache:
+    """Process-wide cache shared by every query helper, configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = QueryCache.from_env()
+    return _default_cache
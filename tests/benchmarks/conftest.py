@@ -0,0 +1,162 @@
+"""
+Fixtures for the performance benchmark suite.
+
+Benchmarks are opt-in (RUN_BENCHMARKS=1 or `make bench`). They run against a
+Neo4j server when one is reachable and loaded with the movie graph, otherwise
+against an embedded Kuzu copy of the movie graph and the recording stub
+driver of tests/conftest.py. Every metric is compared with baseline.json and
+a test fails when it regresses by more than BENCHMARK_THRESHOLD (default 1.0,
+i.e. twice as slow).
+Set BENCHMARK_UPDATE_BASELINE=1 to rewrite the baseline from the current run.
+"""
+import os
+import sys
+import json
+import time
+import statistics
+from pathlib import Path
+
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+RESULTS_FILE = PROJECT_ROOT / "bench_output.json"
+
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+sys.path.insert(0, str(PROJECT_ROOT / "12_kuzu-quickstart"))
+sys.path.insert(0, str(PROJECT_ROOT / "02_llm-vectors-unstructured"))
+
+NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+NEO4J_USER = os.getenv("NEO4J_USERNAME", "neo4j")
+NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless they were asked for."""
+    if os.getenv("RUN_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="set RUN_BENCHMARKS=1 to run benchmarks")
+    for item in items:
+        if "benchmarks" in item.nodeid:
+            item.add_marker(skip)
+
+
+def neo4j_movie_driver():
+    """Return a driver for a reachable Neo4j loaded with movies, else None."""
+    from neo4j import GraphDatabase
+
+    driver = GraphDatabase.driver(
+        NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), connection_timeout=2
+    )
+    try:
+        with driver.session() as session:
+            count = session.run("MATCH (m:Movie) RETURN count(m) AS count").single()["count"]
+        if count:
+            return driver
+    except Exception:
+        pass
+    driver.close()
+    return None
+
+
+@pytest.fixture(scope="session")
+def neo4j_driver():
+    """Neo4j driver when a movie graph is reachable, otherwise None."""
+    driver = neo4j_movie_driver()
+    yield driver
+    if driver:
+        driver.close()
+
+
+@pytest.fixture(scope="session")
+def kuzu_movie_db(tmp_path_factory):
+    """Path of an embedded Kuzu movie graph built from 01_import-data/data."""
+    from movie_graph import load_movie_graph
+
+    path = tmp_path_factory.mktemp("kuzu") / "movies.kuzu"
+    load_movie_graph(str(path), str(PROJECT_ROOT / "01_import-data" / "data")).close()
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def graph_backend(neo4j_driver, kuzu_movie_db):
+    """Movie graph backend: Neo4j when available, Kuzu otherwise."""
+    from graph_backend import KuzuBackend, Neo4jBackend
+
+    # Latencies of the server, not of the query cache
+    backend = Neo4jBackend(driver=neo4j_driver, query_cache=False) if neo4j_driver else KuzuBackend(kuzu_movie_db)
+    yield backend
+    backend.close()
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def measure_latency(fn, iterations=200, warmup=10):
+    """Run fn repeatedly and return latency percentiles in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": percentile(samples, 50),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+class BenchmarkRecorder:
+    """Collect metrics and compare them with the stored baseline."""
+
+    def __init__(self, baseline, threshold, update):
+        self.baseline = baseline
+        self.threshold = threshold
+        self.update = update
+        self.results = {}
+
+    def record(self, name, value, higher_is_better=False, tolerance=1.0):
+        """Store a metric and fail if it regressed beyond the threshold.
+
+        tolerance scales the threshold for noisy metrics such as tail latency.
+        """
+        self.results[name] = value
+        expected = self.baseline.get(name)
+        if self.update or expected is None:
+            return
+        threshold = self.threshold * tolerance
+        if higher_is_better:
+            limit = expected / (1 + threshold)
+            assert value >= limit, f"{name} regressed: {value:.3f} < {limit:.3f} (baseline {expected:.3f})"
+        else:
+            limit = expected * (1 + threshold)
+            assert value <= limit, f"{name} regressed: {value:.3f} > {limit:.3f} (baseline {expected:.3f})"
+
+
+@pytest.fixture(scope="session")
+def bench(neo4j_driver):
+    """Session-wide benchmark recorder keyed by the environment in use."""
+    environment = "neo4j" if neo4j_driver else "standin"
+    baseline = {}
+    if BASELINE_FILE.exists():
+        baseline = json.loads(BASELINE_FILE.read_text()).get(environment, {})
+    recorder = BenchmarkRecorder(
+        baseline,
+        float(os.getenv("BENCHMARK_THRESHOLD", "1.0")),
+        os.getenv("BENCHMARK_UPDATE_BASELINE") == "1",
+    )
+    yield recorder
+
+    results = {name: round(value, 3) for name, value in recorder.results.items()}
+    RESULTS_FILE.write_text(json.dumps({environment: results}, indent=2, sort_keys=True))
+    if recorder.update:
+        stored = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        stored[environment] = results
+        BASELINE_FILE.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,205 @@
+"""
+Performance benchmarks for the import, ingest, query and caching paths.
+"""
+import time
+import logging
+import statistics
+
+import pytest
+
+from conftest import PROJECT_ROOT, measure_latency
+
+CRM_DATA_DIR = PROJECT_ROOT / "10_neo4j-mcp-servers" / "data"
+LESSONS_DIR = PROJECT_ROOT / "02_llm-vectors-unstructured" / "llm-vectors-unstructured" / "data" / "asciidoc"
+
+# Benchmark labels are prefixed so a real database is never touched outside them
+INGEST_CONFIG = {
+    "initializing_queries": {"constraints": [], "indexes": []},
+    "loading_queries": {
+        "nodes": {
+            "CaseOwner": {
+                "query": """
+                    UNWIND $records AS record
+                    MERGE (n:BenchCaseOwner {ownerId: record.ownerId})
+                    SET n.name = record.name
+                """,
+            },
+            "Account": {
+                "source_file": "accounts.csv",
+                "field_mappings": {
+                    "accountId": "Account_ID",
+                    "accountName": "Account_Name",
+                    "annualRevenue": "Annual_Revenue",
+                    "numberOfEmployees": "Number_of_Employees",
+                    "createdDate": "Created_Date",
+                },
+                "query": """
+                    UNWIND $records AS record
+                    MERGE (n:BenchAccount {accountId: record.accountId})
+                    SET n += record
+                """,
+            },
+            "Contact": {
+                "source_file": "contacts.csv",
+                "field_mappings": {
+                    "contactId": "Contact_ID",
+                    "firstName": "First_Name",
+                    "lastName": "Last_Name",
+                    "email": "Email",
+                    "createdDate": "Created_Date",
+                },
+                "query": """
+                    UNWIND $records AS record
+                    MERGE (n:BenchContact {contactId: record.contactId})
+                    SET n += record
+                """,
+            },
+        },
+        "relationships": {
+            "BELONGS_TO_ACCOUNT": {
+                "source_data": "contacts.csv",
+                "field_mappings": {"sourceId": "Contact_ID", "targetId": "Account_ID"},
+                "query": """
+                    UNWIND $records AS record
+                    MATCH (s:BenchContact {contactId: record.sourceId})
+                    MATCH (t:BenchAccount {accountId: record.targetId})
+                    MERGE (s)-[:BELONGS_TO_ACCOUNT]->(t)
+                """,
+            },
+        },
+    },
+}
+
+
+def test_movie_import_throughput(bench, tmp_path):
+    """Rows per second of the bulk movie import into the embedded graph."""
+    from movie_graph import build_tables, load_movie_graph
+
+    data_dir = str(PROJECT_ROOT / "01_import-data" / "data")
+    rows = sum(table.num_rows for table in build_tables(data_dir).values())
+
+    start = time.perf_counter()
+    load_movie_graph(str(tmp_path / "movies.kuzu"), data_dir).close()
+    elapsed = time.perf_counter() - start
+
+    bench.record("movie_import_rows_per_sec", rows / elapsed, higher_is_better=True)
+
+
+def test_neo4j_ingest_throughput(bench, neo4j_driver, stub_driver):
+    """Rows per second through Neo4jIngest node and relationship loading."""
+    from ingest import Neo4jIngest
+
+    driver = neo4j_driver or stub_driver()
+    ingest = Neo4jIngest(config=INGEST_CONFIG, driver=driver, data_dir=str(CRM_DATA_DIR))
+    logging.getLogger("ingest").setLevel(logging.WARNING)
+
+    # Median of several rounds keeps a single slow round from failing the run
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        ingest.load_nodes()
+        ingest.load_relationships()
+        timings.append(time.perf_counter() - start)
+
+    rows = sum(
+        len(ingest.load_csv_data(config["source_file"], config["field_mappings"]))
+        for name, config in INGEST_CONFIG["loading_queries"]["nodes"].items()
+        if name != "CaseOwner"
+    )
+    bench.record("ingest_rows_per_sec", rows / statistics.median(timings), higher_is_better=True)
+
+    if neo4j_driver:
+        with neo4j_driver.session() as session:
+            session.run(
+                "MATCH (n) WHERE n:BenchAccount OR n:BenchContact OR n:BenchCaseOwner DETACH DELETE n"
+            ).consume()
+
+
+def test_neo4j_initial_load_throughput(bench, neo4j_driver, stub_driver):
+    """Rows per second of a first load, which CREATEs instead of MERGEs."""
+    from ingest import Neo4jIngest
+
+    driver = neo4j_driver or stub_driver()
+    ingest = Neo4jIngest(config=INGEST_CONFIG, driver=driver, data_dir=str(CRM_DATA_DIR), initial_load=True)
+    logging.getLogger("ingest").setLevel(logging.WARNING)
+
+    def wipe():
+        if neo4j_driver:
+            with neo4j_driver.session() as session:
+                session.run(
+                    "MATCH (n) WHERE n:BenchAccount OR n:BenchContact OR n:BenchCaseOwner DETACH DELETE n"
+                ).consume()
+
+    timings = []
+    for _ in range(20):
+        wipe()
+        start = time.perf_counter()
+        ingest.load_nodes()
+        ingest.load_relationships()
+        timings.append(time.perf_counter() - start)
+    wipe()
+
+    rows = sum(
+        len(ingest.load_csv_data(config["source_file"], config["field_mappings"]))
+        for name, config in INGEST_CONFIG["loading_queries"]["nodes"].items()
+        if name != "CaseOwner"
+    )
+    bench.record("initial_load_rows_per_sec", rows / statistics.median(timings), higher_is_better=True)
+
+
+@pytest.mark.parametrize("genre", ["Comedy", "Drama"])
+def test_top_movies_by_genre_latency(bench, graph_backend, genre):
+    """p50/p99 latency of the movie_search genre query."""
+    from movie_search import get_top_movies_by_genre
+
+    stats = measure_latency(lambda: get_top_movies_by_genre(genre, backend=graph_backend))
+    bench.record(f"top_movies_by_genre[{genre}].p50_ms", stats["p50_ms"])
+    bench.record(f"top_movies_by_genre[{genre}].p99_ms", stats["p99_ms"], tolerance=3.0)
+
+
+@pytest.mark.parametrize("query_name, parameters", [
+    ("movies_by_person", {"name": "Tom Hanks"}),
+    ("co_actors", {"name": "Tom Hanks", "limit": 10}),
+])
+def test_graph_retrieval_latency(bench, graph_backend, query_name, parameters):
+    """p50/p99 latency of the graph retrieval queries."""
+    stats = measure_latency(lambda: graph_backend.run_named(query_name, **parameters))
+    bench.record(f"{query_name}.p50_ms", stats["p50_ms"])
+    bench.record(f"{query_name}.p99_ms", stats["p99_ms"], tolerance=3.0)
+
+
+def test_embedding_cache_hit_path(bench, stub_driver):
+    """Re-indexing an unchanged corpus and a one-file edit embeds nothing new."""
+    from incremental_index import IncrementalChunkIndexer, chunk_id, content_hash, iter_lessons
+
+    class CountingEmbeddings:
+        calls = 0
+
+        def embed_documents(self, texts):
+            self.calls += len(texts)
+            return [[0.0] * 8 for _ in texts]
+
+    embeddings = CountingEmbeddings()
+    indexer = IncrementalChunkIndexer(stub_driver(), embeddings)
+    state = [
+        {
+            "source": source,
+            "fileHash": content_hash(text),
+            "ids": [chunk_id(source, chunk) for chunk in indexer.text_splitter.split_text(text)],
+        }
+        for source, text in iter_lessons(str(LESSONS_DIR))
+    ]
+
+    indexer.driver = stub_driver({"collect(c.id) AS ids": state})
+    start = time.perf_counter()
+    stats = indexer.run(str(LESSONS_DIR))
+    elapsed = time.perf_counter() - start
+    assert stats["skipped"] == len(state)
+    bench.record("unchanged_corpus_files_per_sec", len(state) / elapsed, higher_is_better=True)
+
+    # A lesson whose file hash changed but whose chunks are all stored re-splits only that file
+    state[0]["fileHash"] = "edited"
+    indexer = IncrementalChunkIndexer(stub_driver({"collect(c.id) AS ids": state}), embeddings)
+    stats = indexer.run(str(LESSONS_DIR))
+    assert stats["skipped"] == len(state) - 1
+    assert embeddings.calls == 0
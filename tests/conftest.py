@@ -1,9 +1,31 @@
 """
 Pytest configuration and shared fixtures for Neo4j tests.
+
+Isolation fixtures, cheapest first:
+    neo4j_tx         - explicit transaction rolled back after the test
+    neo4j_namespace  - unique label for the test's nodes, deleted in batches
+    clean_neo4j      - empty database apart from the fixture graph
+    fixture_graph    - large read-only movie graph, loaded once and reused
+
+Tests that need no server use stub_driver, a recording stand-in driver.
 """
+import os
+import uuid
+from types import SimpleNamespace
+
 import pytest
 from neo4j import GraphDatabase
 
+from fixture_graph import (
+    FIXTURE_LABEL,
+    MARKER_LABEL,
+    delete_all_except,
+    delete_label,
+    graph_counts,
+    invalidate_fixture_graph,
+    load_fixture_graph,
+)
+
 # Neo4j connection settings
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
@@ -19,31 +41,145 @@ def neo4j_driver():
         connection_timeout=30,  # seconds
         connection_acquisition_timeout=30  # seconds
     )
-    
+
     # Verify the connection works
     try:
         with driver.session() as session:
             session.run("RETURN 1").single()
     except Exception as e:
+        driver.close()
         pytest.skip(f"Could not connect to Neo4j: {e}")
-    
+
     yield driver
-    
+
     # Cleanup
     driver.close()
 
-@pytest.fixture(autouse=True)
-def clean_neo4j(neo4j_driver):
-    """Clean the database between tests.
-    
-    This ensures tests don't interfere with each other.
+@pytest.fixture
+def neo4j_tx(neo4j_driver):
+    """Explicit transaction that is rolled back after the test.
+
+    Nothing the test writes is ever committed, so there is nothing to clean.
     """
-    # Run before each test
     with neo4j_driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n")
-    
-    yield  # This is where the test runs
-    
-    # Cleanup after each test
-    with neo4j_driver.session() as session:
-        session.run("MATCH (n) DETACH DELETE n")
+        tx = session.begin_transaction()
+        yield tx
+        if not tx.closed():
+            tx.rollback()
+
+@pytest.fixture
+def neo4j_namespace(neo4j_driver):
+    """Unique label for tests that need to commit.
+
+    Put the label on every node the test creates; afterwards those nodes are
+    detach-deleted in batches, leaving the rest of the database untouched.
+    """
+    label = f"Test_{uuid.uuid4().hex[:12]}"
+    yield label
+    delete_label(neo4j_driver, label)
+
+@pytest.fixture
+def clean_neo4j(neo4j_driver):
+    """Empty the database, apart from the fixture graph, before and after a test."""
+    keep = [FIXTURE_LABEL, MARKER_LABEL]
+    delete_all_except(neo4j_driver, keep)
+    yield
+    delete_all_except(neo4j_driver, keep)
+
+@pytest.fixture(scope="session")
+def fixture_graph(neo4j_driver):
+    """Read-only movie graph shared by the whole session.
+
+    Nodes carry the Fixture label and FixtureMovie, FixturePerson or
+    FixtureUser instead of the real movie labels. The graph is kept between sessions and
+    only rebuilt when FIXTURE_GRAPH_SCALE or FIXTURE_GRAPH_SEED change, or when
+    a test wrote to it.
+    """
+    marker = load_fixture_graph(
+        neo4j_driver,
+        scale=int(os.getenv("FIXTURE_GRAPH_SCALE", "1")),
+        seed=int(os.getenv("FIXTURE_GRAPH_SEED", "42")),
+    )
+    yield marker
+    counts = graph_counts(neo4j_driver)
+    if counts["nodes"] != marker["nodes"] or counts["relationships"] != marker["relationships"]:
+        invalidate_fixture_graph(neo4j_driver)
+
+
+class StubResult(list):
+    """Rows of a stubbed query; the summary carries the plan of PROFILE statements."""
+
+    def __init__(self, rows=(), profile=None):
+        super().__init__(rows)
+        self.summary = SimpleNamespace(profile=profile)
+
+    def consume(self):
+        return self.summary
+
+    def data(self):
+        return list(self)
+
+    def single(self):
+        return self[0] if self else None
+
+    def keys(self):
+        return list(self[0]) if self else []
+
+
+class StubSession:
+    """Session that records queries and answers them from its driver's responses."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        parameters = parameters or kwargs
+        self.driver.queries.append((" ".join(query.split()), parameters))
+        profile = self.driver.plan if query.lstrip().upper().startswith("PROFILE") else None
+        return StubResult(self.driver.answer(query, parameters), profile)
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(self, *args, **kwargs)
+
+    execute_read = execute_write
+
+
+class StubDriver:
+    """Driver stand-in recording every query as (query on one line, parameters).
+
+    A query is answered with the rows of the first responses entry whose
+    marker occurs in it; a callable entry is called with the parameters.
+    Other queries return no rows. PROFILE statements carry plan.
+    """
+
+    def __init__(self, responses=None, plan=None):
+        self.queries = []
+        self.responses = responses or {}
+        self.plan = plan
+
+    def answer(self, query, parameters):
+        for marker, rows in self.responses.items():
+            if marker in query:
+                return rows(parameters) if callable(rows) else rows
+        return []
+
+    def session(self, **kwargs):
+        return StubSession(self)
+
+    def verify_connectivity(self):
+        return None
+
+    def close(self):
+        return None
+
+
+@pytest.fixture
+def stub_driver():
+    """StubDriver class, for tests that run loaders against a recording stand-in."""
+    return StubDriver
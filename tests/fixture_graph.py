@@ -0,0 +1,158 @@
+"""
+Shared read-only fixture graph and batched cleanup helpers for Neo4j tests.
+
+The fixture graph is a synthetic copy of the movie dataset (see
+misc/synthetic_data.py) whose nodes all carry the Fixture label. Movies,
+persons and users are labelled FixtureMovie, FixturePerson and FixtureUser
+rather than Movie, Person and User, so the fixture neither collides with the
+uniqueness constraints of the import scripts nor shows up in queries on the
+real data. It is loaded once and kept between test sessions: a FixtureGraph
+marker node records the layout, scale and seed it was built with, and the
+graph is only rebuilt when those change or a test modified it.
+FIXTURE_GRAPH_SCALE=100 gives ~110k nodes.
+"""
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "misc"))
+
+MOVIES_DATA_DIR = str(PROJECT_ROOT / "01_import-data" / "data")
+
+FIXTURE_LABEL = "Fixture"
+MARKER_LABEL = "FixtureGraph"
+# Bumped whenever the labels or properties of the fixture graph change
+FIXTURE_LAYOUT = 2
+WRITE_BATCH_SIZE = 10000
+DELETE_BATCH_SIZE = 10000
+
+SCHEMA = [
+    # Indexes of the first layout were on the real labels
+    "DROP INDEX fixture_movie_id IF EXISTS",
+    "DROP INDEX fixture_person_id IF EXISTS",
+    "DROP INDEX fixture_user_id IF EXISTS",
+    "CREATE INDEX fixture_movie_key IF NOT EXISTS FOR (m:FixtureMovie) ON (m.movieId)",
+    "CREATE INDEX fixture_person_key IF NOT EXISTS FOR (p:FixturePerson) ON (p.tmdbId)",
+    "CREATE INDEX fixture_user_key IF NOT EXISTS FOR (u:FixtureUser) ON (u.userId)",
+]
+
+QUERIES = {
+    "movies": """
+        UNWIND $rows AS row
+        CREATE (:Fixture:FixtureMovie {
+            movieId: row.movieId, title: row.title, year: toInteger(row.year),
+            imdbRating: toFloat(row.imdbRating), genres: split(row.genres, '|')
+        })
+    """,
+    "persons": """
+        UNWIND $rows AS row
+        CREATE (:Fixture:FixturePerson {
+            tmdbId: row.person_tmdbId, name: row.name,
+            born: CASE row.born WHEN '' THEN null ELSE date(row.born) END
+        })
+    """,
+    "acted_in": """
+        UNWIND $rows AS row
+        MATCH (p:FixturePerson {tmdbId: row.person_tmdbId})
+        MATCH (m:FixtureMovie {movieId: row.movieId})
+        CREATE (p)-[:ACTED_IN {role: row.role}]->(m)
+    """,
+    "directed": """
+        UNWIND $rows AS row
+        MATCH (p:FixturePerson {tmdbId: row.person_tmdbId})
+        MATCH (m:FixtureMovie {movieId: row.movieId})
+        CREATE (p)-[:DIRECTED]->(m)
+    """,
+    "ratings": """
+        UNWIND $rows AS row
+        MATCH (m:FixtureMovie {movieId: row.movieId})
+        MERGE (u:Fixture:FixtureUser {userId: row.userId})
+        ON CREATE SET u.name = row.name
+        CREATE (u)-[:RATED {rating: toFloat(row.rating), timestamp: toInteger(row.timestamp)}]->(m)
+    """,
+}
+
+
+def delete_label(driver, label: str, batch_size: int = DELETE_BATCH_SIZE):
+    """Detach-delete every node with a label in batched transactions."""
+    with driver.session() as session:
+        session.run(
+            f"MATCH (n:`{label}`) "
+            f"CALL (n) {{ DETACH DELETE n }} IN TRANSACTIONS OF {int(batch_size)} ROWS"
+        ).consume()
+
+
+def delete_all_except(driver, keep_labels: List[str], batch_size: int = DELETE_BATCH_SIZE):
+    """Detach-delete every node that has none of the kept labels, in batches."""
+    keep = " AND ".join(f"NOT n:`{label}`" for label in keep_labels)
+    with driver.session() as session:
+        session.run(
+            f"MATCH (n) WHERE {keep} "
+            f"CALL (n) {{ DETACH DELETE n }} IN TRANSACTIONS OF {int(batch_size)} ROWS"
+        ).consume()
+
+
+def batches(rows: Iterable[Dict], size: int) -> Iterable[List[Dict]]:
+    """Group rows into lists of at most size rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def graph_counts(driver) -> Dict[str, int]:
+    """Node and relationship counts of the fixture graph."""
+    with driver.session() as session:
+        nodes = session.run(f"MATCH (n:{FIXTURE_LABEL}) RETURN count(n) AS count").single()["count"]
+        relationships = session.run(
+            f"MATCH (:{FIXTURE_LABEL})-[r]->() RETURN count(r) AS count"
+        ).single()["count"]
+    return {"nodes": nodes, "relationships": relationships}
+
+
+def read_marker(driver) -> Dict:
+    """Properties of the marker node, or an empty dict."""
+    with driver.session() as session:
+        record = session.run(f"MATCH (m:{MARKER_LABEL}) RETURN properties(m) AS marker").single()
+    return record["marker"] if record else {}
+
+
+def invalidate_fixture_graph(driver):
+    """Drop the marker so the next session rebuilds the fixture graph."""
+    delete_label(driver, MARKER_LABEL)
+
+
+def load_fixture_graph(driver, scale: int = 1, seed: int = 42) -> Dict:
+    """Load the fixture graph unless an identical one is already present.
+
+    Returns:
+        Marker properties: layout, scale, seed, nodes and relationships
+    """
+    marker = read_marker(driver)
+    if marker.get("layout") == FIXTURE_LAYOUT and marker.get("scale") == scale and marker.get("seed") == seed:
+        return marker
+
+    from synthetic_data import SyntheticDataGenerator
+
+    invalidate_fixture_graph(driver)
+    delete_label(driver, FIXTURE_LABEL)
+    with driver.session() as session:
+        for statement in SCHEMA:
+            session.run(statement).consume()
+        # Nodes come before the relationships that match on them
+        generator = SyntheticDataGenerator(scale=scale, seed=seed, movies_dir=MOVIES_DATA_DIR)
+        for name, chunks in generator.plan("movies").items():
+            rows = (row for table in chunks for row in table.to_pylist())
+            for batch in batches(rows, WRITE_BATCH_SIZE):
+                session.run(QUERIES[name], rows=batch).consume()
+
+    marker = {"layout": FIXTURE_LAYOUT, "scale": scale, "seed": seed, **graph_counts(driver)}
+    with driver.session() as session:
+        session.run(f"CREATE (m:{MARKER_LABEL}) SET m = $marker", marker=marker).consume()
+    return marker
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+import kuzu
+import pyarrow.parquet as pq
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "12_kuzu-quickstart"))
+
+from arrow_export import SYNTHETIC_RATINGS_QUERY, iter_record_batches, to_arrow, to_polars, write_parquet
+
+EMPTY_QUERY = "UNWIND range(1, 0) AS i RETURN i AS userId, 2.5 AS rating LIMIT 5"
+
+
+def connect():
+    return kuzu.Connection(kuzu.Database())
+
+
+def test_batches_are_chunked():
+    conn = connect()
+    batches = list(iter_record_batches(conn, SYNTHETIC_RATINGS_QUERY, {"rows": 25}, chunk_size=10))
+    assert [batch.num_rows for batch in batches] == [10, 10, 5]
+    table = to_arrow(conn, SYNTHETIC_RATINGS_QUERY, {"rows": 25}, chunk_size=10)
+    assert table.num_rows == 25 and table.column_names == ["userId", "movieId", "rating", "timestamp"]
+
+
+def test_empty_result_keeps_schema_of_query_with_limit():
+    conn = connect()
+    table = to_arrow(conn, EMPTY_QUERY)
+    assert table.num_rows == 0
+    assert [(field.name, str(field.type)) for field in table.schema] == [("userId", "int64"), ("rating", "double")]
+
+
+def test_parquet_round_trip_and_empty_file(tmp_path):
+    conn = connect()
+    path = str(tmp_path / "ratings.parquet")
+    assert write_parquet(conn, SYNTHETIC_RATINGS_QUERY, path, {"rows": 25}, chunk_size=10) == 25
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    assert pq.read_table(path).column("movieId").to_pylist()[:3] == [0, 1, 2]
+
+    empty = str(tmp_path / "empty.parquet")
+    assert write_parquet(conn, EMPTY_QUERY, empty) == 0
+    table = pq.read_table(empty)
+    assert table.num_rows == 0 and table.column_names == ["userId", "rating"]
+
+
+def test_polars_frame_and_empty_result():
+    pytest.importorskip("polars")
+    conn = connect()
+    frame = to_polars(conn, SYNTHETIC_RATINGS_QUERY, {"rows": 25}, chunk_size=10)
+    assert frame.height == 25 and frame.columns == ["userId", "movieId", "rating", "timestamp"]
+    assert frame["movieId"].to_list()[:3] == [0, 1, 2]
+
+    empty = to_polars(conn, EMPTY_QUERY)
+    assert empty.height == 0 and empty.columns == ["userId", "rating"]
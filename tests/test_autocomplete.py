@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+sys.path.insert(0, str(PROJECT_ROOT / "12_kuzu-quickstart"))
+
+from autocomplete import AutocompleteIndex, normalize, open_index
+
+
+class FakeBackend:
+    """Serves the autocomplete queries from in-memory rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def query(self, cypher, parameters=None):
+        parameters = parameters or {}
+        self.queries.append((" ".join(cypher.split()), parameters))
+        label = cypher.split("(n:")[1].split(")")[0]
+        if label == "Genre":
+            return [{"id": name, "name": name} for _, name in self.rows[label]]
+        if "count(n)" in cypher:
+            return [{"known": sum(1 for entity_id, _ in self.rows[label] if entity_id <= parameters["after"])}]
+        return [{"id": entity_id, "name": name}
+                for entity_id, name in sorted(self.rows[label]) if entity_id > parameters["after"]]
+
+
+def make_index():
+    index = AutocompleteIndex()
+    index.add("Movie", [{"id": 1, "name": "Toy Story"}, {"id": 2, "name": "The Matrix Reloaded"},
+                        {"id": 3, "name": "Amélie"}])
+    index.add("Person", [{"id": 31, "name": "Tom Hanks"}, {"id": 32, "name": "Tom Hardy"}])
+    index.add("Genre", [{"id": "Comedy", "name": "Comedy"}, {"id": "Sci-Fi", "name": "Sci-Fi"}])
+    index.build()
+    return index
+
+
+def test_completes_names_and_word_starts():
+    index = make_index()
+    assert normalize("  Amélie! ") == "amelie"
+    assert [match["name"] for match in index.complete("tom h")] == ["Tom Hanks", "Tom Hardy"]
+    assert index.complete("reload")[0] == {"label": "Movie", "id": 2, "name": "The Matrix Reloaded", "typo": False}
+    assert index.complete("amel")[0]["id"] == 3
+    assert index.complete("sci fi", label="Genre")[0]["name"] == "Sci-Fi"
+    assert index.complete("hanks", label="Movie") == []
+
+
+def test_tolerates_one_typo_and_resolves_to_ids():
+    index = make_index()
+    comedy = index.complete("comdy")
+    assert comedy == [{"label": "Genre", "id": "Comedy", "name": "Comedy", "typo": True}]
+    assert index.complete("tmo hanks")[0]["name"] == "Tom Hanks"
+    assert index.complete("toy stroy")[0]["name"] == "Toy Story"
+    assert index.complete("xqzv") == []
+
+    assert index.resolve("tom hardy")["id"] == 32
+    assert index.resolve("COMEDY", label="Genre")["id"] == "Comedy"
+    assert index.resolve("zzzz") is None
+
+
+def test_refresh_reads_only_new_entities(tmp_path):
+    rows = {
+        "Genre": [("Comedy", "Comedy")],
+        "Person": [(31, "Tom Hanks")],
+        "Movie": [(1, "Toy Story"), (2, "Jumanji")],
+    }
+    path = str(tmp_path / "autocomplete_index.json")
+    backend = FakeBackend(rows)
+    assert len(open_index(backend, path)) == 4
+
+    # Restarting loads the file; only movies with a larger id are read
+    rows["Movie"].append((3, "Grumpier Old Men"))
+    backend = FakeBackend(rows)
+    index = open_index(backend, path)
+    assert index.resolve("grumpier")["id"] == 3
+    movie_reads = [parameters for query, parameters in backend.queries if "RETURN n.movieId AS id" in query]
+    assert movie_reads == [{"after": 2}]
+    assert len(AutocompleteIndex.load(path)) == 5
+
+    # A deleted movie makes the label be read again completely
+    rows["Movie"] = [(2, "Jumanji"), (3, "Grumpier Old Men")]
+    index = open_index(FakeBackend(rows), path)
+    assert index.resolve("toy story", label="Movie") is None
+    assert index.counts["Movie"] == 2
+
+
+def test_kuzu_movie_graph(tmp_path):
+    from graph_backend import KuzuBackend
+    from movie_graph import load_movie_graph
+
+    db_path = str(tmp_path / "movies.kuzu")
+    load_movie_graph(db_path, str(PROJECT_ROOT / "01_import-data" / "data")).close()
+    with KuzuBackend(db_path) as backend:
+        index = open_index(backend, str(tmp_path / "autocomplete_index.json"))
+        hanks = index.resolve("tom hanks", label="Person")
+        assert hanks["name"] == "Tom Hanks"
+        assert backend.movies_by_person(hanks["name"])
+        assert index.resolve("Comdy", label="Genre")["name"] == "Comedy"
+        assert index.resolve("toy story")["label"] == "Movie"
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "13_graph-agent"))
+
+from bom import BillOfMaterials, RollupEngine, choose_offer, parse_money
+
+DATA_DIR = PROJECT_ROOT / "13_graph-agent" / "data"
+
+
+def test_parse_money():
+    """Test that price strings are converted to numbers."""
+    assert parse_money("$42.73") == 42.73
+    assert parse_money("$1,289") == 1289.0
+    assert parse_money("") is None
+    assert parse_money("n/a") is None
+
+
+def test_choose_offer_strategies():
+    """Test preferred and cheapest supplier selection."""
+    offers = {
+        "SUP-001": {"supplierId": "SUP-001", "unitCost": 42.73, "leadTimeDays": 8, "preferred": True},
+        "SUP-011": {"supplierId": "SUP-011", "unitCost": 34.32, "leadTimeDays": 27, "preferred": False},
+    }
+    assert choose_offer(offers, "preferred")["supplierId"] == "SUP-001"
+    assert choose_offer(offers, "cheapest")["supplierId"] == "SUP-011"
+    assert choose_offer({}, "preferred") is None
+
+
+def test_rollup_uses_assembly_and_part_quantities():
+    """Test cost and critical-path lead time on a small BOM."""
+    bom = BillOfMaterials()
+    bom.products["P-1"] = {"productId": "P-1", "name": "Chair", "price": 100.0}
+    bom.add_assembly("A-1", "Legs", "P-1", 4)
+    bom.add_part("S-1", "Leg", "A-1", 1)
+    bom.add_part("S-2", "Screw", "A-1", 2)
+    bom.set_offer({"part_id": "S-1", "supplier_id": "SUP-1", "unit_cost": "$5.00",
+                   "lead_time_days": "10", "preferred_supplier": "yes"})
+    bom.set_offer({"part_id": "S-2", "supplier_id": "SUP-2", "unit_cost": "$0.50",
+                   "lead_time_days": "3", "preferred_supplier": "yes"})
+
+    rollup = RollupEngine(bom).rollup("P-1")
+
+    assert rollup["totalCost"] == 24.0
+    assert rollup["leadTimeDays"] == 10
+    assert rollup["criticalPart"] == "S-1"
+    assert rollup["margin"] == 76.0
+
+
+def test_supplier_change_recomputes_only_affected_products():
+    """Test that a supplier row update only touches products using the part."""
+    bom = BillOfMaterials.from_csv(str(DATA_DIR))
+    engine = RollupEngine(bom)
+    engine.rollup_all()
+
+    part_id = "S-1074"
+    row = {
+        "part_id": part_id,
+        "part_name": "Drawer Front",
+        "supplier_id": "SUP-001",
+        "supplier_name": "nordic Wood Industries",
+        "lead_time_days": "90",
+        "unit_cost": "$99.99",
+        "minimum_order_quantity": "14",
+        "preferred_supplier": "yes",
+    }
+    affected = engine.update_supplier_row(row)
+
+    assert affected == bom.part_products[part_id]
+    assert affected and affected != set(bom.products)
+    for product_id in bom.products:
+        assert engine.rollup(product_id) == RollupEngine(bom).rollup(product_id)
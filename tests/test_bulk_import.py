@@ -0,0 +1,109 @@
+import sys
+import csv
+import json
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+
+from bulk_import import BulkImportGenerator, convert_value, log_report
+
+DATA_MODEL = {
+    "nodes": [
+        {"label": "Movie", "key_property": {"name": "movieId", "source": {"column_name": "movieId", "table_name": "movies.csv"}},
+         "properties": [
+             {"name": "title", "type": "STRING", "source": {"column_name": "title", "table_name": "movies.csv"}},
+             {"name": "released", "type": "DATE", "source": {"column_name": "released", "table_name": "movies.csv"}},
+             {"name": "genres", "type": "LIST<STRING>", "source": {"column_name": "genres", "table_name": "movies.csv"}},
+         ]},
+        {"label": "CaseOwner", "key_property": {"name": "ownerId", "source": {"column_name": "owner", "table_name": "movies.csv"}},
+         "properties": [{"name": "name", "type": "STRING", "source": {"column_name": "owner", "table_name": "movies.csv"}}]},
+        {"label": "Person", "key_property": {"name": "personId", "source": {"column_name": "personId", "table_name": "persons.csv"}},
+         "properties": []},
+    ],
+    "relationships": [
+        {"type": "ACTED_IN", "start_node_label": "Person", "end_node_label": "Movie"},
+        {"type": "OWNED_BY", "start_node_label": "Movie", "end_node_label": "CaseOwner"},
+        {"type": "KNOWS", "start_node_label": "Person", "end_node_label": "Person"},
+    ],
+}
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerows(rows)
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_convert_value():
+    assert convert_value("00001001", "long", False, ";") == "1001"
+    assert convert_value("07/15/2024", "date", False, ";") == "2024-07-15"
+    assert convert_value("Comedy| Drama", "string", True, ";") == "Comedy;Drama"
+    assert convert_value("  ", "long", False, ";") == ""
+
+
+def test_generator_writes_typed_files_and_reports_problems(tmp_path):
+    data_dir, output_dir = tmp_path / "data", tmp_path / "import"
+    data_dir.mkdir()
+    write_csv(data_dir / "movies.csv", [
+        ["movieId", "title", "released", "genres", "owner"],
+        ["1", "Heat", "1995-12-15", "Action|Crime", "Sarah Johnson"],
+        ["2", "Speed", "not a date", "Action", "Sarah Johnson"],
+        ["1", "Heat (1995)", "1995-12-15", "Action", "Sarah Johnson"],
+        ["4", "Ronin", "1998-09-25", "Action", "sarah johnson"],
+    ])
+    write_csv(data_dir / "persons.csv", [
+        ["personId", "movieId", "name"],
+        ["p1", "1", "Al Pacino"],
+        ["p2", "3", "Keanu Reeves"],
+    ])
+
+    report = BulkImportGenerator(DATA_MODEL, data_dir=str(data_dir), output_dir=str(output_dir)).run()
+
+    assert read_csv(output_dir / "nodes_Movie.csv") == [
+        ["movieId:ID(Movie)", "title", "released:date", "genres:string[]"],
+        ["1", "Heat", "1995-12-15", "Action;Crime"],
+        ["2", "Speed", "", "Action"],
+        ["4", "Ronin", "1998-09-25", "Action"],
+    ]
+    # Derived nodes are deduplicated and keyed like ingest.py does
+    assert read_csv(output_dir / "nodes_CaseOwner.csv")[1:] == [["sarah_johnson", "Sarah Johnson"]]
+    assert read_csv(output_dir / "rels_OWNED_BY.csv") == [
+        [":START_ID(Movie)", ":END_ID(CaseOwner)"], ["1", "sarah_johnson"], ["2", "sarah_johnson"],
+        ["1", "sarah_johnson"], ["4", "sarah_johnson"],
+    ]
+    assert read_csv(output_dir / "rels_ACTED_IN.csv")[0] == [":START_ID(Person)", ":END_ID(Movie)"]
+
+    # A second Movie row with the same id is reported, the first one is kept
+    assert report["nodes"]["Movie"]["duplicates"] == 1 and report["nodes"]["Movie"]["samples"] == ["1"]
+    # Case owners repeat on every row; only a differing name is a duplicate
+    assert report["nodes"]["CaseOwner"]["repeats"] == 2
+    assert report["nodes"]["CaseOwner"]["duplicates"] == 1
+    assert report["conversionErrors"] == {"Movie.released": 1}
+    assert report["relationships"]["ACTED_IN"]["dangling"] == 1
+    assert report["relationships"]["ACTED_IN"]["samples"] == [{"start": None, "end": "3"}]
+    assert report["unmappedRelationships"] == ["KNOWS"]
+    assert "--skip-bad-relationships" in report["command"]
+    assert json.loads((output_dir / "report.json").read_text())["relationships"]["OWNED_BY"]["rows"] == 4
+    # Movie and CaseOwner duplicates, the conversion error and the dangling relationship
+    assert log_report(report) == 4
+
+
+def test_crm_data_model_covers_source_files(tmp_path):
+    with open(PROJECT_ROOT / "10_neo4j-mcp-servers" / "assets" / "data_model" / "data_model.json") as f:
+        data_model = json.load(f)
+    report = BulkImportGenerator(
+        data_model, data_dir=str(PROJECT_ROOT / "10_neo4j-mcp-servers" / "data"), output_dir=str(tmp_path)
+    ).run()
+
+    assert all(stats["rows"] > 0 for stats in report["nodes"].values())
+    assert set(report["relationships"]) == {
+        "BELONGS_TO_ACCOUNT", "HAS_CASE", "REPORTED_BY", "HAS_OPPORTUNITY", "ASSIGNED_TO",
+    }
+    assert report["unmappedRelationships"] == ["CONVERTED_TO_OPPORTUNITY"]
@@ -0,0 +1,75 @@
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "02_llm-vectors-unstructured"))
+sys.path.insert(0, str(PROJECT_ROOT / "misc"))
+
+from embedding_backfill import EmbeddingBackfill
+from llm_gateway import LLMGateway
+from llm_stub_server import StubServer
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer(dimensions=8).start()
+    yield server
+    server.stop()
+
+
+def backfill_with(server, driver, **settings):
+    async def run(work):
+        async with LLMGateway(base_url=server.base_url, api_key="stub") as gateway:
+            backfill = EmbeddingBackfill(driver, gateway, **settings)
+            return await work(backfill)
+    return run
+
+
+def test_embed_page_batches_requests(stub_server):
+    run = backfill_with(stub_server, None, batch_size=100)
+    page = [(node_id, f"plot of movie {node_id}") for node_id in range(250)]
+
+    rows = asyncio.run(run(lambda backfill: backfill.embed_page(page)))
+    assert [row["id"] for row in rows] == list(range(250))
+    assert all(len(row["embedding"]) == 8 for row in rows)
+    assert stub_server.stats()["requests"] == {"/v1/embeddings": 3}
+
+
+def test_nodes_are_streamed_with_one_read_query(stub_server, stub_driver):
+    driver = stub_driver({
+        "count(n)": [{"missing": 25}],
+        "RETURN elementId(n)": [{"id": f"4:m:{i}", "text": f"plot {i}"} for i in range(25)],
+    })
+    run = backfill_with(stub_server, driver, page_size=10, batch_size=4)
+    stats = asyncio.run(run(lambda backfill: backfill.run()))
+
+    assert stats == {"embedded": 25, "failed": 0, "pages": 3}
+    reads = [query for query, _ in driver.queries if "RETURN elementId(n)" in query]
+    assert len(reads) == 1 and "id(n) >" not in reads[0] and "LIMIT" not in reads[0]
+    writes = [parameters["rows"] for query, parameters in driver.queries if "UNWIND $rows" in query]
+    assert [len(rows) for rows in writes] == [10, 10, 5]
+    assert writes[0][0]["id"] == "4:m:0" and len(writes[0][0]["embedding"]) == 8
+
+
+def test_backfill_embeds_missing_nodes_once(neo4j_driver, neo4j_namespace, stub_server):
+    with neo4j_driver.session() as session:
+        session.run(
+            f"UNWIND range(1, 30) AS i CREATE (:{neo4j_namespace} {{plot: 'plot ' + i, "
+            f"plotEmbedding: CASE WHEN i <= 5 THEN [1.0, 0.0] END}})"
+        ).consume()
+
+    run = backfill_with(stub_server, neo4j_driver, label=neo4j_namespace, page_size=10, batch_size=4)
+    first = asyncio.run(run(lambda backfill: backfill.run()))
+    second = asyncio.run(run(lambda backfill: backfill.run()))
+
+    assert first["embedded"] == 25 and first["pages"] == 3
+    assert second["embedded"] == 0
+    with neo4j_driver.session() as session:
+        sizes = session.run(
+            f"MATCH (n:{neo4j_namespace}) RETURN size(n.plotEmbedding) AS size, count(*) AS nodes"
+        ).data()
+    assert sorted((row["size"], row["nodes"]) for row in sizes) == [(2, 5), (8, 25)]
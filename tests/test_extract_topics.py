@@ -0,0 +1,66 @@
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "02_llm-vectors-unstructured"))
+
+import extract_topics
+from extract_topics import TopicExtractor, text_hash
+
+
+def test_noun_phrases_are_distinct_and_sorted():
+    from textblob.exceptions import MissingCorpusError
+
+    try:
+        topics = extract_topics.extract_topics(["Graph databases store data. Graph databases scale.", ""])
+    except MissingCorpusError:
+        pytest.skip("TextBlob corpora are not downloaded")
+    assert "graph databases" in topics[0] and topics[0] == sorted(set(topics[0]))
+    assert topics[1] == []
+
+
+def test_pages_span_labels_and_skip_processed_nodes(stub_driver):
+    driver = stub_driver({
+        "MATCH (n:Chunk)": [{"id": f"c{i}", "text": f"chunk {i}"} for i in range(3)],
+        "MATCH (n:Answer)": [{"id": f"a{i}", "text": f"answer {i}"} for i in range(2)],
+    })
+    pages = list(TopicExtractor(driver, page_size=2).iter_pages())
+
+    assert [[node["id"] for node in page] for page in pages] == [["c0", "c1"], ["c2", "a0"], ["a1"]]
+    assert all("n.topicsExtractedAt IS NULL" in query for query, _ in driver.queries)
+    assert not any("MATCH (n) WHERE" in query for query, _ in driver.queries)
+
+
+def test_writes_are_batched_and_mark_nodes_without_topics(stub_driver, monkeypatch):
+    monkeypatch.setattr(extract_topics, "WRITE_BATCH_SIZE", 2)
+    driver = stub_driver()
+    extractor = TopicExtractor(driver)
+    rows = [{"id": f"n{i}", "topics": ["graph"] * (i % 2)} for i in range(5)]
+    extractor.write_topics(rows)
+
+    batches = [parameters["rows"] for _, parameters in driver.queries]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row["id"] for batch in batches for row in batch] == [f"n{i}" for i in range(5)]
+    assert "SET n.topicsExtractedAt" in driver.queries[0][0]
+    assert extractor.stats["topics"] == 2
+
+
+def test_repeated_text_is_resolved_from_the_cache(stub_driver):
+    driver = stub_driver()
+    extractor = TopicExtractor(driver)
+    page = [{"id": "n1", "text": "graphs"}, {"id": "n2", "text": "graphs"}]
+    for node in page:
+        node["hash"] = text_hash(node["text"])
+    future = Future()
+    future.set_result([["graph"]])
+    inflight = {page[0]["hash"]}
+
+    extractor.drain((future, page, [page[0]["hash"]]), inflight)
+
+    assert not inflight
+    assert extractor.cache == {text_hash("graphs"): ["graph"]}
+    assert driver.queries[0][1]["rows"] == [{"id": "n1", "topics": ["graph"]}, {"id": "n2", "topics": ["graph"]}]
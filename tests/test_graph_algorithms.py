@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "07_cypher"))
+
+from graph_algorithms import CSRGraph, label_propagation, pagerank, weakly_connected_components
+
+
+def make_graph(n, edges):
+    sources = np.array([s for s, _ in edges], dtype=np.int32)
+    targets = np.array([t for _, t in edges], dtype=np.int32)
+    return CSRGraph.from_edges(np.arange(100, 100 + n, dtype=np.int64), sources, targets)
+
+
+def test_csr_layout():
+    graph = make_graph(4, [(2, 0), (0, 1), (2, 3), (0, 3)])
+    assert graph.indptr.tolist() == [0, 2, 2, 4, 4]
+    assert graph.out_degree().tolist() == [2, 0, 2, 0]
+    assert sorted(graph.indices[graph.indptr[2]:graph.indptr[3]].tolist()) == [0, 3]
+    assert graph.indptr.dtype == np.int64 and graph.indices.dtype == np.int32
+
+
+def test_pagerank_matches_dense_reference():
+    rng = np.random.default_rng(7)
+    n = 30
+    edges = {(int(s), int(t)) for s, t in rng.integers(0, n, size=(80, 2)) if s != t}
+    graph = make_graph(n, sorted(edges))
+
+    # Dense reference with dangling nodes linking to every node
+    transition = np.zeros((n, n))
+    for s, t in edges:
+        transition[s, t] = 1
+    degree = transition.sum(axis=1)
+    transition[degree == 0] = 1
+    transition /= transition.sum(axis=1, keepdims=True)
+    expected = np.full(n, 1.0 / n)
+    for _ in range(200):
+        expected = 0.85 * expected @ transition + 0.15 / n
+
+    ranks = pagerank(graph, max_iterations=200, tolerance=1e-12)
+    assert np.allclose(ranks, expected, atol=1e-9)
+    assert abs(ranks.sum() - 1) < 1e-9
+
+
+def test_weakly_connected_components():
+    graph = make_graph(7, [(0, 1), (2, 1), (3, 4), (5, 4)])
+    components = weakly_connected_components(graph)
+    assert components[0] == components[1] == components[2]
+    assert components[3] == components[4] == components[5]
+    assert len({components[0], components[3], components[6]}) == 3
+
+
+def test_label_propagation_separates_cliques():
+    clique = [(a, b) for a in range(5) for b in range(5) if a != b]
+    edges = clique + [(a + 5, b + 5) for a, b in clique] + [(4, 5), (5, 4)]
+    communities = label_propagation(make_graph(10, edges))
+    assert len(set(communities[:5].tolist())) == 1
+    assert len(set(communities[5:].tolist())) == 1
+    assert communities[0] != communities[9]
+
+
+def test_co_occurrence_links_sources_sharing_targets():
+    # Persons 0-2 acted in movie 4, person 3 only in movie 5
+    graph = make_graph(6, [(0, 4), (1, 4), (2, 4), (2, 5), (3, 5)])
+    co_actors = graph.co_occurrence().matrix().toarray()
+    assert co_actors[0, 1] == co_actors[1, 2] == co_actors[2, 3] == 1
+    assert co_actors[0, 3] == 0 and np.all(np.diag(co_actors) == 0)
+
+
+def test_project_scans_by_label_and_type(stub_driver):
+    from graph_algorithms import project
+
+    driver = stub_driver({
+        "(n:`Person`)": [{"id": 7}, {"id": 3}],
+        "(n:`Movie`)": [{"id": 5}, {"id": 3}],
+        "[:`ACTED_IN`]": [{"source": 7, "target": 5}, {"source": 3, "target": 5}, {"source": 7, "target": 99}],
+    })
+    graph = project(driver, ["Person", "Movie"], ["ACTED_IN"])
+
+    assert [query for query, _ in driver.queries] == [
+        "MATCH (n:`Person`) RETURN id(n) AS id",
+        "MATCH (n:`Movie`) RETURN id(n) AS id",
+        "MATCH (a)-[:`ACTED_IN`]->(b) RETURN id(a) AS source, id(b) AS target",
+    ]
+    # Node 3 carries both labels; the edge to the unprojected node 99 is dropped
+    assert graph.node_ids.tolist() == [3, 5, 7]
+    assert graph.edge_count == 2 and graph.out_degree().tolist() == [1, 0, 1]
+
+
+def test_write_back_in_batches(stub_driver):
+    from graph_algorithms import write_back
+
+    graph = make_graph(5, [(0, 1), (1, 2), (3, 4)])
+    driver = stub_driver()
+    values = np.array([10, 11, 12, 13, 14], dtype=np.int32)
+    written = write_back(driver, graph, "component", values, mask=values % 2 == 0, batch_size=2)
+
+    batches = [parameters["rows"] for _, parameters in driver.queries]
+    assert written == 3 and [len(rows) for rows in batches] == [2, 1]
+    assert [row["properties"]["component"] for rows in batches for row in rows] == [10, 12, 14]
+    assert all(type(row["id"]) is int for rows in batches for row in rows)
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+sys.path.insert(0, str(PROJECT_ROOT / "12_kuzu-quickstart"))
+
+from graph_backend import KUZU_DATABASE, GraphBackend, KuzuBackend, get_backend
+
+DATA_DIR = str(PROJECT_ROOT / "01_import-data" / "data")
+
+
+@pytest.fixture(scope="module")
+def kuzu_db(tmp_path_factory):
+    """Path of a temporary Kuzu movie graph."""
+    from movie_graph import load_movie_graph
+
+    path = str(tmp_path_factory.mktemp("kuzu") / "movies.kuzu")
+    load_movie_graph(path, DATA_DIR).close()
+    return path
+
+
+def test_base_backend_is_abstract():
+    """Test that a backend without a query method cannot be created."""
+    with pytest.raises(TypeError):
+        GraphBackend()
+
+
+def test_default_database_path_does_not_depend_on_the_working_directory():
+    """Test that the default Kuzu path is resolved against the module directory."""
+    assert Path(KUZU_DATABASE).is_absolute()
+    assert Path(KUZU_DATABASE).resolve() == (PROJECT_ROOT / "12_kuzu-quickstart" / "movies.kuzu").resolve()
+
+
+def test_kuzu_query(kuzu_db):
+    """Test raw and named queries against a temporary Kuzu database."""
+    with get_backend("kuzu", db_path=kuzu_db) as backend:
+        records = backend.query("MATCH (m:Movie) WHERE m.title = $title RETURN m.movieId AS id", {"title": "Toy Story"})
+        assert records == [{"id": 1}]
+
+        top = backend.top_movies_by_genre("Comedy", limit=3)
+        assert len(top) == 3 and all("Comedy" in movie["genres"] for movie in top)
+        assert [movie["imdbRating"] for movie in top] == sorted((m["imdbRating"] for m in top), reverse=True)
+        assert "Comedy" in backend.genres()
+        assert backend.movie_ratings("Toy Story")["ratings"] > 0
+
+
+def test_missing_kuzu_database(tmp_path):
+    """Test that a missing database file is reported."""
+    with pytest.raises(FileNotFoundError):
+        KuzuBackend(str(tmp_path / "missing.kuzu"))
+
+
+def test_neo4j_genre_query_tests_list_membership():
+    """Test that the Neo4j query matches genres as list items, like the Kuzu one."""
+    from graph_backend import NEO4J_QUERIES
+
+    assert "$genre IN m.genres" in NEO4J_QUERIES["top_movies_by_genre"]
+    assert "CONTAINS" not in NEO4J_QUERIES["top_movies_by_genre"]
+
+
+def test_benchmark_reports_differing_row_counts(kuzu_db):
+    """Test that the benchmark flags queries whose backends disagree on the rows."""
+    from benchmark_backends import benchmark, row_count_mismatches
+
+    with KuzuBackend(kuzu_db) as backend:
+        results = benchmark(backend, iterations=1, warmup=0)
+    assert row_count_mismatches({"a": results, "b": results}) == []
+
+    other = {key: dict(result) for key, result in results.items()}
+    key = next(key for key in other if key.startswith("top_movies_by_genre"))
+    other[key]["rows"] = 0
+    assert row_count_mismatches({"neo4j": other, "kuzu": results}) == [f"{key}: neo4j 0, kuzu 5"]
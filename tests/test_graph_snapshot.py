@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+from neo4j.time import Date, DateTime
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "misc"))
+
+from graph_snapshot import GraphSnapshot, PartWriter, if_not_exists, label_expression, rows_to_tables
+
+
+def test_rows_to_tables_converts_temporals_and_splits_mixed_types():
+    rows = [
+        {"__id": 1, "born": Date(1964, 9, 2), "updated": DateTime(2024, 1, 2, 3, 4, 5)},
+        {"__id": 2, "born": Date(1961, 1, 1), "updated": None},
+    ]
+    (table,) = list(rows_to_tables(rows))
+    assert pa.types.is_date(table.schema.field("born").type)
+    assert pa.types.is_timestamp(table.schema.field("updated").type)
+
+    mixed = [{"__id": 1, "year": 1999}, {"__id": 2, "year": "1999"}, {"__id": 3, "year": 2003}]
+    tables = list(rows_to_tables(mixed))
+    assert sorted(table.num_rows for table in tables) == [1, 2]
+    assert {str(table.schema.field("year").type) for table in tables} == {"int64", "string"}
+
+
+def test_integers_are_not_widened_to_floats():
+    rows = [{"__id": 1, "a": 1}, {"__id": 2, "a": 2.5}, {"__id": 3, "a": 3}]
+    tables = list(rows_to_tables(rows))
+    assert sorted(str(table.schema.field("a").type) for table in tables) == ["double", "int64"]
+    restored = sorted((row for table in tables for row in table.to_pylist()), key=lambda row: row["__id"])
+    assert [row["a"] for row in restored] == [1, 2.5, 3]
+    assert type(restored[0]["a"]) is int
+
+    # Lists are split by their item types, empty lists fit any
+    tables = list(rows_to_tables([{"v": [1, 2]}, {"v": [0.5]}, {"v": []}]))
+    assert sorted(str(table.schema.field("v").type) for table in tables) == ["list<item: double>", "list<item: int64>"]
+
+
+def test_part_writer_round_trip(tmp_path):
+    writer = PartWriter(str(tmp_path), "nodes-000", chunk_size=2)
+    rows = [
+        {"__id": 10, "title": "The Matrix", "embedding": [0.1, 0.2]},
+        {"__id": 11, "title": "Speed"},
+        {"__id": 12, "title": "Heat", "released": 1995},
+    ]
+    for row in rows:
+        writer.append(dict(row))
+    writer.flush()
+
+    assert writer.files == ["nodes-000-00000.parquet", "nodes-000-00001.parquet"]
+    assert writer.count == 3 and writer.vectors == {"embedding"}
+    restored = [row for batch in GraphSnapshot(None).iter_batches(str(tmp_path), writer.files) for row in batch]
+    # Missing properties come back absent, not as nulls
+    assert restored == rows
+
+
+def test_schema_statements_become_idempotent():
+    assert if_not_exists("CREATE CONSTRAINT `movie_id` FOR (n:`Movie`) REQUIRE (n.`movieId`) IS UNIQUE") == (
+        "CREATE CONSTRAINT `movie_id` IF NOT EXISTS FOR (n:`Movie`) REQUIRE (n.`movieId`) IS UNIQUE"
+    )
+    assert if_not_exists("CREATE VECTOR INDEX `moviePlots` FOR (n:`Movie`) ON (n.`plotEmbedding`)").startswith(
+        "CREATE VECTOR INDEX `moviePlots` IF NOT EXISTS FOR"
+    )
+    assert label_expression(["Person", "Odd`Label"]) == ":`Person`:`Odd``Label`"
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "02_llm-vectors-unstructured"))
+
+from incremental_index import chunk_id, iter_lessons, plan_source
+
+
+def test_chunk_id_depends_on_source_and_text():
+    """Test that identical text in different lessons gets different ids."""
+    assert chunk_id("a/lesson.adoc", "text") == chunk_id("a/lesson.adoc", "text")
+    assert chunk_id("a/lesson.adoc", "text") != chunk_id("b/lesson.adoc", "text")
+    assert chunk_id("a/lesson.adoc", "text") != chunk_id("a/lesson.adoc", "other")
+
+
+def test_plan_source_only_embeds_new_chunks():
+    """Test that unchanged chunks are kept and stale ones are deleted."""
+    existing = {"kept", "stale"}
+    to_embed, stale = plan_source(existing, ["kept", "new", "new", "other"])
+
+    assert to_embed == [1, 3]
+    assert stale == {"stale"}
+
+
+def test_plan_source_for_new_lesson():
+    """Test that a lesson without stored chunks embeds everything."""
+    to_embed, stale = plan_source(set(), ["a", "b"])
+
+    assert to_embed == [0, 1]
+    assert stale == set()
+
+
+def test_iter_lessons_streams_files(tmp_path):
+    """Test that lessons are discovered recursively and read lazily."""
+    (tmp_path / "one").mkdir()
+    (tmp_path / "one" / "lesson.adoc").write_text("first", encoding="utf-8")
+    (tmp_path / "two").mkdir()
+    (tmp_path / "two" / "lesson.adoc").write_text("second", encoding="utf-8")
+    (tmp_path / "two" / "notes.adoc").write_text("ignored", encoding="utf-8")
+
+    lessons = iter_lessons(str(tmp_path))
+    assert next(lessons)[1] == "first"
+    assert [text for _, text in lessons] == ["second"]
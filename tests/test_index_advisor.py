@@ -0,0 +1,99 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+
+from index_advisor import IndexAdvisor, index_statement, query_lookups, statement_index_name, wait_for_indexes
+
+DATA_MODEL = {
+    "nodes": [
+        {"label": "Account", "key_property": {"name": "accountId", "type": "STRING"}, "properties": [
+            {"name": "annualRevenue", "type": "INTEGER"},
+        ]},
+        {"label": "Contact", "key_property": {"name": "contactId", "type": "STRING"}, "properties": [
+            {"name": "email", "type": "STRING"},
+            {"name": "leadScore", "type": "INTEGER"},
+        ]},
+    ],
+    "relationships": [
+        {"type": "BELONGS_TO_ACCOUNT", "start_node_label": "Contact", "end_node_label": "Account"},
+    ],
+}
+
+CONFIG = {
+    "initializing_queries": {
+        "constraints": ["CREATE CONSTRAINT account_id IF NOT EXISTS FOR (a:Account) REQUIRE a.accountId IS UNIQUE"],
+        "indexes": [],
+    },
+    "loading_queries": {
+        "relationships": {
+            "BELONGS_TO_ACCOUNT": {"query": """
+                UNWIND $records AS record
+                MATCH (s:Contact {contactId: record.sourceId})
+                MATCH (t:Account {accountId: record.targetId})
+                MERGE (s)-[:BELONGS_TO_ACCOUNT]->(t)
+            """},
+        },
+    },
+}
+
+
+def test_query_lookups():
+    """Test that pattern maps and WHERE predicates are turned into lookups."""
+    lookups = query_lookups("""
+        MATCH (m:Movie)<-[r:RATED]-(u:User {userId: $user})
+        WHERE m.genres CONTAINS $genre AND toLower(m.title) CONTAINS $text AND r.rating >= 4
+        SET m.seen = true
+        RETURN m.title
+    """)
+    found = {(lookup["label"], lookup["property"], lookup["operator"]) for lookup in lookups}
+    assert found == {
+        ("User", "userId", "="),
+        ("Movie", "genres", "CONTAINS"),
+        ("Movie", "title", "FULLTEXT"),
+        ("RATED", "rating", ">="),
+    }
+
+
+def test_recommend_skips_constraint_backed_keys():
+    """Test that keys covered by a uniqueness constraint get no extra index."""
+    advisor = IndexAdvisor(DATA_MODEL, CONFIG, {"search": """
+        MATCH (c:Contact) WHERE c.email ENDS WITH $domain AND c.leadScore CONTAINS $x RETURN c
+    """})
+    statements = [index_statement(spec) for spec in advisor.recommend()]
+    assert statements == [
+        "CREATE INDEX contact_contactId IF NOT EXISTS FOR (n:`Contact`) ON (n.`contactId`)",
+        "CREATE TEXT INDEX contact_email_text IF NOT EXISTS FOR (n:`Contact`) ON (n.`email`)",
+    ]
+
+    # List-valued properties get neither a TEXT nor a RANGE index
+    advisor = IndexAdvisor(queries={"genre": "MATCH (m:Movie) WHERE m.genres CONTAINS $genre RETURN m"},
+                           property_types={("Movie", "genres"): "LIST<STRING>"})
+    assert advisor.recommend() == []
+
+
+def test_missing_leaves_out_existing_indexes(stub_driver):
+    """Test that indexes already in the database are not recommended again."""
+    advisor = IndexAdvisor(DATA_MODEL, CONFIG)
+    driver = stub_driver({"SHOW INDEXES": [
+        {"type": "RANGE", "entityType": "NODE", "labelsOrTypes": ["Contact"], "properties": ["contactId"]},
+    ]})
+    assert advisor.missing(driver) == []
+    assert len(advisor.missing()) == 1
+
+
+def test_wait_for_indexes_watches_only_the_named_indexes(stub_driver):
+    """Test that an unrelated failed index does not abort the wait."""
+    assert statement_index_name(
+        "CREATE TEXT INDEX contact_email_text IF NOT EXISTS FOR (n:`Contact`) ON (n.`email`)"
+    ) == "contact_email_text"
+    assert statement_index_name("CREATE INDEX FOR (n:Contact) ON (n.email)") is None
+
+    driver = stub_driver({"SHOW INDEXES": lambda parameters: [
+        {"name": name, "state": "FAILED", "populationPercent": 0.0}
+        for name in ["legacy_index"] if name in parameters["names"]
+    ]})
+    wait_for_indexes(driver, ["contact_email_text", None], timeout=0)
+    assert driver.queries[0][1] == {"names": ["contact_email_text"]}
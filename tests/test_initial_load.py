@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+
+from initial_load import create_plan, deduplicate
+
+NODE_QUERY = """
+    UNWIND $records AS record
+    MERGE (n:Account {accountId: record.accountId})
+    SET n += record
+"""
+
+RELATIONSHIP_QUERY = """
+    UNWIND $records AS record
+    MATCH (s:Contact {contactId: record.sourceId})
+    MATCH (t:Account {accountId: record.targetId})
+    MERGE (s)-[:BELONGS_TO_ACCOUNT]->(t)
+"""
+
+
+def test_create_plan_rewrites_single_merge():
+    plan = create_plan(NODE_QUERY)
+    assert plan["entity"] == "NODE" and plan["label"] == "Account"
+    assert plan["key_fields"] == ["accountId"]
+    assert "CREATE (n:Account {accountId: record.accountId})" in plan["query"]
+    assert "MERGE" not in plan["query"]
+
+    plan = create_plan(RELATIONSHIP_QUERY)
+    assert plan["entity"] == "RELATIONSHIP" and plan["label"] == "BELONGS_TO_ACCOUNT"
+    assert plan["key_fields"] == ["sourceId", "targetId"]
+    assert "CREATE (s)-[:BELONGS_TO_ACCOUNT]->(t)" in plan["query"]
+
+
+def test_create_plan_keeps_merge_when_unsafe():
+    assert create_plan("""
+        UNWIND $records AS r
+        MERGE (u:User {userId: r.userId}) ON CREATE SET u.name = r.name ON MATCH SET u.seen = true
+    """) is None
+    assert create_plan("""
+        UNWIND $records AS r
+        MATCH (m:Movie {movieId: r.movieId})
+        MERGE (m)-[:IN_GENRE]->(g:Genre {name: r.genre})
+    """) is None
+    assert create_plan("""
+        UNWIND $records AS r
+        MERGE (u:User {userId: r.userId})
+        MERGE (m:Movie {movieId: r.movieId})
+    """) is None
+
+    plan = create_plan("UNWIND $records AS r MERGE (u:User {userId: r.userId}) ON CREATE SET u.name = r.name")
+    assert plan["query"] == "UNWIND $records AS r CREATE (u:User {userId: r.userId}) SET u.name = r.name"
+
+
+def test_deduplicate_keeps_last_record_per_key():
+    records = [
+        {"accountId": "A1", "name": "old"},
+        {"accountId": "A2", "name": "second"},
+        {"accountId": None, "name": "keyless"},
+        {"accountId": "A1", "name": "new"},
+    ]
+    assert deduplicate(records, ["accountId"]) == [
+        {"accountId": "A1", "name": "new"},
+        {"accountId": "A2", "name": "second"},
+    ]
+
+
+def test_ingest_creates_only_into_empty_targets(stub_driver):
+    from ingest import Neo4jIngest
+
+    config = {"loading_queries": {"nodes": {"Account": {"query": NODE_QUERY}}}}
+    records = [{"accountId": "A1"}, {"accountId": "A1"}]
+
+    empty = Neo4jIngest(config=config, driver=stub_driver({"LIMIT 1": [{"found": 0}]}))
+    query, loaded = empty.loading_query("Account", NODE_QUERY, records)
+    assert "CREATE" in query and loaded == [{"accountId": "A1"}]
+
+    populated = Neo4jIngest(config=config, driver=stub_driver({"LIMIT 1": [{"found": 1}]}))
+    assert populated.loading_query("Account", NODE_QUERY, records) == (NODE_QUERY, records)
+
+    forced = Neo4jIngest(config=config, driver=stub_driver({"LIMIT 1": [{"found": 1}]}), initial_load=True)
+    assert "CREATE" in forced.loading_query("Account", NODE_QUERY, records)[0]
+    assert not forced.driver.queries
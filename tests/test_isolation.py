@@ -0,0 +1,28 @@
+def test_transaction_is_rolled_back(neo4j_driver, neo4j_tx):
+    """Test that writes in the test transaction are visible only inside it."""
+    neo4j_tx.run("CREATE (:IsolationProbe {name: 'rolled back'})").consume()
+    assert neo4j_tx.run("MATCH (n:IsolationProbe) RETURN count(n) AS count").single()["count"] == 1
+
+    with neo4j_driver.session() as session:
+        assert session.run("MATCH (n:IsolationProbe) RETURN count(n) AS count").single()["count"] == 0
+
+
+def test_namespace_label_is_unique(neo4j_driver, neo4j_namespace):
+    """Test that committed nodes can be found through the namespace label."""
+    with neo4j_driver.session() as session:
+        session.run(f"UNWIND range(1, 100) AS i CREATE (:`{neo4j_namespace}` {{i: i}})").consume()
+        count = session.run(f"MATCH (n:`{neo4j_namespace}`) RETURN count(n) AS count").single()["count"]
+    assert neo4j_namespace.startswith("Test_")
+    assert count == 100
+
+
+def test_fixture_graph_is_loaded(neo4j_driver, fixture_graph):
+    """Test that the shared fixture graph is connected movie data."""
+    with neo4j_driver.session() as session:
+        record = session.run("""
+            MATCH (:FixtureUser)-[r:RATED]->(m:FixtureMovie)
+            RETURN count(r) AS ratings, count(DISTINCT m) AS movies
+        """).single()
+    assert fixture_graph["nodes"] > 0
+    assert record["ratings"] > 0
+    assert record["movies"] > 0
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "07_cypher"))
+
+from item_similarity import ItemSimilarityJob, build_matrix, load_ratings_csv, top_k_similar
+
+RATINGS_FILE = str(PROJECT_ROOT / "01_import-data" / "data" / "ratings.csv")
+
+
+def dense_top_k(matrix, k, adjusted):
+    """Reference: full dense similarity matrix."""
+    dense = matrix.toarray().astype(np.float64)
+    if adjusted:
+        rated = dense != 0
+        means = dense.sum(axis=1) / np.maximum(rated.sum(axis=1), 1)
+        dense = np.where(rated, dense - means[:, None], 0.0)
+    norms = np.linalg.norm(dense, axis=0)
+    normalized = dense / np.where(norms > 0, norms, 1)
+    scores = normalized.T @ normalized
+    np.fill_diagonal(scores, -np.inf)
+    result = {}
+    for movie in range(scores.shape[0]):
+        order = np.argsort(-scores[movie], kind="stable")[:k]
+        result[movie] = [(int(t), scores[movie, t]) for t in order if scores[movie, t] > 0]
+    return result
+
+
+def test_build_matrix():
+    """Test that the matrix has one row per user and one column per movie."""
+    users, movies, ratings = load_ratings_csv(RATINGS_FILE)
+    matrix, movie_ids = build_matrix(users, movies, ratings)
+    assert matrix.shape == (len(set(users)), len(set(movies)))
+    assert matrix.nnz == len(set(zip(users, movies)))
+    assert list(movie_ids) == sorted(set(movies))
+
+
+def test_blocked_top_k_matches_dense():
+    """Test that blocked top-k equals the dense computation for both metrics."""
+    matrix, _ = build_matrix(*load_ratings_csv(RATINGS_FILE))
+
+    for metric in ("cosine", "adjusted_cosine"):
+        expected = dense_top_k(matrix, 5, metric == "adjusted_cosine")
+        found = {movie: [] for movie in expected}
+        for sources, targets, scores in top_k_similar(matrix, k=5, metric=metric, min_overlap=1, block_size=7):
+            for source, target, score in zip(sources, targets, scores):
+                found[int(source)].append((int(target), float(score)))
+
+        for movie, neighbours in expected.items():
+            # Compare scores rather than targets, ties may be broken differently
+            assert len(found[movie]) == len(neighbours)
+            assert np.allclose([s for _, s in found[movie]], [s for _, s in neighbours], atol=1e-5)
+
+
+def test_min_overlap_filters_pairs():
+    """Test that pairs rated by too few common users are dropped."""
+    matrix, _ = build_matrix(*load_ratings_csv(RATINGS_FILE))
+    rated = (matrix != 0).astype(np.int32)
+    overlap = (rated.T @ rated).toarray()
+
+    for sources, targets, _ in top_k_similar(matrix, k=10, min_overlap=3, block_size=16):
+        assert (overlap[sources, targets] >= 3).all()
+
+
+def test_old_similarities_are_deleted_only_after_the_new_run(stub_driver):
+    """Test that a run writes first and a failed run keeps the previous similarities."""
+    matrix, movie_ids = build_matrix(*load_ratings_csv(RATINGS_FILE))
+    driver = stub_driver()
+    ItemSimilarityJob(driver, batch_size=20).run(matrix, movie_ids, k=3)
+
+    queries = [query for query, _ in driver.queries]
+    run_id = driver.queries[0][1]["runId"]
+    assert len(queries) > 2 and all("CREATE" in query for query in queries[:-1])
+    assert "s.runId <> $runId" in queries[-1] and driver.queries[-1][1]["runId"] == run_id
+
+    def fail(parameters):
+        raise RuntimeError("write failed")
+
+    failing = stub_driver({"CREATE": fail})
+    with pytest.raises(RuntimeError):
+        ItemSimilarityJob(failing).run(matrix, movie_ids, k=3)
+    assert len(failing.queries) == 2
+    assert "WHERE s.runId = $runId" in failing.queries[-1][0]
@@ -0,0 +1,137 @@
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "misc"))
+
+from llm_gateway import LLMGateway, TokenBucket
+from llm_stub_server import StubServer
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer(latency_ms=50).start()
+    yield server
+    server.stop()
+
+
+def run_with_gateway(server, work, **settings):
+    async def run():
+        async with LLMGateway(base_url=server.base_url, api_key="stub", model="stub", **settings) as gateway:
+            return await work(gateway), gateway.metrics.report()
+    return asyncio.run(run())
+
+
+def test_identical_concurrent_requests_are_coalesced(stub_server):
+    messages = [{"role": "user", "content": "Who directed The Matrix?"}]
+
+    async def work(gateway):
+        return await asyncio.gather(*(gateway.chat(messages) for _ in range(10)))
+
+    replies, report = run_with_gateway(stub_server, work)
+    assert set(replies) == {"Stub reply to: Who directed The Matrix?"}
+    assert stub_server.stats()["requests"] == {"/v1/chat/completions": 1}
+    assert report["requests"] == 10 and report["coalesced"] == 9 and report["upstreamRequests"] == 1
+    assert report["completionTokens"] > 0
+
+
+def test_concurrency_limit(stub_server):
+    async def work(gateway):
+        return await asyncio.gather(*(
+            gateway.chat([{"role": "user", "content": f"prompt {i}"}]) for i in range(12)
+        ))
+
+    replies, report = run_with_gateway(stub_server, work, max_concurrency=3)
+    assert len(set(replies)) == 12
+    assert stub_server.stats()["peakInFlight"] <= 3
+    assert report["upstreamRequests"] == 12
+
+
+def test_streaming_matches_completion_and_is_shared(stub_server):
+    messages = [{"role": "user", "content": "Recommend a movie like Heat"}]
+
+    async def work(gateway):
+        async def collect():
+            return [token async for token in gateway.stream(messages)]
+        streams = await asyncio.gather(collect(), collect(), collect())
+        return streams, await gateway.chat(messages)
+
+    (streams, reply), report = run_with_gateway(stub_server, work)
+    assert len(streams[0]) > 1
+    assert all("".join(tokens) == reply for tokens in streams)
+    assert report["coalesced"] == 2 and report["upstreamRequests"] == 2
+    assert report["firstTokenMs"]["p50"] > 0
+
+
+def test_token_bucket_waits_for_budget():
+    async def run():
+        bucket = TokenBucket(tokens_per_minute=600)  # 10 tokens per second
+        start = time.monotonic()
+        await bucket.acquire(600)
+        immediate = time.monotonic() - start
+        await bucket.acquire(5)
+        return immediate, time.monotonic() - start
+
+    immediate, total = asyncio.run(run())
+    assert immediate < 0.1
+    assert 0.4 < total < 1.5
+
+
+def test_embeddings_use_their_own_endpoint(monkeypatch):
+    monkeypatch.setenv("BASE_URL", "https://chat.example.com/v1")
+    monkeypatch.setenv("API_KEY", "chat-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "openai-key")
+    monkeypatch.delenv("EMBEDDING_BASE_URL", raising=False)
+    monkeypatch.delenv("EMBEDDING_API_KEY", raising=False)
+
+    async def run():
+        async with LLMGateway.from_env() as chat, LLMGateway.from_env("embeddings") as embeddings:
+            return (str(chat.client.base_url), chat.client.api_key,
+                    str(embeddings.client.base_url), embeddings.client.api_key)
+
+    chat_url, chat_key, embedding_url, embedding_key = asyncio.run(run())
+    assert chat_url.startswith("https://chat.example.com") and chat_key == "chat-key"
+    assert embedding_url.startswith("https://api.openai.com") and embedding_key == "openai-key"
+
+
+def test_abandoned_stream_is_cancelled_and_frees_its_slot():
+    server = StubServer(token_delay_ms=20).start()
+    messages = [{"role": "user", "content": "Tell me a long story about graphs and databases"}]
+
+    async def work(gateway):
+        async for _ in gateway.stream(messages):
+            break
+        await asyncio.sleep(0.1)
+        return gateway.semaphore._value, dict(gateway.in_flight)
+
+    try:
+        (free_slots, in_flight), report = run_with_gateway(server, work, max_concurrency=1)
+    finally:
+        server.stop()
+    assert free_slots == 1 and in_flight == {}
+    assert report["upstreamRequests"] == 1
+
+
+def test_cancelled_upstream_stream_releases_its_subscribers():
+    server = StubServer(token_delay_ms=20).start()
+    messages = [{"role": "user", "content": "Tell me a long story about graphs and databases"}]
+
+    async def work(gateway):
+        async def collect():
+            return [token async for token in gateway.stream(messages)]
+        readers = [asyncio.ensure_future(collect()) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        shared, = gateway.in_flight.values()
+        shared.task.cancel()
+        return await asyncio.wait_for(asyncio.gather(*readers, return_exceptions=True), timeout=5)
+
+    try:
+        results, _ = run_with_gateway(server, work)
+    finally:
+        server.stop()
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,119 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "misc"))
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+
+import query_cache
+from query_cache import ALL, QueryCache, is_read_query, query_tags, write_tags
+
+GENRES = "MATCH (g:Genre) RETURN g.name AS name ORDER BY name"
+MOVIES_BY_PERSON = "MATCH (p:Person {name: $name})-[r:ACTED_IN|DIRECTED]->(m:Movie) RETURN m.title AS title"
+
+
+def counting_fetch(calls, rows=None):
+    def fetch():
+        calls.append(1)
+        return rows if rows is not None else [{"value": len(calls)}]
+    return fetch
+
+
+def test_queries_are_classified_and_tagged():
+    assert is_read_query(GENRES)
+    assert is_read_query("MATCH (m:Movie) WHERE m.title CONTAINS 'Set' RETURN m")
+    assert is_read_query("CALL db.index.vector.queryNodes('moviePlots', 5, $vector) YIELD node RETURN node")
+    assert not is_read_query("MERGE (g:Genre {name: $name})")
+    assert not is_read_query("MATCH (m:Movie) CALL apoc.refactor.rename.label('Movie', 'Film', [m]) YIELD total")
+
+    assert query_tags(MOVIES_BY_PERSON) == {"Person", "ACTED_IN", "DIRECTED", "Movie"}
+    assert query_tags("MATCH (n) WHERE n:Movie RETURN n") == {"Movie"}
+    assert query_tags("MATCH (u:User)-[r]->(m:Movie) RETURN count(*)") == {"User", "Movie", ALL}
+    assert query_tags("SHOW INDEXES") == {ALL}
+
+    assert write_tags("MATCH (p:Person)-[:ACTED_IN]->() WITH DISTINCT p SET p:Actor") == {"Person", "ACTED_IN", "Actor"}
+    assert write_tags("MATCH (p:Person) DETACH DELETE p") == {ALL}
+    assert write_tags("MATCH (n) WHERE id(n) = $id SET n.x = 1") == {ALL}
+    # m may be a Movie, so the write evicts everything
+    assert write_tags("MATCH (u:User)-[:RATED]->(m) SET m.x = 1") == {ALL}
+    assert ALL in query_tags("MATCH (u:User)-[:RATED]->(m) RETURN m.title")
+
+
+def test_read_through_and_write_eviction():
+    cache = QueryCache()
+    driver, calls = object(), []
+
+    assert cache.run(driver, GENRES, None, counting_fetch(calls)) == [{"value": 1}]
+    assert cache.run(driver, "  MATCH (g:Genre)\n RETURN g.name AS name ORDER BY name", {}, counting_fetch(calls)) == [{"value": 1}]
+    cache.run(driver, MOVIES_BY_PERSON, {"name": "Tom Hanks"}, counting_fetch(calls))
+    cache.run(driver, MOVIES_BY_PERSON, {"name": "Meg Ryan"}, counting_fetch(calls))
+    cache.run(driver, "SHOW INDEXES", None, counting_fetch(calls))
+    assert len(calls) == 4
+
+    # A Movie write leaves the genre list alone but evicts the Movie reads and SHOW INDEXES
+    cache.run(driver, "MATCH (m:Movie {movieId: $id}) SET m.plot = $plot", {"id": 1, "plot": ""}, counting_fetch([]))
+    assert cache.report()["invalidations"] == 3
+    cache.run(driver, GENRES, None, counting_fetch(calls))
+    cache.run(driver, MOVIES_BY_PERSON, {"name": "Tom Hanks"}, counting_fetch(calls))
+    assert len(calls) == 5
+
+    assert cache.invalidate_query("MATCH (p:Person) DETACH DELETE p") == 2
+    report = cache.report()
+    assert report["hits"] == 2 and report["misses"] == 5 and report["entries"] == 0
+
+
+def test_opt_in_and_deep_copies(monkeypatch):
+    monkeypatch.delenv("NEO4J_QUERY_CACHE_SIZE", raising=False)
+    disabled, calls = QueryCache.from_env(), []
+    disabled.run(object(), GENRES, None, counting_fetch(calls))
+    disabled.run(object(), GENRES, None, counting_fetch(calls))
+    assert len(calls) == 2 and disabled.report()["entries"] == 0
+
+    cache, driver = QueryCache(), object()
+    rows = cache.run(driver, "MATCH (m:Movie) RETURN m.genres AS genres", None,
+                     counting_fetch(calls, rows=[{"genres": ["Comedy"]}]))
+    rows[0]["genres"].append("Drama")
+    assert cache.run(driver, "MATCH (m:Movie) RETURN m.genres AS genres", None, counting_fetch(calls)) == [
+        {"genres": ["Comedy"]}
+    ]
+
+
+def test_lru_bound_row_limit_and_stale_reads():
+    cache = QueryCache(max_entries=2, max_rows=3)
+    driver, calls = object(), []
+    for genre in ("Comedy", "Drama", "Horror"):
+        cache.run(driver, "MATCH (m:Movie) WHERE $genre IN m.genres RETURN m", {"genre": genre}, counting_fetch(calls))
+    assert cache.report()["evictions"] == 1 and cache.report()["entries"] == 2
+
+    cache.run(driver, "MATCH (u:User) RETURN u", None, counting_fetch(calls, rows=[{}] * 4))
+    assert cache.report()["entries"] == 2
+
+    # A write between reading and storing a result keeps the result out of the cache
+    def racing_fetch():
+        cache.invalidate(["Genre"])
+        return [{"name": "Comedy"}]
+
+    cache.run(driver, GENRES, None, racing_fetch)
+    cache.run(driver, GENRES, None, counting_fetch(calls))
+    assert cache.report()["hits"] == 0
+
+
+def test_backend_reads_are_cached_and_ingest_writes_evict(monkeypatch, stub_driver):
+    from graph_backend import Neo4jBackend
+    from ingest import Neo4jIngest
+
+    monkeypatch.setattr(query_cache, "_default_cache", QueryCache())
+    driver = stub_driver({"Genre": [{"name": "Comedy"}]})
+    backend = Neo4jBackend(driver=driver, database="neo4j")
+    assert backend.genres() == ["Comedy"] and backend.genres() == ["Comedy"]
+    assert len(driver.queries) == 1
+
+    # Another driver does not see the entries of the first
+    Neo4jBackend(driver=stub_driver(), database="neo4j").genres()
+    assert query_cache.get_cache().report()["misses"] == 2
+
+    ingest = Neo4jIngest(config={}, driver=stub_driver())
+    ingest.run_query("UNWIND $records AS record MERGE (g:Genre {name: record.name})", {"records": []})
+    backend.genres()
+    assert len(driver.queries) == 2
@@ -0,0 +1,72 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+
+from query_profiler import QueryProfiler, can_profile, instrument, summarize_plan
+
+GENRE_PLAN = {
+    "operatorType": "ProduceResults@neo4j",
+    "dbHits": 0,
+    "rows": 5,
+    "children": [{
+        "operatorType": "Filter@neo4j",
+        "dbHits": 186,
+        "rows": 5,
+        "children": [{
+            "operatorType": "NodeByLabelScan@neo4j",
+            "dbHits": 94,
+            "rows": 93,
+            "args": {"Details": "m:Movie"},
+            "children": [],
+        }],
+    }],
+}
+
+
+def test_summarize_plan_flags_scans():
+    """Test that db hits are summed and label scans are reported."""
+    plan = summarize_plan(GENRE_PLAN)
+    assert plan["dbHits"] == 280
+    assert plan["rows"] == 5
+    assert plan["scans"] == ["NodeByLabelScan(m:Movie)"]
+    assert summarize_plan(None)["scans"] == []
+
+
+def test_can_profile():
+    """Test that schema and batched statements are never prefixed with PROFILE."""
+    assert can_profile("MATCH (m:Movie) RETURN m")
+    assert not can_profile("CREATE INDEX movie_title IF NOT EXISTS FOR (m:Movie) ON (m.title)")
+    assert not can_profile("MATCH (n) CALL (n) { DETACH DELETE n } IN TRANSACTIONS OF 100 ROWS")
+
+
+def test_instrument_is_opt_in(monkeypatch, stub_driver):
+    """Test that the driver is only wrapped when profiling is enabled."""
+    driver = stub_driver()
+    monkeypatch.delenv("NEO4J_PROFILE", raising=False)
+    assert instrument(driver) is driver
+
+
+def test_sampling_histogram_and_slow_log(tmp_path, stub_driver):
+    """Test plan sampling, per-query histograms and the slow-query log."""
+    driver = stub_driver(plan=GENRE_PLAN)
+    profiler = QueryProfiler(slow_query_ms=0, sample_every=3, slow_log=str(tmp_path / "slow.log"))
+    instrumented = instrument(driver, profiler)
+
+    query = """
+        MATCH (m:Movie) WHERE m.genres CONTAINS $genre
+        RETURN m.title AS title
+    """
+    for _ in range(5):
+        with instrumented.session(database="neo4j") as session:
+            assert session.run(query, {"genre": "Comedy"}).data() == []
+
+    assert [query.startswith("PROFILE") for query, _ in driver.queries] == [True, False, False, True, False]
+    report = profiler.report()
+    assert len(report) == 1
+    assert report[0]["count"] == 5
+    assert report[0]["plan"]["scans"] == ["NodeByLabelScan(m:Movie)"]
+    assert len((tmp_path / "slow.log").read_text().splitlines()) == 5
+    assert profiler.slow_queries[0]["parameters"] == ["genre"]
@@ -0,0 +1,107 @@
+import sys
+import json
+import queue
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "07_cypher"))
+
+from ratings_stream import FileSource, QueueSource, RatingsStream
+
+
+def upsert_driver(stub_driver):
+    """Stub driver that applies every event it is sent."""
+    return stub_driver({"UNWIND $events": lambda parameters: [
+        {"applied": len(parameters["events"]), "added": len(parameters["events"]),
+         "movies": len(parameters["events"])}
+    ]})
+
+
+def sent_batches(driver):
+    return [parameters["events"] for query, parameters in driver.queries if "UNWIND $events" in query]
+
+
+def rating(user, movie, value=4.0, timestamp=1000, **extra):
+    return dict({"userId": user, "movieId": movie, "rating": value, "timestamp": timestamp}, **extra)
+
+
+def test_file_source_tails_complete_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text(json.dumps(rating(1, 10)) + "\nnot json\n" + json.dumps(rating(2, 10))[:10])
+    source = FileSource(str(path))
+    events = source.read(100)
+    assert [event["userId"] for event in events] == [1] and source.invalid == 1
+
+    # The half-written line is read once the producer finishes it
+    with open(path, "a") as f:
+        f.write(json.dumps(rating(2, 10))[10:] + "\n")
+    assert [event["userId"] for event in source.read(100)] == [2]
+    assert source.read(100) == [] and not source.closed
+
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text("movieId,userId,name,rating,timestamp\n1,630,Glenn Mitchell,4.0,1443807734\n")
+    source = FileSource(str(csv_path), follow=False)
+    event = source.read(100)[0]
+    assert (event["userId"], event["movieId"], event["name"], event["rating"]) == (630, 1, "Glenn Mitchell", 4.0)
+    assert source.read(100) == [] and source.closed
+
+
+def test_micro_batches_are_size_bounded_and_deduplicated(stub_driver):
+    events = queue.Queue()
+    for i in range(5):
+        events.put(rating(i, 10, emittedAt=0))
+    events.put(rating(0, 10, value=2.0, timestamp=1001))
+    events.put(rating(0, 10, value=1.0, timestamp=999))
+    events.put({"userId": "x"})
+    events.put(None)
+
+    driver = upsert_driver(stub_driver)
+    report = RatingsStream(driver, batch_size=4, max_wait=60, checkpoint_file=None).run(QueueSource(events))
+
+    assert [len(batch) for batch in sent_batches(driver)] == [4, 2]
+    # Within a batch the latest rating of a user for a movie wins
+    assert [(row["userId"], row["rating"]) for row in sent_batches(driver)[1]] == [(4, 4.0), (0, 2.0)]
+    assert "emittedAt" not in sent_batches(driver)[0][0]
+    assert report["events"] == 7 and report["batches"] == 2 and report["invalid"] == 1
+    # emittedAt 0 puts the lag of every event at decades
+    assert report["lagMs"]["p50"] > 1e9
+
+
+def test_time_bound_flush_and_checkpointed_resume(tmp_path, stub_driver):
+    path = tmp_path / "events.jsonl"
+    path.write_text("".join(json.dumps(rating(i, 10)) + "\n" for i in range(3)))
+    checkpoint = str(tmp_path / "ratings_stream.json")
+
+    driver = upsert_driver(stub_driver)
+    stream = RatingsStream(driver, batch_size=100, max_wait=0.05, checkpoint_file=checkpoint)
+    report = stream.run(FileSource(str(path)), idle_timeout=0.3)
+    assert [len(batch) for batch in sent_batches(driver)] == [3]
+    assert report["lagMs"]["p99"] < 5000
+
+    # A restart continues after the committed offset
+    with open(path, "a") as f:
+        f.write(json.dumps(rating(9, 10)) + "\n")
+    driver = upsert_driver(stub_driver)
+    stream = RatingsStream(driver, batch_size=100, max_wait=0.05, checkpoint_file=checkpoint)
+    stream.run(FileSource(str(path), stream.load_offset(str(path)), follow=False))
+    assert [[row["userId"] for row in batch] for batch in sent_batches(driver)] == [[9]]
+
+
+def test_aggregates_are_recomputed_when_they_drift(stub_driver):
+    def drift_driver(counted, missing, ratings):
+        return stub_driver({"RETURN counted": [{"counted": counted, "missing": missing, "ratings": ratings}]})
+
+    def recomputed(driver):
+        return any("IN TRANSACTIONS" in query for query, _ in driver.queries)
+
+    driver = drift_driver(100, 0, 100)
+    assert not RatingsStream(driver, checkpoint_file=None).check_aggregates() and not recomputed(driver)
+
+    # Ratings loaded by another writer, or movies imported after the last run
+    for counted, missing, ratings in ((100, 0, 130), (100, 5, 100)):
+        driver = drift_driver(counted, missing, ratings)
+        assert RatingsStream(driver, checkpoint_file=None).check_aggregates() and recomputed(driver)
+
+    driver = drift_driver(100, 0, 100)
+    assert RatingsStream(driver, checkpoint_file=None).check_aggregates(recompute=True) and recomputed(driver)
@@ -0,0 +1,129 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "10_neo4j-mcp-servers"))
+
+from reference_filter import KeySet, record_lookups
+
+CRM_DATA_DIR = PROJECT_ROOT / "10_neo4j-mcp-servers" / "data"
+
+CONFIG = {
+    "loading_queries": {
+        "nodes": {
+            "CaseOwner": {
+                "query": """
+                    UNWIND $records AS record
+                    MERGE (n:CaseOwner {ownerId: record.ownerId})
+                    SET n.name = record.name
+                """,
+            },
+            "Account": {
+                "source_file": "accounts.csv",
+                "field_mappings": {"accountId": "Account_ID", "accountName": "Account_Name"},
+                "query": """
+                    UNWIND $records AS record
+                    MERGE (n:Account {accountId: record.accountId})
+                    SET n += record
+                """,
+            },
+            "Opportunity": {
+                "source_file": "opps.csv",
+                "field_mappings": {"opportunityId": "Opportunity_ID", "name": "Opportunity_Name"},
+                "query": """
+                    UNWIND $records AS record
+                    MERGE (n:Opportunity {opportunityId: record.opportunityId})
+                    SET n += record
+                """,
+            },
+        },
+        "relationships": {
+            "HAS_OPPORTUNITY": {
+                "source_data": "opps.csv",
+                "field_mappings": {"sourceId": "Account_ID", "targetId": "Opportunity_ID"},
+                "query": """
+                    UNWIND $records AS record
+                    MATCH (s:Account {accountId: record.sourceId})
+                    MATCH (t:Opportunity {opportunityId: record.targetId})
+                    MERGE (s)-[:HAS_OPPORTUNITY]->(t)
+                """,
+            },
+        },
+    },
+}
+
+
+def test_key_set_membership():
+    keys = KeySet()
+    keys.add(["A1", "A2", None, 7])
+    keys.add(["A2", "A3"])
+    assert len(keys) == 4
+    assert keys.contains(["A1", "A3", "A4", None, 7, "7"]).tolist() == [True, True, False, False, True, False]
+    assert KeySet().contains(["A1"]).tolist() == [False]
+
+
+def test_record_lookups_follow_the_unwind_variable():
+    query = CONFIG["loading_queries"]["relationships"]["HAS_OPPORTUNITY"]["query"]
+    assert record_lookups(query, ("MATCH",)) == [
+        ("Account", "accountId", "sourceId"),
+        ("Opportunity", "opportunityId", "targetId"),
+    ]
+    assert record_lookups(query, ("MERGE",)) == []
+    assert record_lookups("UNWIND $rows AS row MERGE (u:User {userId: row.id, name: 'x'})", ("MERGE",)) == [
+        ("User", "userId", "id"),
+    ]
+
+
+def sent_records(driver, relationship_type):
+    return [
+        record
+        for query, parameters in driver.queries if relationship_type in query
+        for record in parameters["records"]
+    ]
+
+
+def test_ingest_sends_only_resolvable_relationships(stub_driver):
+    from ingest import Neo4jIngest
+
+    driver = stub_driver()
+    ingest = Neo4jIngest(config=CONFIG, driver=driver, data_dir=str(CRM_DATA_DIR), initial_load=True)
+    ingest.load_nodes()
+    ingest.load_relationships()
+
+    # Four opportunities in opps.csv reference leads instead of accounts
+    report = ingest.dangling["HAS_OPPORTUNITY"]
+    assert report["records"] == 4
+    assert report["missing"] == {"Account.accountId": 4, "Opportunity.opportunityId": 0}
+    assert all(sample["sourceId"].startswith("L") for sample in report["samples"])
+    sent = sent_records(driver, "HAS_OPPORTUNITY")
+    assert len(sent) == 26 and not any(record["sourceId"].startswith("L") for record in sent)
+    # Labels loaded with CREATE were empty, so nothing is looked up
+    assert not [query for query, _ in driver.queries if "AS existing" in query]
+
+
+def test_merged_labels_confirm_missing_keys_against_the_database(stub_driver):
+    from ingest import Neo4jIngest
+
+    # L007 was loaded as an Account by an earlier run
+    driver = stub_driver({"AS existing": lambda parameters: [
+        {"existing": [key for key in parameters["keys"] if key == "L007"]}
+    ]})
+    ingest = Neo4jIngest(config=CONFIG, driver=driver, data_dir=str(CRM_DATA_DIR), initial_load=False)
+    ingest.load_nodes()
+    ingest.load_relationships()
+
+    lookups = [parameters["keys"] for query, parameters in driver.queries if "AS existing" in query]
+    assert lookups == [["L007", "L011", "L015", "L019"]]
+    assert ingest.dangling["HAS_OPPORTUNITY"]["records"] == 3
+    assert "L007" in {record["sourceId"] for record in sent_records(driver, "HAS_OPPORTUNITY")}
+
+
+def test_unloaded_labels_are_not_checked(stub_driver):
+    from ingest import Neo4jIngest
+
+    ingest = Neo4jIngest(config=CONFIG, driver=stub_driver(), data_dir=str(CRM_DATA_DIR))
+    query = CONFIG["loading_queries"]["relationships"]["HAS_OPPORTUNITY"]["query"]
+    records = [{"sourceId": "L007", "targetId": "O001"}]
+    assert ingest.resolvable_records("HAS_OPPORTUNITY", query, records) == records
+    assert ingest.dangling == {}
@@ -0,0 +1,96 @@
+import sys
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "13_graph-agent"))
+
+from bom import BillOfMaterials, BomGraphLoader, RollupEngine
+from supplier_impact import SupplierImpactIndex, bits_to_indexes
+
+DATA_DIR = str(PROJECT_ROOT / "13_graph-agent" / "data")
+
+
+def traverse_affected_products(bom, supplier_id):
+    """Reference answer computed by walking the BOM."""
+    return {
+        product_id
+        for part_id in bom.parts_of_supplier(supplier_id)
+        for product_id in bom.part_products.get(part_id, set())
+    }
+
+
+def test_bits_to_indexes():
+    """Test decoding of a bitset."""
+    assert bits_to_indexes(0) == []
+    assert bits_to_indexes(0b10110) == [1, 2, 4]
+
+
+def test_impact_matches_traversal():
+    """Test that the bitsets agree with a traversal of the BOM."""
+    bom = BillOfMaterials.from_csv(DATA_DIR)
+    index = SupplierImpactIndex(bom)
+
+    for supplier_id in bom.supplier_parts:
+        impact = index.impact(supplier_id)
+        assert set(impact["affectedProducts"]) == traverse_affected_products(bom, supplier_id)
+        assert index.affected_count(supplier_id) == len(impact["affectedProducts"])
+
+
+def test_removed_supplier_row_creates_single_sourced_part():
+    """Test that ingesting a removal updates the alternative-source flags."""
+    bom = BillOfMaterials.from_csv(DATA_DIR)
+    index = SupplierImpactIndex(bom)
+    assert index.impact("SUP-001")["singleSourcedParts"] == []
+
+    RollupEngine(bom, indexes=[index]).remove_supplier_row("S-1074", "SUP-011")
+
+    impact = index.impact("SUP-001")
+    assert impact["singleSourcedParts"] == ["S-1074"]
+    assert set(impact["productsWithoutAlternative"]) == bom.part_products["S-1074"]
+    assert "S-1074" not in bom.parts_of_supplier("SUP-011")
+
+
+def test_saved_index_loads_and_keeps_updating(tmp_path):
+    """Test that a saved index is read back and still ingests supplier rows."""
+    bom = BillOfMaterials.from_csv(DATA_DIR)
+    path = str(tmp_path / "impact_index.json")
+    SupplierImpactIndex(bom).save(path)
+
+    index = SupplierImpactIndex.load(path, bom)
+    assert index.to_dict() == SupplierImpactIndex(bom).to_dict()
+
+    RollupEngine(bom, indexes=[index]).remove_supplier_row("S-1074", "SUP-011")
+    assert index.impact("SUP-001")["singleSourcedParts"] == ["S-1074"]
+
+
+def test_saved_index_is_rebuilt_when_the_bom_changed(tmp_path):
+    """Test that an index saved for other supplier rows is not reused."""
+    path = str(tmp_path / "impact_index.json")
+    SupplierImpactIndex(BillOfMaterials.from_csv(DATA_DIR)).save(path)
+
+    bom = BillOfMaterials.from_csv(DATA_DIR)
+    bom.remove_offer("S-1074", "SUP-011")
+    index = SupplierImpactIndex.load(path, bom)
+    assert index.impact("SUP-001")["singleSourcedParts"] == ["S-1074"]
+    assert index.to_dict() == SupplierImpactIndex(bom).to_dict()
+
+
+def test_supplier_ingest_refreshes_the_index(stub_driver):
+    """Test that rows ingested through the BOM loader update the impact index."""
+    bom = BillOfMaterials.from_csv(DATA_DIR)
+    index = SupplierImpactIndex(bom)
+    engine = RollupEngine(bom, indexes=[index])
+    row = {"part_id": "S-1074", "part_name": "Drawer Front", "supplier_id": "SUP-099",
+           "supplier_name": "New Supplier", "lead_time_days": "5", "unit_cost": "$10.00",
+           "minimum_order_quantity": "1", "preferred_supplier": "no"}
+
+    driver = stub_driver()
+    affected = BomGraphLoader(driver).ingest_supplier_rows(engine, [row])
+
+    assert affected == bom.part_products["S-1074"]
+    assert set(index.impact("SUP-099")["affectedProducts"]) == traverse_affected_products(bom, "SUP-099")
+    assert index.to_dict() == SupplierImpactIndex(bom).to_dict()
+    written = [parameters for _, parameters in driver.queries]
+    assert {"partIds": ["S-1074"]} in written
+    assert [record["supplierId"] for record in written[0]["records"]] == ["SUP-099"]
@@ -0,0 +1,89 @@
+import csv
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Get the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "misc"))
+
+from synthetic_data import SyntheticDataGenerator
+
+MOVIES_DIR = str(PROJECT_ROOT / "01_import-data" / "data")
+CRM_DIR = str(PROJECT_ROOT / "10_neo4j-mcp-servers" / "data")
+
+
+def generate(output_dir, seed=7):
+    """Generate a small dataset in several chunks per file."""
+    generator = SyntheticDataGenerator(
+        scale=3, seed=seed, chunk_size=64, movies_dir=MOVIES_DIR, crm_dir=CRM_DIR
+    )
+    return generator.run(str(output_dir))
+
+
+def read_rows(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def read_header(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return next(csv.reader(f))
+
+
+def test_headers_and_counts_match_sources(tmp_path):
+    """Test that every file keeps its source header and scaled node counts."""
+    rows = generate(tmp_path)
+
+    for source_dir, names in ((MOVIES_DIR, ["movies", "persons", "acted_in", "directed", "ratings"]),
+                              (CRM_DIR, ["accounts", "contacts", "cases", "opps", "leads"])):
+        for name in names:
+            assert read_header(tmp_path / f"{name}.csv") == read_header(Path(source_dir) / f"{name}.csv")
+    assert rows["movies"] == 93 * 3
+    assert rows["accounts"] == 25 * 3
+    movies = read_rows(tmp_path / "movies.csv")
+    assert sum(row["movie_imdbId"] == row["movie_tmdbId"] for row in movies) == 0
+
+
+def test_foreign_keys_are_consistent(tmp_path):
+    """Test that relationships only point at generated nodes."""
+    generate(tmp_path)
+
+    movie_ids = {row["movieId"] for row in read_rows(tmp_path / "movies.csv")}
+    person_ids = {row["person_tmdbId"] for row in read_rows(tmp_path / "persons.csv")}
+    for name in ("acted_in", "directed"):
+        for row in read_rows(tmp_path / f"{name}.csv"):
+            assert row["movieId"] in movie_ids
+            assert row["person_tmdbId"] in person_ids
+
+    ratings = read_rows(tmp_path / "ratings.csv")
+    assert {row["movieId"] for row in ratings} <= movie_ids
+    assert len({(row["userId"], row["movieId"]) for row in ratings}) == len(ratings)
+    assert len({(row["userId"], row["name"]) for row in ratings}) == len({row["userId"] for row in ratings})
+
+    account_ids = {row["Account_ID"] for row in read_rows(tmp_path / "accounts.csv")}
+    contact_account = {row["Contact_ID"]: row["Account_ID"] for row in read_rows(tmp_path / "contacts.csv")}
+    assert set(contact_account.values()) <= account_ids
+    for row in read_rows(tmp_path / "cases.csv"):
+        assert contact_account[row["Contact_ID"]] == row["Account_ID"]
+    assert {row["Account_ID"] for row in read_rows(tmp_path / "opps.csv")} <= account_ids
+
+
+def test_ratings_per_user_are_skewed(tmp_path):
+    """Test that a few users rate far more movies than the typical user."""
+    generate(tmp_path)
+
+    degrees = sorted(Counter(row["userId"] for row in read_rows(tmp_path / "ratings.csv")).values())
+    assert degrees[-1] >= 10 * degrees[len(degrees) // 2]
+
+
+def test_same_seed_is_reproducible(tmp_path):
+    """Test that a seed always produces identical files."""
+    generate(tmp_path / "a", seed=11)
+    generate(tmp_path / "b", seed=11)
+    generate(tmp_path / "c", seed=12)
+
+    for name in ("ratings", "cases", "persons"):
+        first = (tmp_path / "a" / f"{name}.csv").read_bytes()
+        assert first == (tmp_path / "b" / f"{name}.csv").read_bytes()
+        assert first != (tmp_path / "c" / f"{name}.csv").read_bytes()